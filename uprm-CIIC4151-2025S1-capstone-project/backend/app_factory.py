@@ -0,0 +1,49 @@
+"""
+The app factory, kept free of import-time side effects: importing it loads
+no route module, so create_app(blueprints=[...]) only pays for the ones it
+registers. flask_application.py builds the full app for WSGI servers.
+"""
+import importlib
+import os
+
+from flask import Flask
+from flask_cors import CORS
+
+from config.settings import Config
+from json_provider import FastJSONProvider
+from compression import init_compression
+from metrics import init_metrics
+from query_stats import init_query_stats
+from tracing import init_tracing
+from profiling import init_profiling
+from load import release_request_connection
+
+
+# -------------------------------------------------------
+# APP SETUP
+# -------------------------------------------------------
+def create_app(config=Config, blueprints=None):
+    """
+    Build the Flask app. `blueprints` limits which route modules (names from
+    Config.BLUEPRINTS) are imported and registered, so a script that only
+    needs, say, reports doesn't pay for importing every other subsystem.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.json = FastJSONProvider(app)
+    CORS(app)
+    init_tracing(app)
+    init_profiling(app)
+    init_metrics(app)
+    init_query_stats(app)
+    init_compression(app)
+    app.teardown_appcontext(release_request_connection)
+
+    # Upload folder setup
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+
+    for name in blueprints or app.config["BLUEPRINTS"]:
+        module = importlib.import_module(f"routes.{name}")
+        app.register_blueprint(module.bp)
+
+    return app
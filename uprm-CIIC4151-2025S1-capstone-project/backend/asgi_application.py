@@ -0,0 +1,179 @@
+"""
+ASGI serving mode.
+
+The hot read-only report routes are served by async handlers on an asyncpg
+pool, so a worker is not pinned to one request while it waits on Postgres,
+and the /reports/events stream (server-sent events) holds no thread at all.
+Every other route falls through to the Flask app, mounted via a2wsgi, so the
+API surface is unchanged.
+
+    gunicorn -k uvicorn.workers.UvicornWorker asgi_application:app
+    uvicorn asgi_application:app --reload            # local development
+
+The WSGI deployment (Procfile, flask_application:app) is unaffected.
+Responses are encoded by the Flask app's JSON provider, so dates, key order
+and MessagePack negotiation match the WSGI routes byte for byte.
+
+Routes that fall through to Flask keep every before/after_request hook. The
+async routes below never reach those hooks, so in this mode they get:
+
+  - metrics: yes, the same http_* series via metrics.observe_async, labelled
+    with the Flask rule they replace
+  - compression: gzip only, from Starlette's GZipMiddleware (no brotli and no
+    compressed-body cache, see compression.py)
+  - tracing, profiling and query stats: no. Those hook into Flask requests and
+    psycopg2 cursors, and these routes use asyncpg. Profile or trace a slow
+    async route through its Flask twin (flask_application:app).
+"""
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from constants import (
+    ASYNC_DB_POOL_MIN_SIZE,
+    ASYNC_DB_POOL_MAX_SIZE,
+    COMPRESSION_MIN_BYTES,
+    REPORT_EVENTS_POLL_SECONDS,
+)
+from flask_application import app as flask_app
+from handler.h_reports_async import AsyncReportsHandler
+from json_provider import MSGPACK_MIMETYPE, msgpack
+from load import create_async_pool
+from metrics import observe_async
+
+
+# -------------------------------------------------------
+# HELPERS
+# -------------------------------------------------------
+def int_arg(request, name, default=None):
+    """request.args.get(name, default, type=int), Starlette flavour."""
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def render(request, payload, status, negotiable=True):
+    """Encode like FastJSONProvider.response, including the msgpack opt-in."""
+    accept = parse_accept_header(request.headers.get("accept"), MIMEAccept)
+    if negotiable and msgpack is not None and accept.best_match(["application/json", MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE:
+        response = Response(flask_app.json.dump_msgpack(payload), status, media_type=MSGPACK_MIMETYPE)
+    else:
+        response = Response(flask_app.json.dumps(payload).encode() + b"\n", status, media_type="application/json")
+    if negotiable:
+        response.headers["Vary"] = "Accept"
+    return response
+
+
+# -------------------------------------------------------
+# REPORTS
+# -------------------------------------------------------
+@observe_async("/reports")
+async def get_reports(request):
+    handler = AsyncReportsHandler(request.app.state.pool)
+    payload, status = await handler.get_all_reports(
+        int_arg(request, "page", 1),
+        int_arg(request, "limit", 10),
+        request.query_params.get("sort"),
+        int_arg(request, "admin_id"),
+        int_arg(request, "location_id"),
+        request.query_params.get("city"),
+        request.query_params.get("fields"),
+    )
+    return render(request, payload, status)
+
+
+@observe_async("/reports/<int:report_id>")
+async def get_report(request):
+    handler = AsyncReportsHandler(request.app.state.pool)
+    payload, status = await handler.get_report_by_id(request.path_params["report_id"])
+    return render(request, payload, status, negotiable=False)
+
+
+@observe_async("/reports/search")
+async def search_reports(request):
+    handler = AsyncReportsHandler(request.app.state.pool)
+    payload, status = await handler.search_reports(
+        request.query_params.get("q", ""),
+        int_arg(request, "page", 1),
+        int_arg(request, "limit", 10),
+        request.query_params.get("status"),
+        request.query_params.get("category"),
+        request.query_params.get("sort"),
+        int_arg(request, "admin_id"),
+        int_arg(request, "location_id"),
+        request.query_params.get("city"),
+        request.query_params.get("fields"),
+    )
+    return render(request, payload, status)
+
+
+@observe_async("/reports/events")
+async def report_events(request):
+    """
+    text/event-stream of newly created reports:
+        id: 42
+        event: report
+        data: {...same shape as GET /reports/42...}
+    """
+    handler = AsyncReportsHandler(request.app.state.pool)
+    after_id = int_arg(request, "after_id")
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        after_id = int(last_event_id)
+
+    async def events():
+        yield f"retry: {int(REPORT_EVENTS_POLL_SECONDS * 1000)}\n\n"
+        async for report_id, report in handler.stream_new_reports(after_id, int_arg(request, "admin_id")):
+            if await request.is_disconnected():
+                break
+            if report_id is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"id: {report_id}\nevent: report\ndata: {flask_app.json.dumps(report)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -------------------------------------------------------
+# APP SETUP
+# -------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app):
+    app.state.pool = await create_async_pool(ASYNC_DB_POOL_MIN_SIZE, ASYNC_DB_POOL_MAX_SIZE)
+    try:
+        yield
+    finally:
+        await app.state.pool.close()
+
+
+routes = [
+    Route("/reports", get_reports, methods=["GET"]),
+    Route("/reports/search", search_reports, methods=["GET"]),
+    Route("/reports/events", report_events, methods=["GET"]),
+    Route("/reports/{report_id:int}", get_report, methods=["GET"]),
+    # Everything else, including POST /reports, goes to Flask
+    Mount("/", app=WSGIMiddleware(flask_app)),
+]
+
+app = Starlette(
+    routes=routes,
+    lifespan=lifespan,
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        # Leaves already-encoded Flask responses and event streams alone
+        Middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES),
+    ],
+)
@@ -0,0 +1,87 @@
+"""
+Serialization benchmark for a /reports?limit=100 page.
+
+Builds 100 rows in the ReportsDAO layout, maps them with
+ReportsHandler.map_to_dict, and times building the JSON response with Flask's
+stdlib provider and with FastJSONProvider (RFC 822 and ISO 8601 dates).
+No database needed.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_json [--rows 100] [--repeat 2000]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from handler.h_reports import ReportsHandler
+from json_provider import FastJSONProvider, orjson
+
+CATEGORIES = ["pothole", "street_light", "flooding", "sanitation", "fallen_tree"]
+STATUSES = ["open", "in_progress", "resolved", "denied"]
+
+
+def make_rows(n, seed=4151):
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    rows = []
+    for i in range(1, n + 1):
+        created = base + timedelta(minutes=rng.randint(0, 400_000))
+        status = rng.choice(STATUSES)
+        rows.append(
+            (
+                i,
+                f"Report {i}: {rng.choice(CATEGORIES).replace('_', ' ')} near the plaza",
+                "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * rng.randint(1, 8),
+                status,
+                rng.choice(CATEGORIES),
+                rng.randint(1, 500),
+                rng.randint(1, 20) if status != "open" else None,
+                rng.randint(1, 20) if status == "resolved" else None,
+                created,
+                created + timedelta(days=rng.randint(1, 30)) if status == "resolved" else None,
+                rng.randint(1, 300),
+                rng.choice(["Mayagüez", "San Juan", "Ponce", "Aguadilla"]),
+                f"/uploads/{i:02x}/00/{i:064x}.jpg",
+                rng.randint(0, 5),
+            )
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON providers on a reports page")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    handler = ReportsHandler()
+    reports = [handler.map_to_dict(row) for row in make_rows(args.rows)]
+    payload = {"reports": reports, "page": 1, "total_pages": 12, "total": args.rows * 12}
+
+    app = Flask(__name__)
+    providers = {
+        "stdlib": DefaultJSONProvider(app),
+        "fast": FastJSONProvider(app, datetime_format="http"),
+        "fast-iso": FastJSONProvider(app, datetime_format="iso"),
+    }
+    if orjson is None:
+        print("orjson is not installed: 'fast' falls back to the stdlib encoder")
+
+    results = {}
+    with app.app_context():
+        for name, provider in providers.items():
+            body = provider.response(payload).get_data()
+            seconds = min(timeit.repeat(lambda: provider.response(payload), number=args.repeat, repeat=3))
+            results[name] = seconds / args.repeat * 1e6
+            print(f"{name:>8}: {results[name]:8.1f} us/response  ({len(body)} bytes)")
+
+    for name in ("fast", "fast-iso"):
+        print(f"{name} speedup: {results['stdlib'] / results[name]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
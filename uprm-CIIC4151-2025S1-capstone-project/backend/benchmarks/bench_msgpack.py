@@ -0,0 +1,62 @@
+"""
+JSON vs MessagePack for a /reports page: payload size (raw and gzipped) and
+decode time. Python decoders stand in for the app's; the ratio is what
+matters.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_msgpack [--rows 100] [--repeat 2000] [--fields title,status,city]
+"""
+import argparse
+import gzip
+import json
+import timeit
+
+from flask import Flask
+
+from benchmarks.bench_json import make_rows
+from handler.h_reports import ReportsHandler
+from json_provider import FastJSONProvider, msgpack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON and MessagePack payloads")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--fields", help="simulate ?fields= by keeping only these keys")
+    args = parser.parse_args()
+
+    if msgpack is None:
+        raise SystemExit("msgpack is not installed (pip install msgpack)")
+
+    handler = ReportsHandler()
+    reports = [handler.map_to_dict(row) for row in make_rows(args.rows)]
+    if args.fields:
+        keep = {"id", *args.fields.split(",")}
+        reports = [{k: v for k, v in report.items() if k in keep} for report in reports]
+    payload = {"reports": reports, "currentPage": 1, "totalPages": 12, "totalCount": args.rows * 12}
+
+    provider = FastJSONProvider(Flask(__name__))
+    bodies = {
+        "json": provider.dumps(payload).encode(),
+        "msgpack": provider.dump_msgpack(payload),
+    }
+    decoders = {"json": json.loads, "msgpack": msgpack.unpackb}
+
+    results = {}
+    for name, body in bodies.items():
+        decode = decoders[name]
+        seconds = min(timeit.repeat(lambda: decode(body), number=args.repeat, repeat=3))
+        results[name] = seconds / args.repeat * 1e6
+        print(
+            f"{name:>8}: {len(body):7d} bytes, {len(gzip.compress(body)):6d} gzipped, "
+            f"decode {results[name]:7.1f} us"
+        )
+
+    print(
+        f"msgpack is {len(bodies['msgpack']) / len(bodies['json']):.0%} of the JSON size "
+        f"and decodes {results['json'] / results['msgpack']:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Cold start and per-request framework overhead.
+
+Cold start is the time for a fresh interpreter to import flask_application
+(what a dyno restart or a new gunicorn worker pays before serving). The
+per-request numbers use DB-free routes through the test client, so they
+measure routing, handler setup and response encoding only.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_startup [--runs 10] [--requests 5000]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_APP = "import time; t = time.perf_counter(); import flask_application; print(time.perf_counter() - t)"
+ROUTES = ("/", "/reports/status-options")
+
+
+def cold_start(runs):
+    """Median seconds to import the app in a fresh interpreter."""
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_APP], capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(out.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def per_request(client, path, requests):
+    """Mean microseconds per GET, after a warm-up."""
+    for _ in range(100):
+        client.get(path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and per-request overhead")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"cold start: {cold_start(args.runs) * 1000:7.1f} ms (median of {args.runs} imports)")
+
+    from flask_application import app
+
+    client = app.test_client()
+    for path in ROUTES:
+        print(f"{path:<26} {per_request(client, path, args.requests):7.1f} us/request")
+
+    from dotenv import load_dotenv
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        load_dotenv()
+    print(f"{'load_dotenv()':<26} {(time.perf_counter() - started) * 1000:7.1f} us/call (was paid per DAO)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Throughput of sync vs gevent gunicorn workers on /reports and /reports/search.
+
+Each worker class is started with gunicorn.conf.py on a local port and
+driven by --concurrency client threads for --duration seconds per route.
+Needs gunicorn, gevent and a reachable database (the usual .env settings).
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_workers [--workers 2] [--concurrency 50] [--duration 10]
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROUTES = {
+    "/reports": "/reports?page=1&limit=20",
+    "/reports/search": "/reports/search?q=light&page=1&limit=20",
+}
+
+
+def start_server(worker_class, workers, port):
+    env = dict(
+        os.environ,
+        GUNICORN_WORKER_CLASS=worker_class,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_CMD_ARGS=f"--bind 127.0.0.1:{port} --log-level warning",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "flask_application:app"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"{worker_class} server did not come up on port {port}")
+
+
+def drive(port, path, concurrency, duration):
+    """Returns (latencies in seconds, error count)."""
+    stop_at = time.monotonic() + duration
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def client():
+        nonlocal errors
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, failed = [], 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+            errors += failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and gevent gunicorn workers")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--worker-classes", default="sync,gevent")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.concurrency} concurrent clients, {args.duration:g}s per route")
+    for worker_class in args.worker_classes.split(","):
+        proc = start_server(worker_class, args.workers, args.port)
+        try:
+            for name, path in ROUTES.items():
+                latencies, errors = drive(args.port, path, args.concurrency, args.duration)
+                if not latencies:
+                    print(f"{worker_class:>7} {name:<16} no successful requests ({errors} errors)")
+                    continue
+                latencies.sort()
+                p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+                print(
+                    f"{worker_class:>7} {name:<16} {len(latencies) / args.duration:8.1f} req/s  "
+                    f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  "
+                    f"errors {errors}"
+                )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
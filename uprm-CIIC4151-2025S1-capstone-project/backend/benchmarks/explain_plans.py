@@ -0,0 +1,282 @@
+"""
+Query-plan regression check for the SQL the DAOs issue.
+
+Every DAO case from benchmarks.run_benchmarks, plus the writes and DAOs in
+EXTRA_CASES, is run once against the benchmark dataset with a cursor that
+runs each statement under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) inside a
+savepoint just before running it for real, so a write is planned against the
+rows the case's earlier statements left. commit() is a no-op during capture
+and each case is rolled back, so the dataset is never changed. Each plan is
+reduced to:
+
+  - the tables read by sequential scan
+  - the indexes used
+  - shared buffers touched (hit + read) for the whole statement
+  - rows, planning and execution time (reported, never gated: too noisy)
+
+Full plans go to --output. With --update the summaries become the committed
+baseline (benchmarks/plans/baseline.json). With --check the run is compared
+to that baseline, and the exit status is 1 when a statement:
+
+  - gained a sequential scan on one of WATCHED_TABLES
+  - stopped using an index it used before, and reads that index's table
+    without any index now (switching between equivalent indexes, e.g. for
+    an index-only COUNT(*), flips between identical loads and is only noted)
+  - touched more than --buffer-threshold more buffers (and at least
+    --min-buffers more pages)
+
+so index or query changes in d_reports.py can't silently degrade a plan.
+Buffer counts depend on the data, so compare runs on the same dataset (same
+--reports and seed).
+
+Usage (from the backend/ directory):
+    BENCH_DATABASE_URL=postgresql://localhost/reports_bench \\
+        python -m benchmarks.explain_plans [--generate 100000] (--update | --check)
+
+The committed baseline is taken with --generate 10000 (seed 4151), which is
+what tests/test_query_plans.py checks against.
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.generate_data import bench_dsn, generate
+
+WATCHED_TABLES = ("reports", "report_ratings", "pinned_reports", "users", "location")
+# Only these can run under EXPLAIN
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+BENCH_UPLOAD = "/uploads/00/00/" + "0" * 64 + ".jpg"
+
+# Same shape as run_benchmarks.DAO_CASES; timed there only if read-only, so
+# the writes and the DAOs it leaves out are listed here
+EXTRA_CASES = (
+    ("ReportsDAO.create_report", "dao.d_reports", "ReportsDAO", "create_report",
+     ("Pothole on Calle Luna", "Deep pothole on Calle Luna", "pothole", 1, "San Juan", BENCH_UPLOAD, "power_user")),
+    ("ReportsDAO.update_report[status]", "dao.d_reports", "ReportsDAO", "update_report",
+     ("hot_report", "resolved", None, None, None, None, "admin", "admin", "2025-01-01 00:00:00")),
+    ("ReportsDAO.toggle_report_rating", "dao.d_reports", "ReportsDAO", "toggle_report_rating", ("hot_report", "power_user")),
+    ("ReportsDAO.delete_report", "dao.d_reports", "ReportsDAO", "delete_report", ("hot_report",)),
+    ("UsersDAO.create_user", "dao.d_users", "UsersDAO", "create_user", ("bench-new@example.com", "x")),
+    ("UsersDAO.suspend_user", "dao.d_users", "UsersDAO", "suspend_user", ("power_user",)),
+    ("PinnedReportsDAO.pin_report", "dao.d_pinned_reports", "PinnedReportsDAO", "pin_report", ("power_user", "hot_report")),
+    ("IncidentsDAO.get_incidents_paginated", "dao.d_incidents", "IncidentsDAO", "get_incidents_paginated", (20, 0)),
+    ("IncidentsDAO.get_total_incident_count", "dao.d_incidents", "IncidentsDAO", "get_total_incident_count", ()),
+    ("IncidentsDAO.get_open_reports_for_clustering", "dao.d_incidents", "IncidentsDAO", "get_open_reports_for_clustering", ()),
+    ("IncidentsDAO.get_incident_reports", "dao.d_incidents", "IncidentsDAO", "get_incident_reports", ("incident",)),
+    ("IncidentsDAO.resolve_incident", "dao.d_incidents", "IncidentsDAO", "resolve_incident", ("incident", "admin")),
+    ("IncidentsDAO.refresh_incident_aggregates", "dao.d_incidents", "IncidentsDAO", "refresh_incident_aggregates", ()),
+    ("DepartmentsDAO.get_all_departments_stats", "dao.d_departments", "DepartmentsDAO", "get_all_departments_stats", ()),
+    ("DepartmentsDAO.get_department_with_admin_info", "dao.d_departments", "DepartmentsDAO", "get_department_with_admin_info", ("DTOP",)),
+    ("DepartmentsDAO.update_department", "dao.d_departments", "DepartmentsDAO", "update_department", ("DTOP", "admin")),
+    ("UploadsDAO.register_upload", "dao.d_uploads", "UploadsDAO", "register_upload", ("0" * 64, BENCH_UPLOAD, 1024)),
+    ("UploadsDAO.add_reference", "dao.d_uploads", "UploadsDAO", "add_reference", (BENCH_UPLOAD,)),
+    ("UploadsDAO.release_reference", "dao.d_uploads", "UploadsDAO", "release_reference", (BENCH_UPLOAD,)),
+    ("UploadsDAO.get_referenced_urls", "dao.d_uploads", "UploadsDAO", "get_referenced_urls", ([BENCH_UPLOAD], 24)),
+    ("UploadsDAO.get_variants", "dao.d_uploads", "UploadsDAO", "get_variants", (BENCH_UPLOAD[len("/uploads/"):],)),
+)
+PLANS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plans")
+BASELINE = os.path.join(PLANS_DIR, "baseline.json")
+
+_captured = []
+
+
+def capturing_cursor():
+    """InstrumentedCursor that plans every statement in place before running it."""
+    import psycopg2
+    from psycopg2.extensions import cursor as plain_cursor
+
+    from query_stats import InstrumentedCursor
+
+    class CapturingCursor(InstrumentedCursor):
+        def execute(self, query, vars=None):
+            sql = self.mogrify(query, vars).decode()
+            explain = None
+            if sql.lstrip().upper().startswith(EXPLAINABLE):
+                # plain_cursor.execute: the EXPLAIN isn't one of the DAO's queries
+                plain_cursor.execute(self, "SAVEPOINT explain_plans")
+                try:
+                    plain_cursor.execute(self, f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+                    explain = self.fetchone()[0]
+                except psycopg2.Error as e:
+                    print(f"  EXPLAIN failed: {e}".rstrip())
+                plain_cursor.execute(self, "ROLLBACK TO SAVEPOINT explain_plans")
+            _captured.append((sql, explain))
+            return super().execute(query, vars)
+
+    return CapturingCursor
+
+
+def capture_statements(samples):
+    """{case name: [(bound SQL, EXPLAIN output or None), ...]} for every DAO case."""
+    from benchmarks.run_benchmarks import DAO_CASES
+
+    cursor_class = capturing_cursor()
+    statements = {}
+    for name, module, cls, method, args in DAO_CASES + EXTRA_CASES:
+        args = tuple(samples.get(a, a) if isinstance(a, str) else a for a in args)
+        dao = getattr(importlib.import_module(module), cls)()
+        dao.conn.cursor_factory = cursor_class
+        dao.conn.commit = lambda: None  # every case is rolled back below
+        _captured.clear()
+        try:
+            getattr(dao, method)(*args)
+        except Exception as e:
+            print(f"  {name:<52} ERROR {e}")
+        finally:
+            dao.conn.rollback()
+            dao.conn.close()
+        statements[name] = list(_captured)
+    return statements
+
+
+def summarize_plan(explain):
+    """Reduce EXPLAIN (FORMAT JSON) output to the fields regressions are judged on."""
+    root = explain[0]
+    seq_scans, index_tables = set(), {}
+
+    def walk(node, table=None):
+        table = node.get("Relation Name", table)  # a Bitmap Index Scan's table is its parent's
+        if node["Node Type"].endswith("Seq Scan"):
+            seq_scans.add(table)
+        if "Index Name" in node:
+            index_tables[node["Index Name"]] = table
+        for child in node.get("Plans", ()):
+            walk(child, table if node["Node Type"] in ("Bitmap Heap Scan", "BitmapAnd", "BitmapOr") else None)
+
+    plan = root["Plan"]
+    walk(plan)
+    return {
+        "top_node": plan["Node Type"],
+        "seq_scans": sorted(seq_scans),
+        "indexes": sorted(index_tables),
+        "index_tables": dict(sorted(index_tables.items())),
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "rows": plan.get("Actual Rows"),
+        "planning_ms": round(root.get("Planning Time", 0.0), 3),
+        "execution_ms": round(root.get("Execution Time", 0.0), 3),
+    }
+
+
+def summarize_all(statements):
+    """{'<case>#<n>': fingerprint, summary and full plan} for every planned statement."""
+    from query_stats import fingerprint
+
+    results = {}
+    for name, captured in statements.items():
+        for i, (sql, explain) in enumerate(captured):
+            if explain is None:
+                continue
+            key = f"{name}#{i}"
+            summary = summarize_plan(explain)
+            results[key] = {"fingerprint": fingerprint(sql), "summary": summary, "plan": explain}
+            scans = f" seq:{','.join(summary['seq_scans'])}" if summary["seq_scans"] else ""
+            print(f"  {key:<56} {summary['execution_ms']:9.2f} ms {summary['buffers']:>8} buffers{scans}")
+    return results
+
+
+def compare(baseline, current, buffer_threshold, min_buffers):
+    """Problems (strings) in `current` relative to `baseline`; notes are printed, not returned."""
+    problems = []
+    for key, entry in current.items():
+        old = baseline.get(key)
+        if old is None:
+            print(f"  new statement {key}")
+            continue
+        if old["fingerprint"] != entry["fingerprint"]:
+            print(f"  query text changed for {key}")
+        before, after = old["summary"], entry["summary"]
+
+        new_scans = set(after["seq_scans"]) - set(before["seq_scans"])
+        for table in sorted(new_scans & set(WATCHED_TABLES)):
+            problems.append(f"{key}: new sequential scan on {table}")
+        still_indexed = set(after.get("index_tables", {}).values())
+        for index in sorted(set(before["indexes"]) - set(after["indexes"])):
+            table = before.get("index_tables", {}).get(index)
+            if table and table in still_indexed:
+                print(f"  {key}: {table} read through another index instead of {index}")
+            else:
+                problems.append(f"{key}: no longer uses {index}")
+        grew = after["buffers"] - before["buffers"]
+        if grew >= min_buffers and after["buffers"] > before["buffers"] * (1 + buffer_threshold):
+            problems.append(f"{key}: buffers {before['buffers']} -> {after['buffers']}")
+    for key in sorted(set(baseline) - set(current)):
+        print(f"  statement no longer issued: {key}")
+    return problems
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every DAO statement and flag plan regressions")
+    parser.add_argument("--dsn", help="benchmark database (default: $BENCH_DATABASE_URL)")
+    parser.add_argument("--generate", type=int, metavar="REPORTS", help="reload the dataset with this many reports first")
+    parser.add_argument("--seed", type=int, default=4151)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--output", help="full plans file (default: benchmarks/plans/plans-<commit>.json)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--update", action="store_true", help="write this run's summaries as the baseline")
+    mode.add_argument("--check", action="store_true", help="exit 1 on regressions against the baseline")
+    parser.add_argument("--buffer-threshold", type=float, default=0.5, help="relative buffer growth counted as a regression")
+    parser.add_argument("--min-buffers", type=int, default=100, help="ignore buffer growth smaller than this many pages")
+    args = parser.parse_args()
+
+    dsn = bench_dsn(args.dsn)
+    os.environ["DATABASE_URL"] = dsn  # the DAOs' load_db() reads it at connect time
+    os.environ["SLOW_QUERY_MS"] = "-1"
+    if args.generate:
+        print(f"loading {args.generate} reports ...")
+        generate(dsn, reports=args.generate, seed=args.seed)
+
+    from benchmarks.run_benchmarks import sample_ids
+
+    samples = sample_ids(dsn)
+    print(f"{samples['reports']} reports")
+    results = summarize_all(capture_statements(samples))
+
+    sha = git_revision()
+    run = {
+        "commit": sha,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "reports": samples["reports"],
+        "statements": results,
+    }
+    os.makedirs(PLANS_DIR, exist_ok=True)
+    output = args.output or os.path.join(PLANS_DIR, f"plans-{sha[:10]}.json")
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2, default=str)
+    print(f"plans written to {output}")
+
+    summaries = {key: {"fingerprint": e["fingerprint"], "summary": e["summary"]} for key, e in results.items()}
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump({"commit": sha, "reports": samples["reports"], "statements": summaries}, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"no baseline at {args.baseline}; run with --update first")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("reports") != samples["reports"]:
+            print(f"  warning: baseline was taken on {baseline.get('reports')} reports, this run has {samples['reports']}")
+        problems = compare(baseline["statements"], summaries, args.buffer_threshold, args.min_buffers)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"no plan regressions in {len(summaries)} statements")
+
+
+if __name__ == "__main__":
+    main()
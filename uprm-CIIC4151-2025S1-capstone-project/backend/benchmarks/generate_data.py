@@ -0,0 +1,373 @@
+"""
+Synthetic dataset at production scale for benchmarks.
+
+Recreates the schema from tables.sql, empties it, and bulk-loads (COPY)
+users, locations, reports, ratings and pins with a deterministic seed and a
+realistic shape:
+
+  - cities weighted by population (San Juan, Bayamon, Carolina, Ponce ...
+    get most reports), locations jittered around each municipality
+  - a skewed category mix (potholes and street lights dominate)
+  - a few power users filing most reports, growth towards the present
+  - per-category resolution times (lognormal), so older reports are mostly
+    resolved and recent ones mostly open
+  - some reports repeating a recent one nearby, as neighbours report the
+    same problem (these become incidents)
+  - a heavy-tailed ratings/pins distribution: most reports get none, a
+    handful of "hot" reports get hundreds
+
+Secondary indexes are dropped during the load and rebuilt afterwards, the
+open reports are grouped into incidents by jobs.cluster_incidents, then the
+tables are ANALYZEd. Every table in tables.sql is dropped and
+recreated, so the target is never taken from DATABASE_URL: pass --dsn or
+set BENCH_DATABASE_URL.
+
+Usage (from the backend/ directory):
+    BENCH_DATABASE_URL=postgresql://localhost/reports_bench \\
+        python -m benchmarks.generate_data [--reports 100000] [--seed 4151]
+"""
+import argparse
+import io
+import math
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+
+# constants and load are imported where they are used: run_benchmarks and
+# explain_plans import this module before setting the environment those read
+
+TABLES_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tables.sql")
+LOADED_TABLES = ("users", "administrators", "department_admins", "location", "reports", "report_ratings", "pinned_reports")
+
+# Rough share of reports per category
+CATEGORY_WEIGHTS = {
+    "pothole": 24,
+    "street_light": 16,
+    "road_damage": 10,
+    "sanitation": 9,
+    "water_outage": 8,
+    "flooding": 6,
+    "fallen_tree": 6,
+    "traffic_signal": 5,
+    "pipe_leak": 5,
+    "wandering_waste": 4,
+    "electrical_hazard": 3,
+    "sinkhole": 2,
+    "other": 2,
+}
+# Median days to resolve, by category
+RESOLUTION_DAYS = {
+    "pothole": 14,
+    "street_light": 6,
+    "road_damage": 21,
+    "sanitation": 4,
+    "water_outage": 2,
+    "flooding": 5,
+    "fallen_tree": 3,
+    "traffic_signal": 2,
+    "pipe_leak": 7,
+    "wandering_waste": 5,
+    "electrical_hazard": 1,
+    "sinkhole": 45,
+    "other": 10,
+}
+CATEGORY_TITLES = {
+    "pothole": ("Pothole", "Deep pothole", "Potholes"),
+    "street_light": ("Broken street light", "Street light out", "Flickering street light"),
+    "road_damage": ("Cracked road", "Road damage", "Collapsed shoulder"),
+    "sanitation": ("Garbage not collected", "Overflowing bins", "Illegal dumping"),
+    "water_outage": ("No water service", "Water outage", "Low water pressure"),
+    "flooding": ("Street flooding", "Flooded intersection", "Blocked storm drain"),
+    "fallen_tree": ("Fallen tree", "Tree blocking road", "Broken branches"),
+    "traffic_signal": ("Traffic light not working", "Traffic signal stuck on red", "Damaged traffic signal"),
+    "pipe_leak": ("Water pipe leak", "Burst pipe", "Leaking hydrant"),
+    "wandering_waste": ("Loose debris", "Abandoned tires", "Scattered trash"),
+    "electrical_hazard": ("Downed power line", "Exposed wiring", "Sparking transformer"),
+    "sinkhole": ("Sinkhole", "Ground collapse", "Sinkhole forming"),
+    "other": ("Abandoned vehicle", "Graffiti", "Noise complaint"),
+}
+STREETS = (
+    "Calle Luna", "Calle Sol", "Avenida Ponce de Leon", "Calle Loiza", "Avenida Roosevelt",
+    "Calle McKinley", "Carretera 2", "Carretera 3", "Avenida Las Americas", "Calle Comercio",
+    "Calle Post", "Avenida Hostos", "Calle San Francisco", "Calle Fortaleza", "Avenida Muñoz Rivera",
+)
+DESCRIPTION_TAILS = (
+    "It has been like this for several days.",
+    "Neighbors have reported it before with no response.",
+    "It is dangerous for cars and pedestrians, especially at night.",
+    "Please send someone to inspect it as soon as possible.",
+    "The problem gets worse every time it rains.",
+)
+# Population in thousands (2020 census) for the largest municipalities; the rest get DEFAULT_POPULATION
+POPULATION = {
+    "San Juan": 342, "Bayamon": 185, "Carolina": 154, "Ponce": 137, "Caguas": 127,
+    "Guaynabo": 89, "Arecibo": 87, "Toa Baja": 75, "Mayaguez": 73, "Trujillo Alto": 67,
+    "Toa Alta": 67, "Humacao": 50, "Dorado": 35, "Vega Baja": 54, "Cayey": 41,
+}
+DEFAULT_POPULATION = 25
+DEPARTMENTS = ("DTOP", "LUMA", "AAA", "DDS")
+# Share of reports repeating the one before (same problem, place and category,
+# within a day): the duplicates jobs.cluster_incidents groups into incidents
+FOLLOW_UP_SHARE = 0.15
+
+
+def bench_dsn(dsn=None):
+    dsn = dsn or os.getenv("BENCH_DATABASE_URL")
+    if not dsn:
+        raise SystemExit("Set BENCH_DATABASE_URL (or pass --dsn); the benchmark database is wiped and reloaded")
+    return dsn
+
+
+def load_cities():
+    """(city, latitude, longitude) for every municipality seeded by tables.sql."""
+    with open(TABLES_SQL) as f:
+        sql = f.read()
+    return [
+        (city, float(lat), float(lon))
+        for city, lat, lon in re.findall(r"\('([^']+)',\s*(-?\d+\.\d+),\s*(-?\d+\.\d+)\)", sql)
+    ]
+
+
+def copy_value(value):
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value).replace("\\", "\\\\").replace("\t", " ").replace("\n", " ")
+
+
+def copy_rows(cur, table, columns, rows):
+    """COPY an iterable of tuples into `table`; returns the row count."""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(copy_value(v) for v in row))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return count
+
+
+def secondary_indexes(cur):
+    """(name, definition) of indexes on the loaded tables that no constraint depends on."""
+    cur.execute(
+        """
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema()
+          AND i.tablename = ANY(%s)
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c
+              WHERE c.conindid = format('%%I.%%I', i.schemaname, i.indexname)::regclass
+          )
+        """,
+        (list(LOADED_TABLES),),
+    )
+    return cur.fetchall()
+
+
+def heavy_tail(rng, scale, cap):
+    """Mostly 0-2, occasionally hundreds: a Pareto draw shifted to start at 0."""
+    if rng.random() < 0.55:
+        return 0
+    return min(cap, int(scale * (rng.paretovariate(1.3) - 1)))
+
+
+class Generator:
+    def __init__(self, reports, users, locations, days, seed):
+        self.rng = random.Random(seed)
+        self.reports = reports
+        self.users = users
+        self.locations = locations
+        self.days = days
+        # relative to today, so "last 12 months" style queries see the same shape whenever it runs
+        self.now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.cities = load_cities()
+        self.admins = max(8, users // 500)
+        self.admins_by_department = {d: [] for d in DEPARTMENTS}
+        for admin_id in range(1, self.admins + 1):
+            self.admins_by_department[DEPARTMENTS[(admin_id - 1) % len(DEPARTMENTS)]].append(admin_id)
+        self.categories = list(CATEGORY_WEIGHTS)
+        self.category_weights = list(CATEGORY_WEIGHTS.values())
+        self.location_cities = []
+
+    def user_rows(self):
+        from load import hash_password
+
+        password = hash_password("password123")
+        for user_id in range(1, self.users + 1):
+            created = self.now - timedelta(days=self.days * self.rng.random() ** 0.7)
+            yield (user_id, f"user{user_id}@example.com", password, user_id <= self.admins,
+                   self.rng.random() < 0.01, self.rng.random() < 0.002, created)
+
+    def admin_rows(self):
+        for admin_id in range(1, self.admins + 1):
+            yield admin_id, DEPARTMENTS[(admin_id - 1) % len(DEPARTMENTS)]
+
+    def department_admin_rows(self):
+        for department, admin_ids in self.admins_by_department.items():
+            yield department, admin_ids[0]
+
+    def location_rows(self):
+        weights = [POPULATION.get(city, DEFAULT_POPULATION) for city, _, _ in self.cities]
+        picks = self.rng.choices(self.cities, weights=weights, k=self.locations)
+        for location_id, (city, lat, lon) in enumerate(picks, start=1):
+            self.location_cities.append(city)
+            yield (location_id, city, round(lat + self.rng.uniform(-0.02, 0.02), 6),
+                   round(lon + self.rng.uniform(-0.02, 0.02), 6),
+                   f"{self.rng.choice(STREETS)} {self.rng.randint(1, 999)}", "Puerto Rico")
+
+    def report_chunk(self, first_id, last_id):
+        """Rows for reports [first_id, last_id], plus their ratings and pins."""
+        from constants import CATEGORY_TO_DEPARTMENT
+
+        rng = self.rng
+        reports, ratings, pins = [], [], []
+        previous = None
+        for report_id in range(first_id, last_id + 1):
+            if previous is not None and rng.random() < FOLLOW_UP_SHARE:
+                # someone else reporting the same problem within the day
+                category, location, first_created = previous
+                created = min(self.now, first_created + timedelta(hours=rng.uniform(0, 24)))
+            else:
+                category = rng.choices(self.categories, weights=self.category_weights)[0]
+                # sqrt skews creation towards the present (the app keeps growing)
+                created = self.now - timedelta(days=self.days * (1 - math.sqrt(rng.random())), seconds=rng.randint(0, 86399))
+                location = rng.randint(1, self.locations)
+            previous = category, location, created
+            age_days = (self.now - created).total_seconds() / 86400
+            to_resolve = rng.lognormvariate(math.log(RESOLUTION_DAYS[category]), 0.8)
+
+            department = CATEGORY_TO_DEPARTMENT.get(category)
+            admins = self.admins_by_department.get(department) or self.admins_by_department["DTOP"]
+            validated_by = resolved_by = resolved_at = None
+            if to_resolve < age_days and rng.random() < 0.85:
+                status = "resolved"
+                validated_by = resolved_by = rng.choice(admins)
+                resolved_at = created + timedelta(days=to_resolve)
+            else:
+                roll = rng.random()
+                status = "open" if roll < 0.6 else "in_progress" if roll < 0.85 else "denied" if roll < 0.95 else "closed"
+                if status != "open":
+                    validated_by = rng.choice(admins)
+
+            rating = heavy_tail(rng, 3, min(self.users, 800))
+            title = f"{rng.choice(CATEGORY_TITLES[category])} on {rng.choice(STREETS)}"
+            description = f"{title} in {self.location_cities[location - 1]}. {rng.choice(DESCRIPTION_TAILS)}"
+            image_url = f"/uploads/{report_id % 256:02x}/{report_id:064x}.jpg" if rng.random() < 0.6 else None
+            # a few power users file most reports
+            created_by = int(self.users * rng.random() ** 3) + 1
+
+            reports.append((report_id, title[:100], description, status, category, created_by, validated_by,
+                            resolved_by, created, resolved_at, location, self.location_cities[location - 1],
+                            image_url, rating))
+            for user_id in rng.sample(range(1, self.users + 1), rating):
+                ratings.append((report_id, user_id, created + timedelta(hours=rng.uniform(0, 72))))
+            for user_id in rng.sample(range(1, self.users + 1), min(self.users, rating // 5 + (rng.random() < 0.05))):
+                pins.append((user_id, report_id, created + timedelta(hours=rng.uniform(0, 240))))
+        return reports, ratings, pins
+
+
+def cluster_incidents(dsn):
+    """Group the open reports into incidents with the real job. Returns the incident count."""
+    from jobs.cluster_incidents import run_clustering
+
+    # The job's DAO connects through load_db(), which reads DATABASE_URL
+    previous = os.environ.get("DATABASE_URL")
+    os.environ["DATABASE_URL"] = dsn
+    try:
+        return run_clustering()["incidents"]
+    finally:
+        if previous is None:
+            del os.environ["DATABASE_URL"]
+        else:
+            os.environ["DATABASE_URL"] = previous
+
+
+def generate(dsn, reports=100_000, users=None, locations=None, days=730, seed=4151, chunk=50_000):
+    users = users or max(200, reports // 20)
+    locations = locations or max(200, reports // 10)
+    gen = Generator(reports, users, locations, days, seed)
+    started = time.perf_counter()
+    counts = {}
+
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            with open(TABLES_SQL) as f:
+                cur.execute(f.read())
+            cur.execute(f"TRUNCATE {', '.join(LOADED_TABLES)}, incidents, verifications, uploads, upload_variants RESTART IDENTITY CASCADE")
+            indexes = secondary_indexes(cur)
+            for name, _ in indexes:
+                cur.execute(f'DROP INDEX "{name}"')
+            conn.commit()
+
+            counts["users"] = copy_rows(cur, "users", ("id", "email", "password", "admin", "suspended", "pinned", "created_at"), gen.user_rows())
+            counts["administrators"] = copy_rows(cur, "administrators", ("id", "department"), gen.admin_rows())
+            copy_rows(cur, "department_admins", ("department", "admin_id"), gen.department_admin_rows())
+            counts["locations"] = copy_rows(cur, "location", ("id", "city", "latitude", "longitude", "address", "country"), gen.location_rows())
+            conn.commit()
+
+            counts.update(reports=0, ratings=0, pins=0)
+            for first_id in range(1, reports + 1, chunk):
+                report_rows, rating_rows, pin_rows = gen.report_chunk(first_id, min(reports, first_id + chunk - 1))
+                counts["reports"] += copy_rows(
+                    cur, "reports",
+                    ("id", "title", "description", "status", "category", "created_by", "validated_by", "resolved_by",
+                     "created_at", "resolved_at", "location", "city", "image_url", "rating"),
+                    report_rows,
+                )
+                counts["ratings"] += copy_rows(cur, "report_ratings", ("report_id", "user_id", "created_at"), rating_rows)
+                counts["pins"] += copy_rows(cur, "pinned_reports", ("user_id", "report_id", "pinned_at"), pin_rows)
+                conn.commit()
+                print(f"  {counts['reports']:>9} reports  {time.perf_counter() - started:6.1f}s")
+
+            cur.execute(
+                """
+                UPDATE users SET total_reports = r.n
+                FROM (SELECT created_by, COUNT(*) AS n FROM reports GROUP BY created_by) r
+                WHERE users.id = r.created_by
+                """
+            )
+            for table in ("users", "location", "reports", "report_ratings"):
+                cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}")
+            for _, definition in indexes:
+                cur.execute(definition)
+            conn.commit()
+
+        counts["incidents"] = cluster_incidents(dsn)
+
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"VACUUM ANALYZE {', '.join(LOADED_TABLES)}, incidents")
+    finally:
+        conn.close()
+
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a synthetic dataset into the benchmark database")
+    parser.add_argument("--dsn", help="target database (default: $BENCH_DATABASE_URL)")
+    parser.add_argument("--reports", type=int, default=100_000)
+    parser.add_argument("--users", type=int, help="default: reports / 20")
+    parser.add_argument("--locations", type=int, help="default: reports / 10")
+    parser.add_argument("--days", type=int, default=730, help="history covered by created_at")
+    parser.add_argument("--seed", type=int, default=4151)
+    parser.add_argument("--chunk", type=int, default=50_000, help="reports per COPY batch")
+    args = parser.parse_args()
+
+    counts = generate(bench_dsn(args.dsn), args.reports, args.users, args.locations, args.days, args.seed, args.chunk)
+    print(", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
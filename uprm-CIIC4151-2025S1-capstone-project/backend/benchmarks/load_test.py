@@ -0,0 +1,355 @@
+"""
+Scenario-based HTTP load test against a running server.
+
+Each virtual user repeatedly picks a scenario (weighted like real use) and
+replays the requests the mobile app makes for it, pausing between steps for
+an exponentially distributed think time:
+
+  home_feed      home tab: pinned reports, then scrolling the report feed
+  explore_search explore tab: admin check, first page, then typing a query
+                 (a search goes out whenever the user pauses past the app's
+                 350 ms debounce, and for the final term)
+  report_view    report modal from the feed, with a rating toggle and undo
+  profile_stats  profile tab: user stats, own reports, overview stats
+  admin_triage   an admin's explore tab and pending queue, opening reports
+                 (and with --admin-writes, moving one to in_progress)
+  global_stats   global stats modal: its four stats endpoints
+
+Requests carry the same parameters as the app's, including the admin_id
+it sends for every logged-in user. Latency is reported per route (URL rule, not concrete path) with p50 / p95 /
+p99 and throughput over --duration, so runs against different dyno sizes or
+worker settings give comparable capacity numbers; requests sent during
+--ramp-up are left out. User ids are drawn from 1..--max-user-id
+and admins from 1..--admins, which match benchmarks.generate_data at 100k
+reports; point --url at a server backed by that dataset.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.load_test [--url http://127.0.0.1:5000] [--users 50]
+        [--duration 60] [--think 1.0] [--scenarios explore_search=3,report_view=2]
+        [--no-writes] [--admin-writes] [--json results.json]
+"""
+import argparse
+import gzip
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import quote, urlsplit
+
+# Relative frequency of each flow, roughly how the tabs are used
+DEFAULT_WEIGHTS = {
+    "home_feed": 3,
+    "explore_search": 3,
+    "report_view": 4,
+    "profile_stats": 2,
+    "admin_triage": 1,
+    "global_stats": 1,
+}
+SEARCH_TERMS = ("light", "pothole", "water", "flooding", "tree", "san juan", "calle luna", "garbage", "leak")
+STATUSES = (None, None, "open", "in_progress", "resolved")
+DEBOUNCE = 0.35
+PAGE_SIZE = 10
+
+
+class Stats:
+    """Latencies and errors per route, shared by every virtual user."""
+
+    def __init__(self, measure_from=0.0):
+        # time.monotonic() at the end of ramp-up; anything earlier isn't counted
+        self.measure_from = measure_from
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.statuses = defaultdict(Counter)
+        self.flows = Counter()
+
+    def record(self, route, seconds, status):
+        if time.monotonic() - seconds < self.measure_from:
+            return  # sent during ramp-up, with fewer users than the run is measuring
+        with self.lock:
+            self.statuses[route][status] += 1
+            if status is None or status >= 500:
+                self.errors[route] += 1
+            else:
+                self.latencies[route].append(seconds)
+
+    def flow_done(self, name):
+        if time.monotonic() < self.measure_from:
+            return
+        with self.lock:
+            self.flows[name] += 1
+
+
+class Session:
+    """One virtual user: a keep-alive connection, an identity and a think-time source."""
+
+    def __init__(self, url, stats, rng, think, user_id, admin_id):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = self.connection_class(self.host, self.port, timeout=30)
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think
+        self.user_id = user_id
+        self.admin_id = admin_id
+        self.seen_reports = []
+
+    def request(self, method, route, path, body=None):
+        """Send one request; returns the decoded JSON body or None."""
+        headers = {"Accept-Encoding": "gzip"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.stats.record(f"{method} {route}", time.perf_counter() - started, None)
+            self.conn.close()
+            self.conn = self.connection_class(self.host, self.port, timeout=30)
+            return None
+        self.stats.record(f"{method} {route}", time.perf_counter() - started, response.status)
+        if response.status >= 400:
+            return None
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def get(self, route, path):
+        return self.request("GET", route, path)
+
+    def think(self, scale=1.0):
+        if self.think_time > 0:
+            time.sleep(min(self.rng.expovariate(1 / (self.think_time * scale)), 5 * self.think_time * scale))
+
+    def remember(self, body):
+        """Keep report ids from a list response, for later report views."""
+        ids = report_ids(body)
+        if ids:
+            self.seen_reports = (self.seen_reports + ids)[-50:]
+        return ids
+
+    def some_report(self):
+        return self.rng.choice(self.seen_reports) if self.seen_reports else None
+
+
+def report_ids(body):
+    """Ids from the first list of objects in a response, whatever its key."""
+    if isinstance(body, list):
+        return [item["id"] for item in body if isinstance(item, dict) and "id" in item]
+    if isinstance(body, dict):
+        for value in body.values():
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                return [item["id"] for item in value if "id" in item]
+    return []
+
+
+# -------------------------------------------------------
+# Scenarios
+# -------------------------------------------------------
+def home_feed(s, writes, admin_writes):
+    s.remember(s.get("/pinned-reports", f"/pinned-reports?user_id={s.user_id}&page=1&limit={PAGE_SIZE}"))
+    for page in range(1, s.rng.randint(2, 6) + 1):
+        s.think(0.5)
+        if not s.remember(s.get("/reports", f"/reports?page={page}&limit={PAGE_SIZE}&sort=desc&admin_id={s.user_id}")):
+            break
+
+
+def explore_search(s, writes, admin_writes):
+    s.get("/me/admin", f"/me/admin?user_id={s.user_id}")
+    s.remember(s.get("/reports", f"/reports?page=1&limit={PAGE_SIZE}&sort=desc&admin_id={s.user_id}"))
+    s.think()
+
+    term = s.rng.choice(SEARCH_TERMS)
+    status = s.rng.choice(STATUSES)
+    for i in range(1, len(term) + 1):
+        gap = s.rng.uniform(0.08, 0.5)  # until the next keystroke
+        if s.think_time > 0:
+            time.sleep(min(gap, DEBOUNCE))
+        if i < len(term) and gap < DEBOUNCE:
+            continue
+        path = f"/reports/search?q={quote(term[:i])}&page=1&limit={PAGE_SIZE}&sort=desc&admin_id={s.user_id}"
+        if status:
+            path += f"&status={status}"
+        s.remember(s.get("/reports/search", path))
+
+
+def report_view(s, writes, admin_writes):
+    if not s.seen_reports:
+        s.remember(s.get("/reports", f"/reports?page=1&limit={PAGE_SIZE}&sort=desc&admin_id={s.user_id}"))
+    report_id = s.some_report()
+    if report_id is None:
+        return
+    s.get("/reports/<id>", f"/reports/{report_id}")
+    s.think()
+    if writes:
+        # rate, then undo, so repeated runs leave ratings as they were
+        s.request("POST", "/reports/<id>/toggle-rate", f"/reports/{report_id}/toggle-rate", {"user_id": s.user_id})
+        s.think(0.5)
+        s.request("POST", "/reports/<id>/toggle-rate", f"/reports/{report_id}/toggle-rate", {"user_id": s.user_id})
+
+
+def profile_stats(s, writes, admin_writes):
+    s.get("/stats/user/<id>", f"/stats/user/{s.user_id}")
+    s.remember(s.get("/reports/user/<id>", f"/reports/user/{s.user_id}?page=1&limit={PAGE_SIZE}"))
+    s.get("/stats/overview", "/stats/overview")
+
+
+def admin_triage(s, writes, admin_writes):
+    admin = s.admin_id
+    s.get("/me/admin", f"/me/admin?user_id={admin}")
+    s.remember(s.get("/reports", f"/reports?page=1&limit={PAGE_SIZE}&sort=desc&admin_id={admin}"))
+    pending = s.remember(s.get("/admin/reports/pending", f"/admin/reports/pending?page=1&limit={PAGE_SIZE}"))
+    for report_id in pending[: s.rng.randint(1, 3)]:
+        s.think()
+        s.get("/reports/<id>", f"/reports/{report_id}")
+        if admin_writes:
+            s.request("PUT", "/reports/<id>/status", f"/reports/{report_id}/status", {"status": "in_progress", "admin_id": admin})
+
+
+def global_stats(s, writes, admin_writes):
+    s.get("/stats/top-categories-percentage", "/stats/top-categories-percentage")
+    s.get("/stats/monthly-report-volume", "/stats/monthly-report-volume")
+    s.get("/stats/resolution-rate-by-department", "/stats/resolution-rate-by-department")
+    s.get("/stats/avg-resolution-time-by-department", "/stats/avg-resolution-time-by-department")
+
+
+SCENARIOS = {
+    "home_feed": home_feed,
+    "explore_search": explore_search,
+    "report_view": report_view,
+    "profile_stats": profile_stats,
+    "admin_triage": admin_triage,
+    "global_stats": global_stats,
+}
+
+
+# -------------------------------------------------------
+# Runner
+# -------------------------------------------------------
+def virtual_user(args, weights, stats, stop_at, seed):
+    rng = random.Random(seed)
+    session = Session(
+        args.url, stats, rng, args.think,
+        user_id=rng.randint(args.admins + 1, args.max_user_id),
+        admin_id=rng.randint(1, args.admins),
+    )
+    names, scenario_weights = list(weights), list(weights.values())
+    while time.monotonic() < stop_at:
+        name = rng.choices(names, weights=scenario_weights)[0]
+        SCENARIOS[name](session, not args.no_writes, args.admin_writes)
+        stats.flow_done(name)
+        session.think()
+    session.conn.close()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+
+def summarize(stats, elapsed):
+    routes = {}
+    for route in sorted(set(stats.latencies) | set(stats.errors)):
+        latencies = sorted(stats.latencies.get(route, ()))
+        entry = {
+            "requests": len(latencies) + stats.errors[route],
+            "errors": stats.errors[route],
+            "rps": round(len(latencies) / elapsed, 2),
+            "statuses": {str(k): v for k, v in stats.statuses[route].items()},
+        }
+        if latencies:
+            entry.update(
+                p50_ms=round(percentile(latencies, 0.50) * 1000, 1),
+                p95_ms=round(percentile(latencies, 0.95) * 1000, 1),
+                p99_ms=round(percentile(latencies, 0.99) * 1000, 1),
+                max_ms=round(latencies[-1] * 1000, 1),
+            )
+        routes[route] = entry
+    total = sum(entry["requests"] for entry in routes.values())
+    errors = sum(entry["errors"] for entry in routes.values())
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "requests": total,
+        "errors": errors,
+        "rps": round((total - errors) / elapsed, 2),
+        "flows": dict(stats.flows),
+        "routes": routes,
+    }
+
+
+def parse_weights(spec):
+    if not spec:
+        return dict(DEFAULT_WEIGHTS)
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the app's user flows against a running server")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which users start (not measured)")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time in seconds (0 = none)")
+    parser.add_argument("--scenarios", help="name=weight,... (default: all, weighted like real use)")
+    parser.add_argument("--max-user-id", type=int, default=5000)
+    parser.add_argument("--admins", type=int, default=10)
+    parser.add_argument("--no-writes", action="store_true", help="skip rating toggles")
+    parser.add_argument("--admin-writes", action="store_true", help="let admin triage change report status")
+    parser.add_argument("--seed", type=int, default=4151)
+    parser.add_argument("--label", help="free-form tag stored in the JSON results, e.g. the dyno size")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    weights = parse_weights(args.scenarios)
+    started = time.monotonic()
+    stats = Stats(measure_from=started + args.ramp_up)
+    stop_at = stats.measure_from + args.duration
+    print(f"{args.users} users, think {args.think:g}s, {args.duration:g}s (+{args.ramp_up:g}s ramp-up) against {args.url}")
+
+    threads = []
+    for i in range(args.users):
+        thread = threading.Thread(target=virtual_user, args=(args, weights, stats, stop_at, args.seed + i), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if args.ramp_up > 0:
+            time.sleep(args.ramp_up / args.users)
+    for thread in threads:
+        thread.join()
+
+    results = summarize(stats, time.monotonic() - stats.measure_from)
+    print(f"\n{'route':<48} {'reqs':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for route, entry in results["routes"].items():
+        if "p50_ms" in entry:
+            print(f"{route:<48} {entry['requests']:>7} {entry['rps']:>7.1f} {entry['p50_ms']:>6.1f}ms "
+                  f"{entry['p95_ms']:>6.1f}ms {entry['p99_ms']:>6.1f}ms {entry['errors']:>7}")
+        else:
+            print(f"{route:<48} {entry['requests']:>7} {'-':>7} {'-':>8} {'-':>8} {'-':>8} {entry['errors']:>7}")
+    print(f"\ntotal {results['requests']} requests, {results['rps']:.1f} req/s, {results['errors']} errors")
+    print("flows: " + ", ".join(f"{name}={count}" for name, count in sorted(results["flows"].items())))
+
+    if args.json:
+        results.update(label=args.label, config={k: v for k, v in vars(args).items() if k != "json"})
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+DAO and endpoint timings at several dataset sizes, written to JSON so runs
+can be compared across commits.
+
+For each size in --sizes the benchmark database is reloaded with
+benchmarks.generate_data (skip with --no-generate to time whatever is loaded),
+then every read-only DAO method below is called --repeat times on one
+connection, and every endpoint is requested --repeat times through the Flask
+test client (routing, handler, DAO, pooled connection and serialization; no
+network). Each entry records min / p50 / p95 / mean milliseconds, and for
+endpoints the number of SQL statements per request.
+
+Usage (from the backend/ directory):
+    BENCH_DATABASE_URL=postgresql://localhost/reports_bench \\
+        python -m benchmarks.run_benchmarks [--sizes 10000,100000,1000000] [--repeat 20]
+            [--output results.json] [--compare baseline.json [--threshold 0.2]]
+
+With --compare, p50s are compared against an earlier results file and the
+exit status is 1 if any entry got slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.generate_data import bench_dsn, generate
+
+# (name, DAO module, DAO class, method, args); args may name a sample from sample_ids()
+DAO_CASES = (
+    ("ReportsDAO.get_reports_paginated", "dao.d_reports", "ReportsDAO", "get_reports_paginated", (20, 0)),
+    ("ReportsDAO.get_reports_paginated[deep]", "dao.d_reports", "ReportsDAO", "get_reports_paginated", (20, "deep_offset")),
+    ("ReportsDAO.get_reports_paginated[city]", "dao.d_reports", "ReportsDAO", "get_reports_paginated", (20, 0, None, None, None, "San Juan")),
+    ("ReportsDAO.get_total_report_count", "dao.d_reports", "ReportsDAO", "get_total_report_count", ()),
+    ("ReportsDAO.search_reports", "dao.d_reports", "ReportsDAO", "search_reports", ("light", None, None, 20, 0)),
+    ("ReportsDAO.search_reports[status+category]", "dao.d_reports", "ReportsDAO", "search_reports", (None, "open", "pothole", 20, 0)),
+    ("ReportsDAO.get_report_by_id", "dao.d_reports", "ReportsDAO", "get_report_by_id", ("hot_report",)),
+    ("ReportsDAO.get_report_rating_stats", "dao.d_reports", "ReportsDAO", "get_report_rating_stats", ("hot_report",)),
+    ("ReportsDAO.get_user_rating_status", "dao.d_reports", "ReportsDAO", "get_user_rating_status", ("hot_report", "power_user")),
+    ("ReportsDAO.get_reports_by_user", "dao.d_reports", "ReportsDAO", "get_reports_by_user", ("power_user", 20, 0)),
+    ("ReportsDAO.get_overview_stats", "dao.d_reports", "ReportsDAO", "get_overview_stats", ()),
+    ("ReportsDAO.get_department_stats", "dao.d_reports", "ReportsDAO", "get_department_stats", ("DTOP",)),
+    ("ReportsDAO.get_admin_dashboard", "dao.d_reports", "ReportsDAO", "get_admin_dashboard", ()),
+    ("ReportsDAO.get_pending_reports", "dao.d_reports", "ReportsDAO", "get_pending_reports", (20, 0)),
+    ("ReportsDAO.get_assigned_reports", "dao.d_reports", "ReportsDAO", "get_assigned_reports", ("admin", 20, 0)),
+    ("ReportsDAO.search_cities", "dao.d_reports", "ReportsDAO", "search_cities", ("San", 20, True, True)),
+    ("ReportsDAO.find_duplicate_candidates", "dao.d_reports", "ReportsDAO", "find_duplicate_candidates",
+     ("pothole", 18.463203, -66.114757, "Pothole on Calle Luna", "Deep pothole on Calle Luna", 150, 72, 0.3)),
+    ("UsersDAO.get_user_by_email", "dao.d_users", "UsersDAO", "get_user_by_email", ("power_user_email",)),
+    ("UsersDAO.get_user_stats", "dao.d_users", "UsersDAO", "get_user_stats", ("power_user",)),
+    ("PinnedReportsDAO.get_pinned_reports_by_user", "dao.d_pinned_reports", "PinnedReportsDAO", "get_pinned_reports_by_user", ("power_user", 20, 0)),
+    ("LocationsDAO.find_nearest_location", "dao.d_locations", "LocationsDAO", "find_nearest_location", (18.463203, -66.114757, 50)),
+    ("AdministratorsDAO.get_admin_info_for_user", "dao.d_administrators", "AdministratorsDAO", "get_admin_info_for_user", ("admin",)),
+    ("GlobalStatsDAO.avg_resolution_days", "dao.d_global_stats", "GlobalStatsDAO", "avg_resolution_days", ()),
+    ("GlobalStatsDAO.resolution_rate_by_department", "dao.d_global_stats", "GlobalStatsDAO", "resolution_rate_by_department", ()),
+    ("GlobalStatsDAO.avg_resolution_time_by_department", "dao.d_global_stats", "GlobalStatsDAO", "avg_resolution_time_by_department", ()),
+    ("GlobalStatsDAO.monthly_report_volume", "dao.d_global_stats", "GlobalStatsDAO", "monthly_report_volume", (12,)),
+    ("GlobalStatsDAO.top_categories_percentage", "dao.d_global_stats", "GlobalStatsDAO", "top_categories_percentage", (5,)),
+)
+
+ENDPOINTS = (
+    "/reports?page=1&limit=20",
+    "/reports?page={deep_page}&limit=20",
+    "/reports?page=1&limit=20&city=San%20Juan",
+    "/reports/search?q=light&page=1&limit=20",
+    "/reports/search?status=open&category=pothole&page=1&limit=20",
+    "/reports/{hot_report}",
+    "/reports/{hot_report}/rating",
+    "/reports/user/{power_user}",
+    "/stats/user/{power_user}",
+    "/users/{power_user}/pinned-reports",
+    "/admin/dashboard",
+    "/admin/reports/pending?page=1&limit=20",
+    "/stats/overview",
+    "/stats/avg-resolution-time-by-department",
+    "/stats/resolution-rate-by-department",
+    "/stats/monthly-report-volume?months=12",
+)
+
+
+def sample_ids(dsn):
+    """Representative ids in the loaded dataset: the most rated report, a heavy reporter, an admin, the largest incident."""
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM reports")
+            reports = cur.fetchone()[0]
+            cur.execute("SELECT id FROM reports ORDER BY rating DESC, id LIMIT 1")
+            hot_report = cur.fetchone()[0]
+            cur.execute("SELECT id, email FROM users WHERE NOT admin ORDER BY total_reports DESC, id LIMIT 1")
+            power_user, email = cur.fetchone()
+            cur.execute("SELECT id FROM administrators ORDER BY id LIMIT 1")
+            admin = cur.fetchone()[0]
+            cur.execute("SELECT id FROM incidents WHERE status = 'open' ORDER BY report_count DESC, id LIMIT 1")
+            incident = cur.fetchone()
+    finally:
+        conn.close()
+    return {
+        "reports": reports,
+        "hot_report": hot_report,
+        "power_user": power_user,
+        "power_user_email": email,
+        "admin": admin,
+        "incident": incident[0] if incident else None,
+        "deep_offset": reports // 2,
+        "deep_page": max(1, reports // 40),
+    }
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "min_ms": round(timings[0] * 1000, 3),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)] * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+    }
+
+
+def time_dao_methods(samples, repeat, warmup=2):
+    import importlib
+
+    results = {}
+    for name, module, cls, method, args in DAO_CASES:
+        args = tuple(samples.get(a, a) if isinstance(a, str) else a for a in args)
+        dao = getattr(importlib.import_module(module), cls)()
+        try:
+            call = getattr(dao, method)
+            timings = []
+            for i in range(warmup + repeat):
+                started = time.perf_counter()
+                call(*args)
+                if i >= warmup:
+                    timings.append(time.perf_counter() - started)
+                dao.conn.rollback()  # don't let one case's snapshot hold up the next
+        except Exception as e:
+            print(f"  {name:<52} ERROR {e}")
+            results[name] = {"error": str(e)}
+            dao.conn.rollback()
+            continue
+        finally:
+            dao.conn.close()
+        results[name] = summarize(timings)
+        print(f"  {name:<52} p50 {results[name]['p50_ms']:9.2f} ms  p95 {results[name]['p95_ms']:9.2f} ms")
+    return results
+
+
+def time_endpoints(app, samples, repeat, warmup=2):
+    client = app.test_client()
+    results = {}
+    for template in ENDPOINTS:
+        path = template.format(**samples)
+        timings, queries, status = [], None, None
+        for i in range(warmup + repeat):
+            started = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            if i >= warmup:
+                timings.append(time.perf_counter() - started)
+            status = response.status_code
+            queries = response.headers.get("X-DB-Query-Count")
+        results[template] = {**summarize(timings), "status": status, "queries": int(queries) if queries else None}
+        print(f"  {template:<52} p50 {results[template]['p50_ms']:9.2f} ms  p95 {results[template]['p95_ms']:9.2f} ms  [{status}]")
+    return results
+
+
+def git_revision():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", None
+
+
+def compare(baseline, current, threshold):
+    """Print p50 changes against a baseline results file; returns the number of regressions."""
+    regressions = 0
+    for size, dataset in current["datasets"].items():
+        old_dataset = baseline.get("datasets", {}).get(size)
+        if old_dataset is None:
+            continue
+        for section in ("dao", "endpoints"):
+            for name, entry in dataset[section].items():
+                old = old_dataset.get(section, {}).get(name)
+                if not old or "p50_ms" not in old or "p50_ms" not in entry or not old["p50_ms"]:
+                    continue
+                change = entry["p50_ms"] / old["p50_ms"] - 1
+                flag = "  REGRESSION" if change > threshold else ""
+                regressions += bool(flag)
+                print(f"{size:>8} {name:<52} {old['p50_ms']:9.2f} -> {entry['p50_ms']:9.2f} ms ({change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time DAO methods and endpoints at several dataset sizes")
+    parser.add_argument("--dsn", help="benchmark database (default: $BENCH_DATABASE_URL)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated report counts")
+    parser.add_argument("--no-generate", action="store_true", help="benchmark the data already loaded")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=4151)
+    parser.add_argument("--output", help="results file (default: bench-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare p50s against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown counted as a regression")
+    args = parser.parse_args()
+
+    dsn = bench_dsn(args.dsn)
+    # Point the app's load_db() at the benchmark database, and have every
+    # response report its query count, before anything imports constants
+    os.environ["DATABASE_URL"] = dsn
+    os.environ["QUERY_STATS_HEADERS"] = "true"
+    os.environ["SLOW_QUERY_MS"] = "-1"
+    from app_factory import create_app
+
+    app = create_app()
+    sha, dirty = git_revision()
+    results = {
+        "commit": sha,
+        "dirty": dirty,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "datasets": {},
+    }
+
+    sizes = [None] if args.no_generate else [int(s) for s in args.sizes.split(",")]
+    for size in sizes:
+        counts = None
+        if size is not None:
+            print(f"loading {size} reports ...")
+            counts = generate(dsn, reports=size, seed=args.seed)
+        samples = sample_ids(dsn)
+        print(f"{samples['reports']} reports (hot report {samples['hot_report']}, power user {samples['power_user']})")
+        results["datasets"][str(samples["reports"])] = {
+            "counts": counts,
+            "samples": samples,
+            "dao": time_dao_methods(samples, args.repeat),
+            "endpoints": time_endpoints(app, samples, args.repeat),
+        }
+
+    output = args.output or f"bench-{sha[:10]}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+gzip / brotli response compression.
+
+Registered as an after_request hook by `init_compression(app)`. The encoding
+is negotiated from Accept-Encoding (brotli preferred when the Brotli package
+is installed). Only text-like bodies of at least COMPRESSION_MIN_BYTES are
+compressed. Files sent with send_file (images) are left alone.
+
+Buffered bodies are compressed once and kept in a small LRU keyed by a hash
+of the body, so identical hot payloads (the first page of /reports, stats)
+skip the compressor on later hits. Streamed responses are compressed chunk by
+chunk and flushed after each one, so streaming endpoints keep streaming.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+from tracing import span
+
+from constants import (
+    COMPRESSION_MIN_BYTES,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHE_ENTRIES,
+    COMPRESSION_CACHE_MAX_BODY,
+)
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/msgpack",
+    "application/javascript",
+    "image/svg+xml",
+    "text/csv",
+}
+
+
+def _is_compressible(mimetype: str | None) -> bool:
+    if not mimetype:
+        return False
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of (body digest, encoding) -> compressed bytes."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache = CompressedBodyCache(COMPRESSION_CACHE_ENTRIES)
+
+
+def choose_encoding(accept_encodings) -> str | None:
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return accept_encodings.best_match(offered)
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic, so equal bodies compress to equal bytes
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_cached(data: bytes, encoding: str) -> bytes:
+    if len(data) > COMPRESSION_CACHE_MAX_BODY:
+        return compress_bytes(data, encoding)
+
+    key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+    compressed = _cache.get(key)
+    if compressed is None:
+        compressed = compress_bytes(data, encoding)
+        _cache.put(key, compressed)
+    return compressed
+
+
+def compress_stream(chunks, encoding: str):
+    """Compress an iterable of bytes, flushing after each chunk so output keeps flowing."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            if chunk:
+                yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def compress_response(response):
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or "Content-Encoding" in response.headers
+        or not _is_compressible(response.mimetype)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_BYTES:
+            return response
+        with span("compress", encoding=encoding, size=len(data)):
+            response.set_data(compress_cached(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    # A strong ETag must differ between encodings of the same resource
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
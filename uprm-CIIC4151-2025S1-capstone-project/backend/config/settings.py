@@ -0,0 +1,27 @@
+"""
+Flask settings, built once from constants (which read the environment and
+.env a single time at import). Pass another class to create_app() to
+override any of them, e.g. in a one-off script.
+"""
+from constants import UPLOAD_FOLDER, UPLOAD_MAX_BYTES
+
+
+class Config:
+    UPLOAD_FOLDER = UPLOAD_FOLDER
+    # Whole-body cap; the file itself is limited to UPLOAD_MAX_BYTES while streaming
+    MAX_CONTENT_LENGTH = UPLOAD_MAX_BYTES + 64 * 1024
+
+    # Route modules under routes/ registered by create_app(), one per subsystem
+    BLUEPRINTS = (
+        "system",
+        "uploads",
+        "reports",
+        "users",
+        "locations",
+        "administrators",
+        "pinned_reports",
+        "incidents",
+        "stats",
+        "metrics",
+        "profiles",
+    )
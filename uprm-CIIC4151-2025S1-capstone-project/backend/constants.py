@@ -1,3 +1,12 @@
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file. This is the only place it
+# happens: everything else reads settings from here, once per process.
+load_dotenv()
+
 # HTTP status codes
 class HTTP_STATUS:
     # Success
@@ -19,6 +28,8 @@ class HTTP_STATUS:
     METHOD_NOT_ALLOWED = 405
     NOT_ACCEPTABLE = 406
     CONFLICT = 409
+    PAYLOAD_TOO_LARGE = 413
+    UNSUPPORTED_MEDIA_TYPE = 415
     UNPROCESSABLE_ENTITY = 422
     TOO_MANY_REQUESTS = 429
 
@@ -53,4 +64,150 @@ CATEGORY_TO_DEPARTMENT = {
 
     # "other" can be None or some default; up to you
     "other": None,
-}
\ No newline at end of file
+}
+
+
+# Location snapping: a new report location within this many meters of an
+# existing `location` row reuses that row instead of inserting a new one.
+LOCATION_SNAP_RADIUS_M = float(os.getenv("LOCATION_SNAP_RADIUS_M", "25"))
+
+# Near-duplicate detection on report submission: open reports of the same
+# category within this radius/time window whose text is at least this
+# similar (pg_trgm similarity, 0-1) are returned as duplicate candidates.
+DUPLICATE_RADIUS_M = float(os.getenv("DUPLICATE_RADIUS_M", "150"))
+DUPLICATE_WINDOW_HOURS = int(os.getenv("DUPLICATE_WINDOW_HOURS", "72"))
+DUPLICATE_MIN_SIMILARITY = float(os.getenv("DUPLICATE_MIN_SIMILARITY", "0.3"))
+
+# Incident clustering: open reports of the same category that are within
+# INCIDENT_RADIUS_M of each other and filed within INCIDENT_WINDOW_HOURS are
+# linked; connected groups of at least INCIDENT_MIN_REPORTS become an incident.
+INCIDENT_RADIUS_M = float(os.getenv("INCIDENT_RADIUS_M", "300"))
+INCIDENT_WINDOW_HOURS = int(os.getenv("INCIDENT_WINDOW_HOURS", "48"))
+INCIDENT_MIN_REPORTS = int(os.getenv("INCIDENT_MIN_REPORTS", "2"))
+
+# Image types accepted by /upload
+ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+
+# Responsive images: widths (px) generated for every upload, in each format.
+# Originals are never upscaled, so small photos only get the widths below them.
+THUMBNAIL_WIDTHS = tuple(
+    int(w) for w in os.getenv("THUMBNAIL_WIDTHS", "160,480,960").split(",") if w.strip()
+)
+THUMBNAIL_FORMATS = ("webp", "jpg")
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+# Generated variants per upload are looked up in upload_variants and the
+# answers for this many uploads are kept in memory by each worker
+THUMBNAIL_LOOKUP_CACHE_ENTRIES = int(os.getenv("THUMBNAIL_LOOKUP_CACHE_ENTRIES", "4096"))
+
+# Named sizes accepted by /uploads/<file>?variant=...
+IMAGE_VARIANTS = {"thumb": 160, "card": 480, "large": 960}
+
+# Where uploaded images live on disk (served under /uploads/)
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads"))
+
+# Streaming uploads: bytes read per chunk, bytes kept in memory before the
+# temp file spills to disk, and the hard per-file size limit.
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(256 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Resumable uploads: largest chunk accepted per PUT, and how long an unfinished
+# session is kept before its partial file is purged.
+UPLOAD_SESSION_MAX_CHUNK_BYTES = int(os.getenv("UPLOAD_SESSION_MAX_CHUNK_BYTES", str(2 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+# How /uploads/<file> bodies are sent:
+#   "flask"      - streamed by the worker (local development)
+#   "x-accel"    - nginx: X-Accel-Redirect to UPLOAD_ACCEL_PREFIX + filename
+#   "x-sendfile" - Apache/lighttpd: X-Sendfile with the absolute path
+UPLOAD_SERVE_MODE = os.getenv("UPLOAD_SERVE_MODE", "flask").lower()
+UPLOAD_ACCEL_PREFIX = os.getenv("UPLOAD_ACCEL_PREFIX", "/protected-uploads/")
+# Cache lifetime for legacy (non content-addressed) upload names
+UPLOAD_LEGACY_MAX_AGE = int(os.getenv("UPLOAD_LEGACY_MAX_AGE", "3600"))
+
+# Orphaned-upload GC: files younger than this are left alone, since a report
+# referencing a freshly uploaded image may still be on its way.
+UPLOAD_GC_GRACE_HOURS = int(os.getenv("UPLOAD_GC_GRACE_HOURS", "24"))
+
+# Where upload bytes are kept: "local" (UPLOAD_FOLDER) or "s3" (any
+# S3-compatible store; point S3_ENDPOINT_URL at MinIO for local testing).
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION") or None
+# Public base for object URLs (CDN or public bucket); empty means presigned GETs
+S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL", "").rstrip("/")
+S3_PRESIGN_EXPIRES = int(os.getenv("S3_PRESIGN_EXPIRES", "900"))
+
+# JSON responses: "http" keeps Flask's RFC 822 dates ("Tue, 14 Oct 2025
+# 10:00:00 GMT") that the app already parses; "iso" emits ISO 8601, which the
+# fast encoder writes natively.
+JSON_DATETIME_FORMAT = os.getenv("JSON_DATETIME_FORMAT", "http").lower()
+
+# Response compression: bodies smaller than COMPRESSION_MIN_BYTES go out as-is;
+# up to COMPRESSION_CACHE_ENTRIES compressed bodies are kept in memory so a hot
+# payload is compressed once rather than on every request.
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", str(1024 * 1024)))
+
+# ASGI serving mode (asgi_application.py): asyncpg pool size per worker, and
+# how often / how long the /reports/events stream polls for new reports.
+ASYNC_DB_POOL_MIN_SIZE = int(os.getenv("ASYNC_DB_POOL_MIN_SIZE", "2"))
+ASYNC_DB_POOL_MAX_SIZE = int(os.getenv("ASYNC_DB_POOL_MAX_SIZE", "10"))
+REPORT_EVENTS_POLL_SECONDS = float(os.getenv("REPORT_EVENTS_POLL_SECONDS", "2"))
+REPORT_EVENTS_MAX_SECONDS = int(os.getenv("REPORT_EVENTS_MAX_SECONDS", "300"))
+
+# psycopg2 connection pool, per worker process. Inside a request each DAO
+# takes its own pooled connection, all returned when the request ends; a
+# request waits up to DB_POOL_TIMEOUT seconds for its first one, and its
+# further DAOs open a short-lived overflow connection when the pool is empty,
+# at most DB_POOL_MAX_OVERFLOW at a time per worker (past that they wait for
+# the pool as well). DB_POOL_MAX_SIZE=0 turns pooling off (a fresh connection
+# per DAO, as before). The most the web tier can open is
+# workers x (DB_POOL_MAX_SIZE + DB_POOL_MAX_OVERFLOW), 2 x (10 + 5) = 30 with
+# the defaults; keep that, plus the jobs' connections, below the server's
+# max_connections.
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Dedicated connections a request's DAOs leave open are closed at teardown
+# and reported: "warn" logs them, "raise" also raises ConnectionLeakError
+# (use it in tests and CI), "off" skips the check.
+DB_LEAK_MODE = os.getenv("DB_LEAK_MODE", "warn").lower()
+
+# /metrics (Prometheus). When METRICS_TOKEN is set, scrapers must send
+# "Authorization: Bearer <token>".
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Query instrumentation (query_stats.py): statements slower than this are
+# logged (-1 turns the log off). Per-request query count / DB time headers
+# are sent in debug mode, or always with QUERY_STATS_HEADERS=true.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "false").lower() in ("1", "true", "yes")
+
+# Request tracing (tracing.py). TRACE_SAMPLE_RATE is the fraction of
+# requests traced; TRACE_SLOW_MS > 0 also keeps every trace slower than that.
+# TRACE_EXPORTER: "file" (JSON lines in TRACE_FILE), "otlp" or "none".
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(tempfile.gettempdir(), "reports-api-traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "reports-api")
+
+# Request profiling (profiling.py). A request is profiled when it sends
+# "X-Profile: <PROFILE_TOKEN>", or at random for PROFILE_SAMPLE_RATE of
+# requests to PROFILE_ROUTES (comma-separated URL rules; empty = all).
+# PROFILE_TOKEN also guards GET /profiles; with it unset both are disabled.
+# PROFILE_FORMAT: "collapsed" (.folded) or "speedscope".
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_ROUTES = tuple(r.strip() for r in os.getenv("PROFILE_ROUTES", "").split(",") if r.strip())
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "collapsed").lower()
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "reports-api-profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
@@ -1,10 +1,10 @@
-from dotenv import load_dotenv
 from load import load_db
+from tracing import traced_class
 
 
+@traced_class
 class AdministratorsDAO:
     def __init__(self):
-        load_dotenv()
         self.conn = load_db()
 
     # -------------------------------------------------------
@@ -1,11 +1,11 @@
-from dotenv import load_dotenv
 from load import load_db
+from tracing import traced_class
 
 
+@traced_class
 class DepartmentsDAO:
 
     def __init__(self):
-        load_dotenv()
         self.conn = load_db()
 
     def get_all_departments(self):
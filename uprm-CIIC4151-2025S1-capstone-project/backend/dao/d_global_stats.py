@@ -1,5 +1,7 @@
 from load import load_db
 from constants import CATEGORY_TO_DEPARTMENT
+from tracing import traced_class
+@traced_class
 class GlobalStatsDAO:
     def __init__(self): self.conn = load_db()
 
@@ -0,0 +1,223 @@
+from psycopg2.extras import execute_values
+from load import load_db
+from tracing import traced_class
+
+
+@traced_class
+class IncidentsDAO:
+    def __init__(self):
+        self.conn = load_db()
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def get_incidents_paginated(
+        self,
+        limit: int,
+        offset: int,
+        status: str | None = "open",
+        allowed_categories: list[str] | None = None,
+    ):
+        """
+        Row shape:
+          0 id, 1 category, 2 status, 3 latitude, 4 longitude, 5 report_count,
+          6 first_report_at, 7 last_report_at, 8 created_at, 9 resolved_by, 10 resolved_at
+        """
+        where = []
+        params: list = []
+        if status:
+            where.append("status = %s")
+            params.append(status)
+        if allowed_categories:
+            where.append("category = ANY(%s)")
+            params.append(allowed_categories)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+        query = f"""
+            SELECT id, category, status, latitude, longitude, report_count,
+                   first_report_at, last_report_at, created_at, resolved_by, resolved_at
+            FROM incidents
+            {where_sql}
+            ORDER BY report_count DESC, last_report_at DESC, id DESC
+            LIMIT %s OFFSET %s
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, params + [limit, offset])
+            return cur.fetchall()
+
+    def get_total_incident_count(self, status: str | None = "open", allowed_categories: list[str] | None = None):
+        where = []
+        params: list = []
+        if status:
+            where.append("status = %s")
+            params.append(status)
+        if allowed_categories:
+            where.append("category = ANY(%s)")
+            params.append(allowed_categories)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM incidents {where_sql}", params)
+            return cur.fetchone()[0]
+
+    def get_incident_by_id(self, incident_id: int):
+        query = """
+            SELECT id, category, status, latitude, longitude, report_count,
+                   first_report_at, last_report_at, created_at, resolved_by, resolved_at
+            FROM incidents
+            WHERE id = %s
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (incident_id,))
+            return cur.fetchone()
+
+    def get_incident_reports(self, incident_id: int):
+        """Reports belonging to an incident, same row layout as ReportsDAO."""
+        query = """
+            SELECT reports.id, reports.title, reports.description, reports.status, reports.category,
+                   reports.created_by, reports.validated_by, reports.resolved_by,
+                   reports.created_at, reports.resolved_at,
+                   reports.location, location.city AS city,
+                   reports.image_url, reports.rating
+            FROM reports
+            LEFT JOIN location ON reports.location = location.id
+            WHERE reports.incident_id = %s
+            ORDER BY reports.created_at ASC, reports.id ASC
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (incident_id,))
+            return cur.fetchall()
+
+    # -------------------------------
+    # Bulk resolution
+    # -------------------------------
+    def resolve_incident(self, incident_id: int, admin_id: int):
+        """
+        Resolve every still-open report in the incident and close the incident.
+        Returns the number of reports resolved, or None if the incident doesn't exist.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE incidents
+                SET status = 'resolved', resolved_by = %s, resolved_at = NOW()
+                WHERE id = %s
+                RETURNING id
+                """,
+                (admin_id, incident_id),
+            )
+            if cur.fetchone() is None:
+                self.conn.rollback()
+                return None
+
+            cur.execute(
+                """
+                UPDATE reports
+                SET status = 'resolved', resolved_by = %s, resolved_at = NOW()
+                WHERE incident_id = %s AND status IN ('open', 'in_progress')
+                """,
+                (admin_id, incident_id),
+            )
+            resolved = cur.rowcount
+            self.conn.commit()
+            return resolved
+
+    # -------------------------------
+    # Clustering job support
+    # -------------------------------
+    def get_open_reports_for_clustering(self):
+        """
+        Open/in-progress reports that have coordinates.
+        Row shape: (id, category, created_at, latitude, longitude, incident_id)
+        """
+        query = """
+            SELECT reports.id, reports.category, reports.created_at,
+                   location.latitude, location.longitude, reports.incident_id
+            FROM reports
+            JOIN location ON reports.location = location.id
+            WHERE reports.status IN ('open', 'in_progress')
+              AND location.latitude IS NOT NULL
+              AND location.longitude IS NOT NULL
+            ORDER BY reports.category, reports.created_at, reports.id
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query)
+            return cur.fetchall()
+
+    def get_open_incident_ids(self):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT id FROM incidents WHERE status = 'open'")
+            return {r[0] for r in cur.fetchall()}
+
+    def create_incident(self, category: str):
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO incidents (category) VALUES (%s) RETURNING id",
+                (category,),
+            )
+            return cur.fetchone()[0]
+
+    def assign_reports(self, assignments, batch_size: int = 1000):
+        """
+        assignments: [(report_id, incident_id_or_None)]. Only rows whose value
+        actually changes are written.
+        """
+        query = """
+            UPDATE reports
+            SET incident_id = data.incident_id
+            FROM (VALUES %s) AS data (report_id, incident_id)
+            WHERE reports.id = data.report_id
+              AND reports.incident_id IS DISTINCT FROM data.incident_id
+        """
+        updated = 0
+        with self.conn.cursor() as cur:
+            for start in range(0, len(assignments), batch_size):
+                batch = assignments[start:start + batch_size]
+                execute_values(cur, query, batch, template="(%s, %s::integer)", page_size=batch_size)
+                updated += cur.rowcount
+                self.conn.commit()
+        return updated
+
+    def refresh_incident_aggregates(self):
+        """
+        Recompute centroid/counts for open incidents and drop open incidents
+        that no longer have any reports.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE incidents
+                SET latitude = agg.latitude,
+                    longitude = agg.longitude,
+                    report_count = agg.report_count,
+                    first_report_at = agg.first_report_at,
+                    last_report_at = agg.last_report_at
+                FROM (
+                    SELECT reports.incident_id,
+                           AVG(location.latitude) AS latitude,
+                           AVG(location.longitude) AS longitude,
+                           COUNT(*) AS report_count,
+                           MIN(reports.created_at) AS first_report_at,
+                           MAX(reports.created_at) AS last_report_at
+                    FROM reports
+                    JOIN location ON reports.location = location.id
+                    WHERE reports.incident_id IS NOT NULL
+                    GROUP BY reports.incident_id
+                ) agg
+                WHERE incidents.id = agg.incident_id AND incidents.status = 'open'
+                """
+            )
+            cur.execute(
+                """
+                DELETE FROM incidents
+                WHERE status = 'open'
+                  AND NOT EXISTS (SELECT 1 FROM reports WHERE reports.incident_id = incidents.id)
+                """
+            )
+            removed = cur.rowcount
+            self.conn.commit()
+            return removed
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
@@ -1,11 +1,15 @@
-from dotenv import load_dotenv
 from load import load_db
+from spatial import bounding_box
+from tracing import traced_class
 
+# Arbitrary constant shared by every process that creates locations
+LOCATION_SNAP_LOCK_KEY = 4151026
 
+
+@traced_class
 class LocationsDAO:
 
     def __init__(self):
-        load_dotenv()
         self.conn = load_db()
 
     def get_locations_paginated(self, limit, offset):
@@ -178,6 +182,73 @@ class LocationsDAO:
             )
             return cur.fetchall()
 
+    # =============================================================================
+    # LOCATION SNAPPING
+    # =============================================================================
+
+    def find_nearest_location(self, latitude, longitude, radius_m, city=None):
+        """
+        Return the closest location row within radius_m meters, or None.
+        Row shape: (id, city, latitude, longitude, distance_m)
+
+        The bounding box lets Postgres use idx_location_lat_lon; the haversine
+        expression only runs on the handful of rows inside the box.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_m)
+        query = """
+            SELECT id, city, latitude, longitude, distance_m
+            FROM (
+                SELECT id, city, latitude, longitude,
+                    (6371000 * acos(LEAST(1.0, cos(radians(%s)) * cos(radians(latitude)) *
+                    cos(radians(longitude) - radians(%s)) + sin(radians(%s)) *
+                    sin(radians(latitude))))) AS distance_m
+                FROM location
+                WHERE latitude BETWEEN %s AND %s
+                  AND longitude BETWEEN %s AND %s
+                  AND (city IS NULL OR %s IS NULL OR city = %s)
+            ) candidates
+            WHERE distance_m <= %s
+            ORDER BY distance_m, id
+            LIMIT 1
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                query,
+                (
+                    latitude,
+                    longitude,
+                    latitude,
+                    min_lat,
+                    max_lat,
+                    min_lon,
+                    max_lon,
+                    city,
+                    city,
+                    radius_m,
+                ),
+            )
+            return cur.fetchone()
+
+    def get_or_create_location(self, city, latitude, longitude, radius_m):
+        """
+        Reuse an existing location within radius_m meters, otherwise insert one.
+        Returns (location_row, snapped) where location_row is (id, city, latitude, longitude)
+        and snapped is True when an existing row was reused.
+
+        A transaction-level advisory lock serializes concurrent creates so two
+        reports for the same spot can't both miss the lookup and insert twice.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (LOCATION_SNAP_LOCK_KEY,))
+
+        nearest = self.find_nearest_location(latitude, longitude, radius_m, city=city)
+        if nearest:
+            self.conn.commit()
+            return nearest[:4], True
+
+        created = self.create_location(city, latitude, longitude)
+        return created[:4], False
+
     # =============================================================================
     # NEW METHOD FOR LOCATION DETAILS
     # =============================================================================
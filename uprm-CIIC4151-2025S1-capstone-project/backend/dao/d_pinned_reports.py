@@ -1,11 +1,29 @@
 # dao/d_pinned_reports.py
-from dotenv import load_dotenv
 from load import load_db
+from dao.fields import select_list, rows_to_dicts
+from tracing import traced_class
 
+# API field name -> SQL expression for pinned report lists. The first eight are
+# the default row layout PinnedReportsHandler.map_to_dict expects.
+PINNED_REPORT_FIELDS = {
+    "user_id": "pr.user_id",
+    "id": "pr.report_id",
+    "pinned_at": "pr.pinned_at",
+    "title": "r.title",
+    "description": "r.description",
+    "status": "r.status",
+    "category": "r.category",
+    "created_at": "r.created_at",
+    "city": "location.city",
+    "image_url": "r.image_url",
+    "rating": "r.rating",
+}
+DEFAULT_PINNED_FIELDS = tuple(PINNED_REPORT_FIELDS)[:8]
 
+
+@traced_class
 class PinnedReportsDAO:
     def __init__(self):
-        load_dotenv()
         self.conn = load_db()
 
     def get_pinned_report(self, user_id, report_id):
@@ -50,22 +68,33 @@ class PinnedReportsDAO:
             self.conn.commit()
             return deleted  # tuple or None
 
-    def get_pinned_reports_by_user(self, user_id, limit, offset):
+    @staticmethod
+    def _pinned_select(fields):
+        """SELECT list and the extra join it needs (location only when city is asked for)."""
+        fields = fields or DEFAULT_PINNED_FIELDS
+        join_sql = "LEFT JOIN location ON r.location = location.id" if "city" in fields else ""
+        return select_list(fields, PINNED_REPORT_FIELDS), join_sql
+
+    def get_pinned_reports_by_user(self, user_id, limit, offset, fields=None):
         """
         Returns list of rows where each row is:
         (user_id, report_id, pinned_at, title, description, status, category, created_at)
+        With `fields` only those columns are selected and rows come back as dicts.
         """
-        query = """
-            SELECT pr.user_id, pr.report_id, pr.pinned_at, r.title, r.description, r.status, r.category, r.created_at
+        select_sql, join_sql = self._pinned_select(fields)
+        query = f"""
+            SELECT {select_sql}
             FROM pinned_reports pr
             JOIN reports r ON pr.report_id = r.id
+            {join_sql}
             WHERE pr.user_id = %s
             ORDER BY pr.pinned_at DESC
             LIMIT %s OFFSET %s
         """
         with self.conn.cursor() as cur:
             cur.execute(query, (user_id, limit, offset))
-            return cur.fetchall()
+            rows = cur.fetchall()
+            return rows_to_dicts(cur, rows) if fields else rows
 
     def get_pinned_reports_count_by_user(self, user_id):
         query = "SELECT COUNT(*) FROM pinned_reports WHERE user_id = %s"
@@ -73,17 +102,20 @@ class PinnedReportsDAO:
             cur.execute(query, (user_id,))
             return cur.fetchone()[0]
 
-    def get_all_pinned_reports(self, limit, offset):
-        query = """
-            SELECT pr.user_id, pr.report_id, pr.pinned_at, r.title, r.description, r.status, r.category, r.created_at
+    def get_all_pinned_reports(self, limit, offset, fields=None):
+        select_sql, join_sql = self._pinned_select(fields)
+        query = f"""
+            SELECT {select_sql}
             FROM pinned_reports pr
             JOIN reports r ON pr.report_id = r.id
+            {join_sql}
             ORDER BY pr.pinned_at DESC
             LIMIT %s OFFSET %s
         """
         with self.conn.cursor() as cur:
             cur.execute(query, (limit, offset))
-            return cur.fetchall()
+            rows = cur.fetchall()
+            return rows_to_dicts(cur, rows) if fields else rows
 
     def get_total_pinned_reports_count(self):
         query = "SELECT COUNT(*) FROM pinned_reports"
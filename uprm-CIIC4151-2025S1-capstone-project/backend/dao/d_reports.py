@@ -1,6 +1,26 @@
-from dotenv import load_dotenv
 from load import load_db
+from spatial import bounding_box
+from dao.fields import select_list, rows_to_dicts
 from typing import Optional
+from tracing import traced_class
+
+# API field name -> SQL expression, in the column order map_to_dict expects
+REPORT_FIELDS = {
+    "id": "reports.id",
+    "title": "reports.title",
+    "description": "reports.description",
+    "status": "reports.status",
+    "category": "reports.category",
+    "created_by": "reports.created_by",
+    "validated_by": "reports.validated_by",
+    "resolved_by": "reports.resolved_by",
+    "created_at": "reports.created_at",
+    "resolved_at": "reports.resolved_at",
+    "location": "reports.location",
+    "city": "location.city",
+    "image_url": "reports.image_url",
+    "rating": "reports.rating",
+}
 
 def _normalize_sort(sort: str | None) -> str:
     """
@@ -13,9 +33,106 @@ def _normalize_sort(sort: str | None) -> str:
     return "ASC" if s == "ASC" else "DESC"
 
 
+# -------------------------------
+# Query builders
+# -------------------------------
+# Shared by ReportsDAO and the asyncpg DAO (dao/d_reports_async.py), which
+# rewrites the %s placeholders, so both serving modes run the same SQL.
+def _location_filters(where: list, params: list, allowed_categories, location_id, city):
+    if allowed_categories:
+        where.append("reports.category = ANY(%s)")
+        params.append(allowed_categories)
+    if location_id is not None:
+        where.append("reports.location = %s")
+        params.append(location_id)
+    if city:
+        where.append("location.city = %s")
+        params.append(city)
+
+
+def _where_sql(where: list) -> str:
+    return f" WHERE {' AND '.join(where)}" if where else ""
+
+
+def reports_page_query(limit, offset, sort=None, allowed_categories=None, location_id=None, city=None, fields=None):
+    """SQL + params for one page of reports. Returns (query, params)."""
+    where: list[str] = []
+    params: list = []
+    _location_filters(where, params, allowed_categories, location_id, city)
+
+    order_dir = _normalize_sort(sort)
+    select_sql = select_list(fields or REPORT_FIELDS, REPORT_FIELDS)
+    query = f"""
+        SELECT {select_sql}
+        FROM reports
+        LEFT JOIN location ON reports.location = location.id
+        {_where_sql(where)}
+        ORDER BY reports.created_at {order_dir}, reports.id {order_dir}
+        LIMIT %s OFFSET %s
+    """
+    return query, params + [limit, offset]
+
+
+def report_count_query(allowed_categories=None, location_id=None, city=None):
+    where: list[str] = []
+    params: list = []
+    _location_filters(where, params, allowed_categories, location_id, city)
+    query = f"""
+        SELECT COUNT(*)
+        FROM reports
+        LEFT JOIN location ON reports.location = location.id
+        {_where_sql(where)}
+    """
+    return query, params
+
+
+def search_queries(
+    q=None, status=None, category=None, sort=None,
+    allowed_categories=None, location_id=None, city=None, fields=None,
+):
+    """
+    Returns (count_sql, data_sql, params). The data query takes
+    params + [limit, offset].
+    """
+    where: list[str] = []
+    params: list = []
+
+    if q:
+        where.append("(reports.title ILIKE %s OR reports.description ILIKE %s)")
+        like = f"%{q}%"
+        params.extend([like, like])
+    if status:
+        where.append("reports.status = %s")
+        params.append(status)
+    if category:
+        where.append("reports.category = %s")
+        params.append(category)
+    _location_filters(where, params, allowed_categories, location_id, city)
+
+    where_sql = _where_sql(where)
+    order_dir = _normalize_sort(sort)
+    select_sql = select_list(fields or REPORT_FIELDS, REPORT_FIELDS)
+
+    count_sql = f"""
+        SELECT COUNT(*)
+        FROM reports
+        LEFT JOIN location ON reports.location = location.id
+        {where_sql}
+    """
+    data_sql = f"""
+        SELECT {select_sql}
+        FROM reports
+        LEFT JOIN location ON reports.location = location.id
+        {where_sql}
+        ORDER BY reports.created_at {order_dir}, reports.id {order_dir}
+        LIMIT %s OFFSET %s
+    """
+    return count_sql, data_sql, params
+
+
+@traced_class
 class ReportsDAO:
     def __init__(self):
-        load_dotenv()
         self.conn = load_db()
 
     # -------------------------------
@@ -125,71 +242,23 @@ class ReportsDAO:
         allowed_categories: list[str] | None = None,
         location_id: int | None = None,
         city: str | None = None,
+        fields: tuple[str, ...] | None = None,
     ):
-        """Fetch reports with pagination and optional category / location restriction."""
-        order_dir = _normalize_sort(sort)
-        where_clauses: list[str] = []
-        params: list = []
-
-        if allowed_categories:
-            where_clauses.append("reports.category = ANY(%s)")
-            params.append(allowed_categories)
-
-        if location_id is not None:
-            where_clauses.append("reports.location = %s")
-            params.append(location_id)
-
-        if city:
-            where_clauses.append("location.city = %s")
-            params.append(city)
-
-        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-
-        query = f"""
-            SELECT reports.id, reports.title, reports.description, reports.status, reports.category,
-                   reports.created_by, reports.validated_by, reports.resolved_by,
-                   reports.created_at, reports.resolved_at,
-                   reports.location, location.city AS city,
-                   reports.image_url, reports.rating
-            FROM reports
-            LEFT JOIN location ON reports.location = location.id
-            {where_sql}
-            ORDER BY reports.created_at {order_dir}, reports.id {order_dir}
-            LIMIT %s OFFSET %s
         """
-        params.extend([limit, offset])
+        Fetch reports with pagination and optional category / location restriction.
+        With `fields` only those columns are selected and rows come back as dicts.
+        """
+        query, params = reports_page_query(limit, offset, sort, allowed_categories, location_id, city, fields)
 
         with self.conn.cursor() as cur:
             cur.execute(query, params)
             rows = cur.fetchall()
             # Return as list of tuples (same form as previous) or map to dict if you prefer
-            return rows
+            return rows_to_dicts(cur, rows) if fields else rows
 
     def get_total_report_count(self, allowed_categories: list[str] | None = None, location_id: int | None = None, city: str | None = None):
         """Count reports, optionally restricted to a set of categories or location."""
-        where_clauses: list[str] = []
-        params: list = []
-
-        if allowed_categories:
-            where_clauses.append("category = ANY(%s)")
-            params.append(allowed_categories)
-
-        if location_id is not None:
-            where_clauses.append("location = %s")
-            params.append(location_id)
-
-        if city:
-            where_clauses.append("location.city = %s")
-            params.append(city)
-
-        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        query = f"""
-            SELECT COUNT(*)
-            FROM reports
-            LEFT JOIN location ON reports.location = location.id
-            {where_sql}
-        """
-
+        query, params = report_count_query(allowed_categories, location_id, city)
         with self.conn.cursor() as cur:
             cur.execute(query, params)
             return cur.fetchone()[0]
@@ -221,7 +290,7 @@ class ReportsDAO:
         image_url: str | None = None,
         created_by: int | None = None,
     ):
-        """Insert a new report and increment user's total_reports."""
+        """Insert a new report, increment user's total_reports and the image's ref_count."""
         query = """
             INSERT INTO reports (title, description, category, location, city, image_url, created_by)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
@@ -242,6 +311,12 @@ class ReportsDAO:
                     "UPDATE users SET total_reports = total_reports + 1 WHERE id = %s",
                     (created_by,),
                 )
+            if image_url:
+                # Track the reference so the image can be released with the report
+                cur.execute(
+                    "UPDATE uploads SET ref_count = ref_count + 1 WHERE url = %s",
+                    (image_url,),
+                )
             self.conn.commit()
             return new_report
 
@@ -351,56 +426,17 @@ class ReportsDAO:
         allowed_categories: list[str] | None = None,
         location_id: int | None = None,
         city: str | None = None,
+        fields: tuple[str, ...] | None = None,
     ):
         """
         Search and filter reports with pagination, sorting, and optional admin restrictions.
         You can filter by `location_id` (exact match) or by `city` (city name).
+        With `fields` only those columns are selected and rows come back as dicts.
         Returns: (rows, total_count)
         """
-        where = []
-        params: list = []
-
-        if q:
-            where.append("(reports.title ILIKE %s OR reports.description ILIKE %s)")
-            like = f"%{q}%"
-            params.extend([like, like])
-        if status:
-            where.append("reports.status = %s")
-            params.append(status)
-        if category:
-            where.append("reports.category = %s")
-            params.append(category)
-        if allowed_categories:
-            where.append("reports.category = ANY(%s)")
-            params.append(allowed_categories)
-        if location_id is not None:
-            where.append("reports.location = %s")
-            params.append(location_id)
-        if city:
-            where.append("location.city = %s")
-            params.append(city)
-
-        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
-        order_dir = _normalize_sort(sort)
-
-        count_sql = f"""
-            SELECT COUNT(*)
-            FROM reports
-            LEFT JOIN location ON reports.location = location.id
-            {where_sql}
-        """
-        data_sql = f"""
-            SELECT reports.id, reports.title, reports.description, reports.status, reports.category,
-                   reports.created_by, reports.validated_by, reports.resolved_by,
-                   reports.created_at, reports.resolved_at,
-                   reports.location, location.city AS city,
-                   reports.image_url, reports.rating
-            FROM reports
-            LEFT JOIN location ON reports.location = location.id
-            {where_sql}
-            ORDER BY reports.created_at {order_dir}, reports.id {order_dir}
-            LIMIT %s OFFSET %s
-        """
+        count_sql, data_sql, params = search_queries(
+            q, status, category, sort, allowed_categories, location_id, city, fields
+        )
 
         with self.conn.cursor() as cur:
             cur.execute(count_sql, params)
@@ -408,9 +444,101 @@ class ReportsDAO:
 
             cur.execute(data_sql, params + [limit, offset])
             rows = cur.fetchall()
+            if fields:
+                rows = rows_to_dicts(cur, rows)
 
         return rows, total_count
 
+    # -------------------------------
+    # Duplicate detection
+    # -------------------------------
+    def find_duplicate_candidates(
+        self,
+        category: str,
+        latitude: float,
+        longitude: float,
+        title: str,
+        description: str,
+        radius_m: float,
+        window_hours: int,
+        min_similarity: float,
+        limit: int = 5,
+        location_id: int = None,
+    ):
+        """
+        Find open reports of the same category created in the last `window_hours`
+        whose title/description pg_trgm similarity is at least `min_similarity`.
+
+        With device coordinates, candidates must also lie within `radius_m` of
+        (latitude, longitude), and the lat/lon index bounds the scan. A
+        `location_id` means the coordinates would come from a shared (often
+        city-level) location row, where every report on the row is at distance
+        0, so candidates are limited to that row and distance_m is NULL. Either
+        way the partial index on open reports (category, created_at) keeps the
+        candidate set tiny, so the similarity scoring is cheap.
+
+        Row shape:
+          0 id, 1 title, 2 status, 3 category, 4 created_at, 5 location, 6 city,
+          7 image_url, 8 rating, 9 distance_m, 10 score
+        """
+        if location_id is not None:
+            distance_sql = "NULL::float"
+            place_sql = "reports.location = %s"
+            radius_sql = ""
+            distance_params, place_params, radius_params = (), (location_id,), ()
+        else:
+            min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_m)
+            distance_sql = """(6371000 * acos(LEAST(1.0, cos(radians(%s)) * cos(radians(location.latitude)) *
+                       cos(radians(location.longitude) - radians(%s)) + sin(radians(%s)) *
+                       sin(radians(location.latitude)))))"""
+            place_sql = "location.latitude BETWEEN %s AND %s AND location.longitude BETWEEN %s AND %s"
+            radius_sql = "AND distance_m <= %s"
+            distance_params = (latitude, longitude, latitude)
+            place_params = (min_lat, max_lat, min_lon, max_lon)
+            radius_params = (radius_m,)
+
+        query = f"""
+            SELECT id, title, status, category, created_at, location, city,
+                   image_url, rating, distance_m, score
+            FROM (
+                SELECT reports.id, reports.title, reports.status, reports.category,
+                       reports.created_at, reports.location, location.city AS city,
+                       reports.image_url, reports.rating,
+                       {distance_sql} AS distance_m,
+                       (0.6 * similarity(reports.title, %s)
+                        + 0.4 * similarity(reports.description, %s)) AS score
+                FROM reports
+                JOIN location ON reports.location = location.id
+                WHERE reports.status = 'open'
+                  AND reports.category = %s
+                  AND reports.created_at >= NOW() - make_interval(hours => %s)
+                  AND {place_sql}
+            ) candidates
+            WHERE score >= %s
+              {radius_sql}
+            ORDER BY score DESC, distance_m ASC NULLS LAST
+            LIMIT %s
+        """
+        params = (
+            *distance_params,
+            title,
+            description,
+            category,
+            window_hours,
+            *place_params,
+            min_similarity,
+            *radius_params,
+            limit,
+        )
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchall()
+        except Exception:
+            # Leave the connection usable for the insert that usually follows
+            self.conn.rollback()
+            raise
+
     def get_user_rating_status(self, report_id: int, user_id: int):
         """
         Returns whether the user has rated the given report and the current cached rating.
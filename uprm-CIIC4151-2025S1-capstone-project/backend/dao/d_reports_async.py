@@ -0,0 +1,96 @@
+"""
+asyncpg counterpart of the ReportsDAO read paths used by asgi_application.py.
+
+The SQL comes from the same builders as ReportsDAO; only the %s placeholders
+are rewritten to asyncpg's $1, $2, ... Connections are borrowed from the
+pool per call instead of being opened per DAO instance.
+"""
+import itertools
+import re
+
+from dao.d_reports import REPORT_FIELDS, reports_page_query, report_count_query, search_queries
+from dao.fields import select_list
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+def pg_placeholders(sql: str) -> str:
+    """'a = %s AND b = %s' -> 'a = $1 AND b = $2'"""
+    counter = itertools.count(1)
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+
+def records_to_dicts(records):
+    return [dict(record) for record in records]
+
+
+class AsyncReportsDAO:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def get_admin_info_for_user(self, user_id):
+        """Same result as AdministratorsDAO.get_admin_info_for_user."""
+        query = """
+            SELECT u.admin, a.department
+            FROM users u
+            LEFT JOIN administrators a ON u.id = a.id
+            WHERE u.id = $1
+        """
+        row = await self.pool.fetchrow(query, user_id)
+        if not row:
+            return {"admin": False, "department": None}
+        return {"admin": bool(row[0]), "department": row[1]}
+
+    async def get_reports_paginated(
+        self, limit, offset, sort=None, allowed_categories=None, location_id=None, city=None, fields=None
+    ):
+        query, params = reports_page_query(limit, offset, sort, allowed_categories, location_id, city, fields)
+        rows = await self.pool.fetch(pg_placeholders(query), *params)
+        return records_to_dicts(rows) if fields else rows
+
+    async def get_total_report_count(self, allowed_categories=None, location_id=None, city=None):
+        query, params = report_count_query(allowed_categories, location_id, city)
+        return await self.pool.fetchval(pg_placeholders(query), *params)
+
+    async def get_report_by_id(self, report_id: int):
+        query = f"""
+            SELECT {select_list(REPORT_FIELDS, REPORT_FIELDS)}
+            FROM reports
+            LEFT JOIN location ON reports.location = location.id
+            WHERE reports.id = $1
+        """
+        return await self.pool.fetchrow(query, report_id)
+
+    async def search_reports(
+        self, q=None, status=None, category=None, limit=10, offset=0, sort=None,
+        allowed_categories=None, location_id=None, city=None, fields=None,
+    ):
+        """Returns: (rows, total_count), like ReportsDAO.search_reports."""
+        count_sql, data_sql, params = search_queries(
+            q, status, category, sort, allowed_categories, location_id, city, fields
+        )
+        # Both queries on one connection, as the sync DAO does on one cursor
+        async with self.pool.acquire() as conn:
+            total_count = await conn.fetchval(pg_placeholders(count_sql), *params)
+            rows = await conn.fetch(pg_placeholders(data_sql), *params, limit, offset)
+        return (records_to_dicts(rows) if fields else rows), total_count
+
+    async def get_reports_after(self, after_id: int, allowed_categories=None, limit: int = 100):
+        """Reports with id > after_id, oldest first (feeds /reports/events)."""
+        params = [after_id]
+        category_sql = ""
+        if allowed_categories:
+            params.append(allowed_categories)
+            category_sql = "AND reports.category = ANY($2)"
+        query = f"""
+            SELECT {select_list(REPORT_FIELDS, REPORT_FIELDS)}
+            FROM reports
+            LEFT JOIN location ON reports.location = location.id
+            WHERE reports.id > $1 {category_sql}
+            ORDER BY reports.id
+            LIMIT {int(limit)}
+        """
+        return await self.pool.fetch(query, *params)
+
+    async def get_latest_report_id(self):
+        return await self.pool.fetchval("SELECT COALESCE(MAX(id), 0) FROM reports")
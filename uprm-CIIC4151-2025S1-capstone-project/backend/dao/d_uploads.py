@@ -0,0 +1,127 @@
+from psycopg2.extras import execute_values
+from load import load_db
+from tracing import traced_class
+
+
+@traced_class
+class UploadsDAO:
+    def __init__(self):
+        self.conn = load_db()
+
+    # -------------------------------
+    # Content-addressed uploads
+    # -------------------------------
+    def register_upload(self, sha256, url, size_bytes):
+        """Record a stored file; a repeat upload of the same content only refreshes last_seen."""
+        query = """
+            INSERT INTO uploads (sha256, url, size_bytes)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (sha256) DO UPDATE SET last_seen = CURRENT_TIMESTAMP
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (sha256, url, size_bytes))
+            self.conn.commit()
+
+    def mark_seen(self, url):
+        """Restart the GC grace period of a URL handed out again. Returns True when tracked."""
+        query = "UPDATE uploads SET last_seen = CURRENT_TIMESTAMP WHERE url = %s"
+        with self.conn.cursor() as cur:
+            cur.execute(query, (url,))
+            self.conn.commit()
+            return cur.rowcount > 0
+
+    def add_reference(self, url):
+        """Returns True when `url` is a tracked upload."""
+        query = "UPDATE uploads SET ref_count = ref_count + 1 WHERE url = %s"
+        with self.conn.cursor() as cur:
+            cur.execute(query, (url,))
+            self.conn.commit()
+            return cur.rowcount > 0
+
+    def release_reference(self, url):
+        """
+        Drop one reference to `url`. Returns True when it was the last one.
+        The row stays (with ref_count 0) so a concurrent deduplicated upload of
+        the same content keeps its last_seen; gc_uploads removes the file and
+        the row once the grace period has passed.
+        Untracked URLs (legacy uploads, external links) always return False.
+        """
+        query = """
+            UPDATE uploads
+            SET ref_count = GREATEST(ref_count - 1, 0)
+            WHERE url = %s
+            RETURNING ref_count
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (url,))
+            row = cur.fetchone()
+            self.conn.commit()
+            return row is not None and row[0] == 0
+
+    def get_referenced_urls(self, urls, grace_hours=0):
+        """
+        Of `urls`, return the set still in use: referenced by a report, or
+        tracked in `uploads` with a non-zero ref_count or handed out (last_seen)
+        within the last `grace_hours`.
+        """
+        if not urls:
+            return set()
+        query = """
+            SELECT image_url FROM reports WHERE image_url = ANY(%s)
+            UNION
+            SELECT url FROM uploads
+            WHERE url = ANY(%s)
+              AND (ref_count > 0 OR last_seen > NOW() - make_interval(hours => %s))
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (list(urls), list(urls), grace_hours))
+            return {row[0] for row in cur.fetchall()}
+
+    def forget_uploads(self, urls, filenames):
+        """Drop the bookkeeping rows for files the GC removed."""
+        if not urls:
+            return
+        with self.conn.cursor() as cur:
+            cur.execute("DELETE FROM uploads WHERE url = ANY(%s) AND ref_count = 0", (list(urls),))
+            cur.execute("DELETE FROM upload_variants WHERE filename = ANY(%s)", (list(filenames),))
+            self.conn.commit()
+
+    # -------------------------------
+    # Image variants (thumbnails)
+    # -------------------------------
+    def record_variants(self, filename, variants):
+        """
+        variants: [(width, format, size_bytes)] generated for `filename`.
+        Re-generating a variant just refreshes its size.
+        """
+        query = """
+            INSERT INTO upload_variants (filename, width, format, size_bytes)
+            VALUES %s
+            ON CONFLICT (filename, width, format)
+            DO UPDATE SET size_bytes = EXCLUDED.size_bytes, created_at = CURRENT_TIMESTAMP
+        """
+        with self.conn.cursor() as cur:
+            execute_values(cur, query, [(filename, w, fmt, size) for w, fmt, size in variants])
+            self.conn.commit()
+
+    def get_variants(self, filename):
+        """Returns [(width, format, size_bytes)] ordered by width."""
+        query = """
+            SELECT width, format, size_bytes
+            FROM upload_variants
+            WHERE filename = %s
+            ORDER BY width, format
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (filename,))
+            return cur.fetchall()
+
+    def delete_variants(self, filename):
+        with self.conn.cursor() as cur:
+            cur.execute("DELETE FROM upload_variants WHERE filename = %s", (filename,))
+            self.conn.commit()
+            return cur.rowcount
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
@@ -1,14 +1,14 @@
-from dotenv import load_dotenv
 from load import load_db
+from tracing import traced_class
 
 # Add near the top if not present
 VALID_DEPARTMENTS = ("DTOP", "LUMA", "AAA", "DDS")
 
 
+@traced_class
 class UsersDAO:
 
     def __init__(self):
-        load_dotenv()
         self.conn = load_db()
 
     def get_users_paginated(self, limit, offset):
@@ -0,0 +1,40 @@
+"""
+Sparse fieldsets (`?fields=id,title,status`).
+
+Each DAO that supports them keeps a whitelist mapping API field names to SQL
+expressions. Requested fields are validated against it and become the SELECT
+list, aliased to the API name, so rows can be mapped by column name instead
+of by position.
+"""
+
+
+def parse_fields(raw: str | None, whitelist: dict, always: tuple = ("id",)):
+    """
+    "title,status" -> ("id", "title", "status"). Returns None when no fields were
+    requested (meaning: every column). Raises ValueError on unknown names.
+    """
+    if raw is None or not raw.strip():
+        return None
+
+    requested = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in whitelist]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(whitelist)}"
+        )
+
+    fields = list(always)
+    for name in requested:
+        if name not in fields:
+            fields.append(name)
+    return tuple(fields)
+
+
+def select_list(fields, whitelist: dict) -> str:
+    """Only ever built from whitelisted names, so it is safe to format into SQL."""
+    return ", ".join(f"{whitelist[name]} AS {name}" for name in fields)
+
+
+def rows_to_dicts(cur, rows):
+    columns = [column.name for column in cur.description]
+    return [dict(zip(columns, row)) for row in rows]
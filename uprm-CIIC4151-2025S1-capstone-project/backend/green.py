@@ -0,0 +1,39 @@
+"""
+Cooperative psycopg2 for gevent workers.
+
+psycopg2 calls into libpq, which blocks the whole process while it waits on
+the socket, so under gevent one slow query stalls every greenlet in the
+worker. With a wait callback installed, psycopg2 drives libpq in
+non-blocking mode and hands each wait to gevent's hub instead.
+
+gunicorn.conf.py installs it in every gevent worker; nothing else changes.
+"""
+import psycopg2
+from psycopg2 import extensions
+
+try:
+    from gevent.socket import wait_read, wait_write
+except ImportError:  # gevent is optional; sync workers never call this
+    wait_read = wait_write = None
+
+
+def gevent_wait_callback(conn, timeout=None):
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def patch_psycopg():
+    """Make psycopg2 yield to other greenlets while waiting on the server."""
+    if wait_read is None:
+        raise RuntimeError("gevent is not installed")
+    if not hasattr(extensions, "set_wait_callback"):
+        raise ImportError("psycopg2 is too old to support coroutines")
+    extensions.set_wait_callback(gevent_wait_callback)
@@ -0,0 +1,69 @@
+"""
+gunicorn settings, overridable from the environment.
+
+    GUNICORN_WORKER_CLASS=gevent gunicorn -c gunicorn.conf.py flask_application:app
+
+sync (default): one request per worker process at a time.
+gevent: each worker multiplexes up to GUNICORN_WORKER_CONNECTIONS requests on
+greenlets, and psycopg2 is switched to cooperative waiting (green.py), so
+requests blocked on Postgres don't hold the worker. They still share the
+worker's DB_POOL_MAX_SIZE (+ DB_POOL_MAX_OVERFLOW) connections; the rest wait
+for a free one.
+
+Each worker is a separate pool, so WEB_CONCURRENCY multiplies the database
+connections (see DB_POOL_MAX_SIZE in constants.py); it defaults to 2 rather
+than scaling with the CPU count.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+# gunicorn may be started from the repository root (see Procfile)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+
+if worker_class == "gevent":
+    # Patch before the app is preloaded, so every lock the app creates at
+    # import time is already a gevent one; the wait callback survives fork.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    from green import patch_psycopg
+
+    patch_psycopg()
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# gevent only: concurrent requests (greenlets) per worker
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100"))
+
+# Import the app once in the master and fork it; the DB pool is created
+# lazily in each worker, so no connection is shared across processes.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+# Prometheus multiprocess mode: each worker writes its metrics to files in
+# this directory and /metrics sums them. Must be set before the app (and so
+# prometheus_client) is imported.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "reports-api-metrics")
+)
+
+
+def on_starting(server):
+    # Start from zero: files left by a previous master would be summed in
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
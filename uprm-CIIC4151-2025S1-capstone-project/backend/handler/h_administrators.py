@@ -1,8 +1,10 @@
 from flask import request, jsonify
 from dao.d_administrators import AdministratorsDAO
 from constants import HTTP_STATUS
+from tracing import traced_class
 
 
+@traced_class
 class AdministratorsHandler:
 
     # -------------------------------------------------------
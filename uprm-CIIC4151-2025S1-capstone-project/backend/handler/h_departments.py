@@ -1,8 +1,10 @@
 from flask import request, jsonify
 from dao.d_departments import DepartmentsDAO
 from constants import HTTP_STATUS
+from tracing import traced_class
 
 
+@traced_class
 class DepartmentsHandler:
 
     def map_to_dict(self, department):
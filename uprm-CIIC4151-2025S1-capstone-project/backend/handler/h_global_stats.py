@@ -1,9 +1,11 @@
 from flask import Blueprint, jsonify, request
 from dao.d_global_stats import GlobalStatsDAO
 from constants import HTTP_STATUS
+from tracing import traced_class
 bp = Blueprint("global_stats", __name__)
 
 
+@traced_class
 class GlobalStatsHandler:
     @bp.get("/stats/summary")
     def summary(self):
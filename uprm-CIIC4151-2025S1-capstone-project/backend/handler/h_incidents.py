@@ -0,0 +1,105 @@
+from flask import jsonify
+from dao.d_incidents import IncidentsDAO
+from dao.d_administrators import AdministratorsDAO
+from handler.h_reports import ReportsHandler
+from constants import HTTP_STATUS
+from tracing import traced_class
+
+
+@traced_class
+class IncidentsHandler:
+
+    def map_to_dict(self, incident):
+        """
+        Row layout from IncidentsDAO:
+          0 id, 1 category, 2 status, 3 latitude, 4 longitude, 5 report_count,
+          6 first_report_at, 7 last_report_at, 8 created_at, 9 resolved_by, 10 resolved_at
+        """
+        return {
+            "id": incident[0],
+            "category": incident[1],
+            "status": incident[2],
+            "latitude": float(incident[3]) if incident[3] is not None else None,
+            "longitude": float(incident[4]) if incident[4] is not None else None,
+            "report_count": incident[5],
+            "first_report_at": incident[6],
+            "last_report_at": incident[7],
+            "created_at": incident[8],
+            "resolved_by": incident[9],
+            "resolved_at": incident[10],
+        }
+
+    def get_all_incidents(self, page=1, limit=10, status="open", admin_id=None):
+        try:
+            offset = (page - 1) * limit
+            dao = IncidentsDAO()
+
+            # Same department restriction as the admin report queues
+            allowed_categories = ReportsHandler()._get_allowed_categories_for_admin(admin_id)
+
+            incidents = dao.get_incidents_paginated(
+                limit, offset, status=status, allowed_categories=allowed_categories
+            )
+            total_count = dao.get_total_incident_count(
+                status=status, allowed_categories=allowed_categories
+            )
+            total_pages = (total_count + limit - 1) // limit
+
+            return (
+                jsonify(
+                    {
+                        "incidents": [self.map_to_dict(i) for i in incidents],
+                        "totalPages": total_pages,
+                        "currentPage": page,
+                        "totalCount": total_count,
+                    }
+                ),
+                HTTP_STATUS.OK,
+            )
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    def get_incident_by_id(self, incident_id):
+        try:
+            dao = IncidentsDAO()
+            incident = dao.get_incident_by_id(incident_id)
+            if not incident:
+                return jsonify({"error_msg": "Incident not found"}), HTTP_STATUS.NOT_FOUND
+
+            reports_handler = ReportsHandler()
+            incident_dict = self.map_to_dict(incident)
+            incident_dict["reports"] = [
+                reports_handler.map_to_dict(r) for r in dao.get_incident_reports(incident_id)
+            ]
+            return jsonify(incident_dict), HTTP_STATUS.OK
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    def resolve_incident(self, incident_id, data):
+        """Bulk-resolve every open report in the incident."""
+        try:
+            if not data or not data.get("admin_id"):
+                return jsonify({"error_msg": "Missing admin_id"}), HTTP_STATUS.BAD_REQUEST
+
+            admin_id = data.get("admin_id")
+            admin_dao = AdministratorsDAO()
+            if not admin_dao.get_administrator_by_id(admin_id):
+                return jsonify({"error_msg": "User not authorized as admin"}), HTTP_STATUS.FORBIDDEN
+
+            dao = IncidentsDAO()
+            resolved = dao.resolve_incident(incident_id, admin_id)
+            if resolved is None:
+                return jsonify({"error_msg": "Incident not found"}), HTTP_STATUS.NOT_FOUND
+
+            return (
+                jsonify(
+                    {
+                        "message": "Incident resolved successfully",
+                        "incident_id": incident_id,
+                        "resolved_reports": resolved,
+                    }
+                ),
+                HTTP_STATUS.OK,
+            )
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
@@ -1,8 +1,10 @@
 from flask import request, jsonify
 from dao.d_locations import LocationsDAO
-from constants import HTTP_STATUS
+from constants import HTTP_STATUS, LOCATION_SNAP_RADIUS_M
+from tracing import traced_class
 
 
+@traced_class
 class LocationsHandler:
 
     def map_to_dict(self, location):
@@ -115,7 +117,10 @@ class LocationsHandler:
                 )
 
             dao = LocationsDAO()
-            inserted_location = dao.create_location(latitude, longitude)
+            # Reuse an existing location within the snap radius instead of duplicating it
+            inserted_location, snapped = dao.get_or_create_location(
+                data.get("city"), latitude, longitude, LOCATION_SNAP_RADIUS_M
+            )
 
             if not inserted_location:
                 return (
@@ -124,7 +129,11 @@ class LocationsHandler:
                 )
 
             inserted_location_dict = self.map_to_dict(inserted_location)
-            return jsonify(inserted_location_dict), HTTP_STATUS.CREATED
+            inserted_location_dict["snapped"] = snapped
+            return (
+                jsonify(inserted_location_dict),
+                HTTP_STATUS.OK if snapped else HTTP_STATUS.CREATED,
+            )
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
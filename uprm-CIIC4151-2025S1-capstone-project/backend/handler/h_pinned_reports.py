@@ -1,9 +1,12 @@
 # handler/h_pinned_reports.py
 from flask import request, jsonify
-from dao.d_pinned_reports import PinnedReportsDAO
+from dao.d_pinned_reports import PinnedReportsDAO, PINNED_REPORT_FIELDS
+from dao.fields import parse_fields
 from constants import HTTP_STATUS
+from tracing import traced_class
 
 
+@traced_class
 class PinnedReportsHandler:
     def map_to_dict(self, pinned_report):
         """
@@ -118,25 +121,32 @@ class PinnedReportsHandler:
             print("unpin_report exception:", e)
             return jsonify({"error_msg": str(e), "pinned": False}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
-    def get_pinned_reports(self, user_id=None, page=1, limit=10):
+    def get_pinned_reports(self, user_id=None, page=1, limit=10, fields=None):
         """
-        GET /pinned-reports?user_id=<>&page=<>&limit=<>
+        GET /pinned-reports?user_id=<>&page=<>&limit=<>&fields=<>
         If user_id provided, returns that user's pinned reports; otherwise returns all.
+        `fields` ("title,status,image_url") limits the columns selected and returned.
         Paginated response with metadata.
         """
+        try:
+            selected = parse_fields(fields, PINNED_REPORT_FIELDS)
+        except ValueError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
+
         try:
             offset = (page - 1) * limit
             dao = PinnedReportsDAO()
 
             if user_id:
-                pinned_reports = dao.get_pinned_reports_by_user(user_id, limit, offset)
+                pinned_reports = dao.get_pinned_reports_by_user(user_id, limit, offset, fields=selected)
                 total_count = dao.get_pinned_reports_count_by_user(user_id)
             else:
-                pinned_reports = dao.get_all_pinned_reports(limit, offset)
+                pinned_reports = dao.get_all_pinned_reports(limit, offset, fields=selected)
                 total_count = dao.get_total_pinned_reports_count()
 
             total_pages = (total_count + limit - 1) // limit
-            pinned_reports_dict = [self.map_to_dict(pr) for pr in pinned_reports]
+            # sparse rows are already dicts keyed by field name
+            pinned_reports_dict = pinned_reports if selected else [self.map_to_dict(pr) for pr in pinned_reports]
 
             return jsonify({
                 "pinned_reports": pinned_reports_dict,
@@ -150,11 +160,11 @@ class PinnedReportsHandler:
             print("get_pinned_reports exception:", e)
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
-    def get_user_pinned_reports(self, user_id, page=1, limit=10):
+    def get_user_pinned_reports(self, user_id, page=1, limit=10, fields=None):
         try:
             if not user_id:
                 return jsonify({"error_msg": "Missing user_id"}), HTTP_STATUS.BAD_REQUEST
-            return self.get_pinned_reports(user_id, page, limit)
+            return self.get_pinned_reports(user_id, page, limit, fields)
         except Exception as e:
             print("get_user_pinned_reports exception:", e)
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
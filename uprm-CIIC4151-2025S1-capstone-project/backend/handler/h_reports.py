@@ -1,10 +1,38 @@
 from flask import jsonify
-from dao.d_reports import ReportsDAO
+from dao.d_reports import ReportsDAO, REPORT_FIELDS
+from dao.fields import parse_fields
 from dao.d_administrators import AdministratorsDAO
-from constants import HTTP_STATUS
+from dao.d_locations import LocationsDAO
+from handler.h_uploads import UploadsHandler
+from constants import (
+    HTTP_STATUS,
+    LOCATION_SNAP_RADIUS_M,
+    DUPLICATE_RADIUS_M,
+    DUPLICATE_WINDOW_HOURS,
+    DUPLICATE_MIN_SIMILARITY,
+)
 from datetime import datetime
 import traceback
-
+from tracing import traced_class, span
+
+REPORT_STATUSES = ("resolved", "denied", "in_progress", "open", "closed")
+REPORT_CATEGORIES = (
+    "pothole",
+    "street_light",
+    "traffic_signal",
+    "road_damage",
+    "sanitation",
+    "flooding",
+    "water_outage",
+    "wandering_waste",
+    "electrical_hazard",
+    "sinkhole",
+    "fallen_tree",
+    "pipe_leak",
+    "other",
+)
+
+@traced_class
 class ReportsHandler:
     # -----------------------------------
     # Helpers for admin-based restrictions
@@ -83,13 +111,89 @@ class ReportsHandler:
             "rating": report[13],
         }
 
+    @staticmethod
+    def map_duplicate_to_dict(row):
+        """
+        Row layout from ReportsDAO.find_duplicate_candidates:
+          0 id, 1 title, 2 status, 3 category, 4 created_at, 5 location, 6 city,
+          7 image_url, 8 rating, 9 distance_m, 10 score
+        """
+        return {
+            "id": row[0],
+            "title": row[1],
+            "status": row[2],
+            "category": row[3],
+            "created_at": row[4],
+            "location": row[5],
+            "city": row[6],
+            "image_url": row[7],
+            "rating": row[8],
+            "distance_m": round(float(row[9]), 1) if row[9] is not None else None,
+            "similarity": round(float(row[10]), 3) if row[10] is not None else None,
+        }
+
+    def _find_duplicates(self, dao, category, title, description, location_id=None, latitude=None, longitude=None):
+        """
+        Return mapped duplicate candidates for a report about to be created.
+        Device coordinates are matched by distance; a location_id (a shared
+        location row) is matched by row, on text similarity alone.
+        A failing check never blocks report creation; it just returns [].
+        """
+        try:
+            if location_id is None and (latitude is None or longitude is None):
+                return []
+
+            rows = dao.find_duplicate_candidates(
+                category=category,
+                latitude=float(latitude) if location_id is None else None,
+                longitude=float(longitude) if location_id is None else None,
+                title=title or "",
+                description=description or "",
+                radius_m=DUPLICATE_RADIUS_M,
+                window_hours=DUPLICATE_WINDOW_HOURS,
+                min_similarity=DUPLICATE_MIN_SIMILARITY,
+                location_id=location_id,
+            )
+            return [self.map_duplicate_to_dict(row) for row in rows]
+        except Exception as e:
+            print("[duplicate_check] ERROR:", e)
+            return []
+
+    # -----------------------------------
+    # GET /reports/duplicates
+    # -----------------------------------
+    def find_duplicate_reports(self, category, title=None, description=None, location_id=None, latitude=None, longitude=None):
+        """Pre-submission check so the form can suggest upvoting an existing report."""
+        try:
+            if not category:
+                return jsonify({"error_msg": "category is required"}), HTTP_STATUS.BAD_REQUEST
+            if location_id is None and (latitude is None or longitude is None):
+                return (
+                    jsonify({"error_msg": "Provide location_id or latitude and longitude"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+
+            dao = ReportsDAO()
+            duplicates = self._find_duplicates(
+                dao, category, title, description, location_id, latitude, longitude
+            )
+            return jsonify({"duplicates": duplicates, "count": len(duplicates)}), HTTP_STATUS.OK
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
     # -----------------------------------
     # GET /reports  (with optional admin_id, location filters)
     # -----------------------------------
-    def get_all_reports(self, page=1, limit=10, sort=None, admin_id=None, location_id=None, city=None): #
+    def get_all_reports(self, page=1, limit=10, sort=None, admin_id=None, location_id=None, city=None, fields=None): #
         """
         Added optional location_id and city params. Pass whichever the frontend provides.
+        `fields` ("title,status,city") limits the columns selected and returned.
         """
+        try:
+            selected = parse_fields(fields, REPORT_FIELDS)
+        except ValueError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
+
         try:
             offset = (page - 1) * limit
             dao = ReportsDAO()
@@ -103,6 +207,7 @@ class ReportsHandler:
                 allowed_categories=allowed_categories,
                 location_id=location_id,
                 city=city,
+                fields=selected,
             )
             total_count = dao.get_total_report_count(
                 allowed_categories=allowed_categories,
@@ -110,7 +215,9 @@ class ReportsHandler:
                 city=city,
             )
             total_pages = (total_count + limit - 1) // limit
-            reports_dict_list = [self.map_to_dict(report) for report in reports]
+            # sparse rows are already dicts keyed by field name
+            with span("map_to_dict", rows=len(reports)):
+                reports_dict_list = reports if selected else [self.map_to_dict(report) for report in reports]
             return (
                 jsonify(
                     {
@@ -148,6 +255,8 @@ class ReportsHandler:
             description = data.get("description")
             category = data.get("category", "other")
             location_id = data.get("location_id")
+            latitude = data.get("latitude")
+            longitude = data.get("longitude")
             city = data.get("city")
             image_url = data.get("image_url")
             created_by = data.get("user_id")  # comes from frontend as user_id
@@ -206,7 +315,39 @@ class ReportsHandler:
                         jsonify({"error_msg": "Location ID must be an integer"}),
                         HTTP_STATUS.BAD_REQUEST,
                     )
-            
+                # Coordinates come from the referenced location row
+                latitude = longitude = None
+            elif latitude is not None and longitude is not None:
+                try:
+                    latitude = float(latitude)
+                    longitude = float(longitude)
+                except (TypeError, ValueError):
+                    return (
+                        jsonify({"error_msg": "Latitude and longitude must be numbers"}),
+                        HTTP_STATUS.BAD_REQUEST,
+                    )
+                if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+                    return (
+                        jsonify({"error_msg": "Invalid coordinates"}),
+                        HTTP_STATUS.BAD_REQUEST,
+                    )
+            else:
+                latitude = longitude = None
+
+            # Near-duplicate check: returned with the new report so the client can
+            # point at (or upvote) an existing one; it never blocks creation
+            duplicates = self._find_duplicates(
+                dao, category, title, description, location_id, latitude, longitude
+            )
+
+            if location_id is None and latitude is not None:
+                # Snap raw coordinates onto an existing nearby location (or create one)
+                location_row, _ = LocationsDAO().get_or_create_location(
+                    city, latitude, longitude, LOCATION_SNAP_RADIUS_M
+                )
+                location_id = location_row[0]
+                city = city or location_row[1]
+
             inserted_report = dao.create_report(
                 title=title,
                 description=description,
@@ -222,7 +363,9 @@ class ReportsHandler:
                     jsonify({"error_msg": "Failed to create report"}),
                     HTTP_STATUS.INTERNAL_SERVER_ERROR,
                 )
-            return jsonify(self.map_to_dict(inserted_report)), HTTP_STATUS.CREATED
+            report = self.map_to_dict(inserted_report)
+            report["duplicates"] = duplicates
+            return jsonify(report), HTTP_STATUS.CREATED
         except Exception as e:
             print("[create_report] ERROR:", e)
             traceback.print_exc()
@@ -236,7 +379,8 @@ class ReportsHandler:
                     jsonify({"error_msg": "Missing request data"}),
                     HTTP_STATUS.BAD_REQUEST,
                 )
-            if not dao.get_report_by_id(report_id):
+            existing = dao.get_report_by_id(report_id)
+            if not existing:
                 return (
                     jsonify({"error_msg": "Report not found"}),
                     HTTP_STATUS.NOT_FOUND,
@@ -298,6 +442,13 @@ class ReportsHandler:
                 location_id=location_id,
                 image_url=image_url,
             )
+
+            # Move the upload reference when the image changes
+            if image_url is not None and image_url != existing[12]:
+                UploadsHandler.add_image_reference(image_url)
+                if existing[12]:
+                    UploadsHandler.release_image(existing[12])
+
             return (
                 jsonify({"message": "Report updated successfully"}),
                 HTTP_STATUS.OK,
@@ -310,7 +461,8 @@ class ReportsHandler:
     def delete_report(self, report_id):
         try:
             dao = ReportsDAO()
-            if not dao.get_report_by_id(report_id):
+            report = dao.get_report_by_id(report_id)
+            if not report:
                 return jsonify({"error_msg": "Report not found"}), HTTP_STATUS.NOT_FOUND
             success = dao.delete_report(report_id)
             if not success:
@@ -318,6 +470,9 @@ class ReportsHandler:
                     jsonify({"error_msg": "Failed to delete report"}),
                     HTTP_STATUS.INTERNAL_SERVER_ERROR,
                 )
+            # image_url is at index 12; gc_uploads removes the file once no report uses it
+            if report[12]:
+                UploadsHandler.release_image(report[12])
             return "", HTTP_STATUS.NO_CONTENT
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
@@ -335,6 +490,7 @@ class ReportsHandler:
         admin_id=None,  # 👈 NEW
         location_id=None,
         city=None, #
+        fields=None,
     ):
         """
         Handles:
@@ -343,7 +499,13 @@ class ReportsHandler:
         - search + filter  (/reports/search?q=...&status=... [&category=...] [&sort=...])
         - location filters: pass location_id (exact) or city (name)
         - AND applies backend admin category restriction if admin_id is provided.
+        - fields=title,status,... limits the columns selected and returned.
         """
+        try:
+            selected = parse_fields(fields, REPORT_FIELDS)
+        except ValueError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
+
         try:
             q = (query or "").strip()
             s = (status or "").strip()
@@ -358,24 +520,10 @@ class ReportsHandler:
                     HTTP_STATUS.BAD_REQUEST,
                 )
 
-            if s and s not in ["resolved", "denied", "in_progress", "open", "closed"]:
+            if s and s not in REPORT_STATUSES:
                 return jsonify({"error_msg": "Invalid status"}), HTTP_STATUS.BAD_REQUEST
 
-            if c and c not in [
-                "pothole",
-                "street_light",
-                "traffic_signal",
-                "road_damage",
-                "sanitation",
-                "flooding",
-                "water_outage",
-                "wandering_waste",
-                "electrical_hazard",
-                "sinkhole",
-                "fallen_tree",
-                "pipe_leak",
-                "other",
-            ]:
+            if c and c not in REPORT_CATEGORIES:
                 return (
                     jsonify({"error_msg": "Invalid category"}),
                     HTTP_STATUS.BAD_REQUEST,
@@ -397,10 +545,12 @@ class ReportsHandler:
                 allowed_categories=allowed_categories,  # 👈 pass restriction
                 location_id=location_id,
                 city=city, #
+                fields=selected,
             )
 
             total_pages = (total_count + limit - 1) // limit
-            reports = [self.map_to_dict(r) for r in rows]
+            with span("map_to_dict", rows=len(rows)):
+                reports = rows if selected else [self.map_to_dict(r) for r in rows]
 
             return (
                 jsonify(
@@ -0,0 +1,160 @@
+import asyncio
+
+from dao.d_reports_async import AsyncReportsDAO
+from dao.fields import parse_fields
+from dao.d_reports import REPORT_FIELDS
+from handler.h_reports import ReportsHandler, REPORT_STATUSES, REPORT_CATEGORIES
+from constants import HTTP_STATUS, REPORT_EVENTS_POLL_SECONDS, REPORT_EVENTS_MAX_SECONDS
+
+
+class AsyncReportsHandler(ReportsHandler):
+    """
+    Read-only report endpoints for the ASGI serving mode. Same payloads and
+    status codes as ReportsHandler, but returned as (dict, status) for the
+    caller to render, since there is no Flask app context to jsonify in.
+    """
+
+    def __init__(self, pool):
+        self.dao = AsyncReportsDAO(pool)
+
+    async def _allowed_categories(self, admin_id: int | None):
+        if not admin_id:
+            return None
+        info = await self.dao.get_admin_info_for_user(admin_id)
+        if not info or not info.get("admin"):
+            return None
+        return self._department_allowed_categories(info.get("department"))
+
+    # -----------------------------------
+    # GET /reports
+    # -----------------------------------
+    async def get_all_reports(self, page=1, limit=10, sort=None, admin_id=None, location_id=None, city=None, fields=None):
+        try:
+            selected = parse_fields(fields, REPORT_FIELDS)
+        except ValueError as e:
+            return {"error_msg": str(e)}, HTTP_STATUS.BAD_REQUEST
+
+        try:
+            offset = (page - 1) * limit
+            allowed_categories = await self._allowed_categories(admin_id)
+
+            reports = await self.dao.get_reports_paginated(
+                limit,
+                offset,
+                sort=sort,
+                allowed_categories=allowed_categories,
+                location_id=location_id,
+                city=city,
+                fields=selected,
+            )
+            total_count = await self.dao.get_total_report_count(
+                allowed_categories=allowed_categories,
+                location_id=location_id,
+                city=city,
+            )
+            total_pages = (total_count + limit - 1) // limit
+            return (
+                {
+                    "reports": reports if selected else [self.map_to_dict(report) for report in reports],
+                    "totalPages": total_pages,
+                    "currentPage": page,
+                    "totalCount": total_count,
+                },
+                HTTP_STATUS.OK,
+            )
+        except Exception as e:
+            return {"error_msg": str(e)}, HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    async def get_report_by_id(self, report_id):
+        try:
+            report = await self.dao.get_report_by_id(report_id)
+            if not report:
+                return {"error_msg": "Report not found"}, HTTP_STATUS.NOT_FOUND
+            return self.map_to_dict(report), HTTP_STATUS.OK
+        except Exception as e:
+            return {"error_msg": str(e)}, HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    # -----------------------------------
+    # GET /reports/search
+    # -----------------------------------
+    async def search_reports(
+        self, query=None, page=1, limit=10, status=None, category=None, sort=None,
+        admin_id=None, location_id=None, city=None, fields=None,
+    ):
+        try:
+            selected = parse_fields(fields, REPORT_FIELDS)
+        except ValueError as e:
+            return {"error_msg": str(e)}, HTTP_STATUS.BAD_REQUEST
+
+        try:
+            q = (query or "").strip()
+            s = (status or "").strip()
+            c = (category or "").strip()
+            order = (sort or "").strip().lower()
+
+            if not q and not s and not c and not location_id and not city:
+                return (
+                    {"error_msg": "Provide at least one of: q, status, category, location_id, city"},
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+            if s and s not in REPORT_STATUSES:
+                return {"error_msg": "Invalid status"}, HTTP_STATUS.BAD_REQUEST
+            if c and c not in REPORT_CATEGORIES:
+                return {"error_msg": "Invalid category"}, HTTP_STATUS.BAD_REQUEST
+
+            offset = (page - 1) * limit
+            allowed_categories = await self._allowed_categories(admin_id)
+
+            rows, total_count = await self.dao.search_reports(
+                q=q if q else None,
+                status=s if s else None,
+                category=c if c else None,
+                limit=limit,
+                offset=offset,
+                sort=order if order in ("asc", "desc") else None,
+                allowed_categories=allowed_categories,
+                location_id=location_id,
+                city=city,
+                fields=selected,
+            )
+            total_pages = (total_count + limit - 1) // limit
+            return (
+                {
+                    "reports": rows if selected else [self.map_to_dict(r) for r in rows],
+                    "totalPages": total_pages,
+                    "currentPage": page,
+                    "totalCount": total_count,
+                    "query": q or None,
+                    "status": s or None,
+                    "category": c or None,
+                    "sort": (order if order in ("asc", "desc") else "desc"),
+                },
+                HTTP_STATUS.OK,
+            )
+        except Exception as e:
+            return {"error_msg": str(e)}, HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    # -----------------------------------
+    # GET /reports/events (server-sent events)
+    # -----------------------------------
+    async def stream_new_reports(self, after_id=None, admin_id=None):
+        """
+        Yield (report_id, report_dict) for every report created after `after_id`
+        (default: from now on), and (None, None) as a heartbeat on idle polls.
+        Ends after REPORT_EVENTS_MAX_SECONDS; EventSource clients reconnect
+        with Last-Event-ID and pick up where they left off.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + REPORT_EVENTS_MAX_SECONDS
+        allowed_categories = await self._allowed_categories(admin_id)
+        if after_id is None:
+            after_id = await self.dao.get_latest_report_id()
+
+        while loop.time() < deadline:
+            rows = await self.dao.get_reports_after(after_id, allowed_categories)
+            for row in rows:
+                after_id = row[0]
+                yield after_id, self.map_to_dict(row)
+            if not rows:
+                yield None, None
+            await asyncio.sleep(REPORT_EVENTS_POLL_SECONDS)
@@ -0,0 +1,376 @@
+import hashlib
+import mimetypes
+import posixpath
+import time
+import uuid
+
+from flask import request, jsonify, current_app
+from werkzeug.http import parse_options_header
+
+from dao.d_uploads import UploadsDAO
+from constants import (
+    HTTP_STATUS,
+    IMAGE_VARIANTS,
+    ALLOWED_IMAGE_EXTENSIONS,
+    UPLOAD_MAX_BYTES,
+    UPLOAD_SESSION_MAX_CHUNK_BYTES,
+    UPLOAD_SESSION_TTL_HOURS,
+)
+from media.backends import get_storage
+from media.resumable import create_session, get_session, append_chunk, delete_session, finalizing
+from media.store import (
+    StoredUpload,
+    content_filename,
+    pending_filename,
+    store_stream,
+    iter_file_chunks,
+    url_for_filename,
+    filename_from_url,
+)
+from media.streaming import MultipartFileReader, UploadRejected, sniffed_chunks
+from media.thumbnails import schedule_thumbnails, pick_variant
+from tracing import traced_class
+
+
+def allowed_file(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_IMAGE_EXTENSIONS
+
+
+def normalize_extension(filename: str) -> str:
+    """Stored extensions follow sniff_image_type: 'jpeg' is stored as 'jpg'."""
+    ext = filename.rsplit(".", 1)[1].lower()
+    return "jpg" if ext == "jpeg" else ext
+
+
+def is_sha256(value: str) -> bool:
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+def is_upload_id(value: str) -> bool:
+    return len(value) == 32 and all(c in "0123456789abcdef" for c in value)
+
+
+@traced_class
+class UploadsHandler:
+
+    def upload_image(self):
+        """
+        Accepts: multipart/form-data with field "image"
+        The body is parsed as a stream and the content must really be an image
+        (checked against its magic bytes, not just the extension).
+        Stores the file by content hash (identical photos are stored once)
+        Returns: { "url": "/uploads/ab/cd/<sha256>.jpg", "sha256": ..., "deduplicated": bool }
+        """
+        content_type, options = parse_options_header(request.headers.get("Content-Type", ""))
+        boundary = options.get("boundary")
+        if content_type != "multipart/form-data" or not boundary:
+            return jsonify({"error": "Expected multipart/form-data"}), HTTP_STATUS.BAD_REQUEST
+
+        reader = MultipartFileReader(request.stream, boundary, "image")
+        try:
+            if not reader.open():
+                return jsonify({"error": "No image file part"}), HTTP_STATUS.BAD_REQUEST
+
+            if reader.filename == "":
+                return jsonify({"error": "No selected file"}), HTTP_STATUS.BAD_REQUEST
+
+            if not allowed_file(reader.filename):
+                return jsonify({"error": "Unsupported file type"}), HTTP_STATUS.BAD_REQUEST
+
+            # The stored extension comes from the content, not the client's filename
+            ext, chunks = sniffed_chunks(reader.chunks())
+
+            stored = store_stream(chunks, get_storage(), ext, max_bytes=UPLOAD_MAX_BYTES)
+        except UploadRejected as e:
+            return jsonify({"error": e.message}), e.status
+        except ValueError as e:
+            # malformed multipart body
+            print("[upload_image] ERROR parsing upload:", e)
+            return jsonify({"error": "Malformed upload"}), HTTP_STATUS.BAD_REQUEST
+
+        return self._finish_upload(stored)
+
+    def _finish_upload(self, stored):
+        """Register a stored file, queue its variants and build the response."""
+        public_url = url_for_filename(stored.filename)
+
+        try:
+            dao = UploadsDAO()
+            dao.register_upload(stored.sha256, public_url, stored.size)
+        except Exception as e:
+            # The file is safely on disk; the GC job picks up untracked files later
+            print("[upload_image] ERROR registering upload:", e)
+
+        if not stored.existed:
+            # resized WebP/JPEG variants are generated in the background
+            schedule_thumbnails(get_storage(), stored.filename)
+
+        return (
+            jsonify(
+                {
+                    "url": public_url,
+                    "sha256": stored.sha256,
+                    "deduplicated": stored.existed,
+                }
+            ),
+            HTTP_STATUS.OK if stored.existed else HTTP_STATUS.CREATED,
+        )
+
+    # -------------------------------
+    # Direct-to-storage uploads
+    # -------------------------------
+    def presign_upload(self, data):
+        """
+        Accepts: { "filename": "photo.jpg", "size": <bytes>, "sha256": <hex of the file> }
+        Returns: { "url": "/uploads/...", "sha256": ..., "upload_id": ...,
+                   "upload": { "url": ..., "fields": {...} } }
+        The client POSTs the file to upload.url with upload.fields, then calls
+        /upload/presign/complete with upload_id. "upload" is null when the
+        content already exists. The object is written under .pending/<upload_id>/
+        and only moves to its content-addressed key once complete has checked
+        it, so an unverified object is never served or counted as a dedup hit.
+        """
+        data = data or {}
+        filename = data.get("filename") or ""
+        size = data.get("size")
+        digest = (data.get("sha256") or "").lower()
+
+        if not filename or not allowed_file(filename):
+            return jsonify({"error": "Unsupported file type"}), HTTP_STATUS.BAD_REQUEST
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            return jsonify({"error": "size must be a positive integer"}), HTTP_STATUS.BAD_REQUEST
+        if size > UPLOAD_MAX_BYTES:
+            return jsonify({"error": "File is too large"}), HTTP_STATUS.PAYLOAD_TOO_LARGE
+        if not is_sha256(digest):
+            return jsonify({"error": "sha256 must be a hex SHA-256 digest"}), HTTP_STATUS.BAD_REQUEST
+
+        storage = get_storage()
+        key = content_filename(digest, normalize_extension(filename))
+        if storage.exists(key):
+            try:
+                # The URL is handed out again, so its GC grace period restarts
+                UploadsDAO().mark_seen(url_for_filename(key))
+            except Exception as e:
+                print("[presign_upload] ERROR refreshing upload:", e)
+            return (
+                jsonify({"url": url_for_filename(key), "sha256": digest, "deduplicated": True, "upload": None}),
+                HTTP_STATUS.OK,
+            )
+
+        upload_id = uuid.uuid4().hex
+        content_type = mimetypes.guess_type(key)[0]
+        upload = storage.presigned_upload(pending_filename(upload_id, key), content_type, UPLOAD_MAX_BYTES)
+        if upload is None:
+            return (
+                jsonify({"error": "Direct uploads are not supported by this storage backend; use /upload"}),
+                HTTP_STATUS.BAD_REQUEST,
+            )
+
+        return (
+            jsonify(
+                {
+                    "url": url_for_filename(key),
+                    "sha256": digest,
+                    "upload_id": upload_id,
+                    "deduplicated": False,
+                    "upload": upload,
+                }
+            ),
+            HTTP_STATUS.CREATED,
+        )
+
+    def complete_presigned_upload(self, data):
+        """
+        Accepts: { "filename": "photo.jpg", "sha256": ..., "upload_id": ... } after
+        the direct upload. The pending object is checked (image signature and
+        hash) and moved to its content-addressed key before it is registered;
+        anything that does not match is deleted.
+        """
+        data = data or {}
+        filename = data.get("filename") or ""
+        digest = (data.get("sha256") or "").lower()
+        upload_id = (data.get("upload_id") or "").lower()
+        if not filename or not allowed_file(filename) or not is_sha256(digest) or not is_upload_id(upload_id):
+            return jsonify({"error": "filename, sha256 and upload_id are required"}), HTTP_STATUS.BAD_REQUEST
+
+        storage = get_storage()
+        key = content_filename(digest, normalize_extension(filename))
+        pending = pending_filename(upload_id, key)
+        try:
+            with storage.open(pending) as f:
+                ext, chunks = sniffed_chunks(iter_file_chunks(f))
+                sha = hashlib.sha256()
+                size = 0
+                for chunk in chunks:
+                    sha.update(chunk)
+                    size += len(chunk)
+        except FileNotFoundError:
+            return jsonify({"error": "Upload not found"}), HTTP_STATUS.NOT_FOUND
+        except UploadRejected as e:
+            storage.delete(pending)
+            return jsonify({"error": e.message}), e.status
+
+        if sha.hexdigest() != digest or ext != key.rsplit(".", 1)[1]:
+            # Keys are trusted to match their content; never keep one that does not
+            storage.delete(pending)
+            return jsonify({"error": "Uploaded content does not match sha256"}), HTTP_STATUS.UNPROCESSABLE_ENTITY
+
+        existed = storage.exists(key)
+        if existed:
+            # Same content finished by someone else meanwhile
+            storage.delete(pending)
+        else:
+            storage.move(pending, key)
+        return self._finish_upload(StoredUpload(key, digest, size, existed))
+
+    # -------------------------------
+    # Resumable uploads
+    # -------------------------------
+    def create_upload_session(self, data):
+        """
+        Accepts: { "filename": "photo.jpg", "size": <total bytes> }
+        Returns: { "session_id": ..., "offset": 0, "size": ..., "expires_in": <seconds> }
+        """
+        filename = (data or {}).get("filename") or ""
+        size = (data or {}).get("size")
+
+        if not filename:
+            return jsonify({"error": "No selected file"}), HTTP_STATUS.BAD_REQUEST
+        if not allowed_file(filename):
+            return jsonify({"error": "Unsupported file type"}), HTTP_STATUS.BAD_REQUEST
+        if not isinstance(size, int) or isinstance(size, bool):
+            return jsonify({"error": "size must be a positive integer"}), HTTP_STATUS.BAD_REQUEST
+
+        try:
+            meta = create_session(current_app.config["UPLOAD_FOLDER"], filename, size)
+        except UploadRejected as e:
+            return jsonify({"error": e.message}), e.status
+
+        return jsonify(self.map_session_to_dict(meta)), HTTP_STATUS.CREATED
+
+    def get_upload_session(self, session_id):
+        try:
+            meta = get_session(current_app.config["UPLOAD_FOLDER"], session_id)
+        except UploadRejected as e:
+            return jsonify({"error": e.message}), e.status
+        return jsonify(self.map_session_to_dict(meta)), HTTP_STATUS.OK
+
+    def put_upload_chunk(self, session_id):
+        """
+        Body: raw chunk bytes
+        Headers: Upload-Offset (required), X-Chunk-SHA256 (optional)
+        On an offset mismatch returns 409 with the offset to resume from.
+        """
+        offset = request.headers.get("Upload-Offset", type=int)
+        if offset is None or offset < 0:
+            return jsonify({"error": "Upload-Offset header is required"}), HTTP_STATUS.BAD_REQUEST
+
+        if request.content_length is not None and request.content_length > UPLOAD_SESSION_MAX_CHUNK_BYTES:
+            return jsonify({"error": "Chunk is too large"}), HTTP_STATUS.PAYLOAD_TOO_LARGE
+
+        chunk = request.stream.read(UPLOAD_SESSION_MAX_CHUNK_BYTES + 1)
+        if len(chunk) > UPLOAD_SESSION_MAX_CHUNK_BYTES:
+            return jsonify({"error": "Chunk is too large"}), HTTP_STATUS.PAYLOAD_TOO_LARGE
+        if not chunk:
+            return jsonify({"error": "Empty chunk"}), HTTP_STATUS.BAD_REQUEST
+
+        upload_folder = current_app.config["UPLOAD_FOLDER"]
+        try:
+            meta = append_chunk(upload_folder, session_id, offset, chunk, request.headers.get("X-Chunk-SHA256"))
+        except UploadRejected as e:
+            body = {"error": e.message}
+            if e.status == HTTP_STATUS.CONFLICT:
+                body.update(self.map_session_to_dict(get_session(upload_folder, session_id)))
+            return jsonify(body), e.status
+
+        return jsonify(self.map_session_to_dict(meta)), HTTP_STATUS.OK
+
+    def finalize_upload_session(self, session_id):
+        """
+        Check the assembled file and move it into the content store.
+        Returns the same body as POST /upload.
+        """
+        upload_folder = current_app.config["UPLOAD_FOLDER"]
+        try:
+            with finalizing(upload_folder, session_id) as (meta, f):
+                if meta["offset"] != meta["size"]:
+                    return (
+                        jsonify({"error": "Upload is incomplete", **self.map_session_to_dict(meta)}),
+                        HTTP_STATUS.CONFLICT,
+                    )
+
+                if not allowed_file(meta["filename"]):
+                    return jsonify({"error": "Unsupported file type"}), HTTP_STATUS.BAD_REQUEST
+
+                ext, chunks = sniffed_chunks(iter_file_chunks(f))
+                stored = store_stream(chunks, get_storage(), ext, max_bytes=UPLOAD_MAX_BYTES)
+                # still under the lock, so a retry waiting on it finds the session gone
+                delete_session(upload_folder, session_id)
+        except UploadRejected as e:
+            return jsonify({"error": e.message}), e.status
+
+        return self._finish_upload(stored)
+
+    @staticmethod
+    def map_session_to_dict(meta):
+        expires_at = meta["updated_at"] + UPLOAD_SESSION_TTL_HOURS * 3600
+        return {
+            "session_id": meta["session_id"],
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "offset": meta["offset"],
+            "chunks": len(meta["chunks"]),
+            "expires_in": max(0, int(expires_at - time.time())),
+        }
+
+    def serve_upload(self, filename):
+        """
+        Serve an uploaded file. Optional ?w=<px> or ?variant=thumb|card|large
+        returns a resized copy when one exists.
+        """
+        storage = get_storage()
+
+        # .tmp/ and .sessions/ hold partial uploads and are never public. Check
+        # the normalized path, since "x/../.sessions/..." resolves into them.
+        filename = posixpath.normpath(filename)
+        if filename.startswith("/") or any(part.startswith(".") for part in filename.split("/")):
+            return jsonify({"error": "Not found"}), HTTP_STATUS.NOT_FOUND
+
+        width = request.args.get("w", type=int)
+        variant = request.args.get("variant")
+        if variant in IMAGE_VARIANTS:
+            width = IMAGE_VARIANTS[variant]
+
+        if width:
+            accept_webp = "image/webp" in request.headers.get("Accept", "")
+            resized = pick_variant(filename, width, accept_webp)
+            if resized:
+                response = storage.serve(resized)
+                response.vary.add("Accept")
+                return response
+
+        return storage.serve(filename)
+
+    @staticmethod
+    def release_image(image_url):
+        """
+        Drop a report's reference to its image. Returns True when nothing
+        references it anymore. The file is not deleted here: the same URL may
+        just have been handed out to another client by a deduplicated upload,
+        so gc_uploads removes it after the grace period. Never raises.
+        """
+        if not filename_from_url(image_url):
+            return False
+        try:
+            return UploadsDAO().release_reference(image_url)
+        except Exception as e:
+            print("[release_image] ERROR:", e)
+            return False
+
+    @staticmethod
+    def add_image_reference(image_url):
+        try:
+            return UploadsDAO().add_reference(image_url)
+        except Exception as e:
+            print("[add_image_reference] ERROR:", e)
+            return False
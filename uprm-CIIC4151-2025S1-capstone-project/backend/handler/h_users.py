@@ -1,8 +1,10 @@
 from flask import request, jsonify
 from dao.d_users import UsersDAO
 from constants import HTTP_STATUS
+from tracing import traced_class
 
 
+@traced_class
 class UsersHandler:
 
     def map_to_dict(self, user):
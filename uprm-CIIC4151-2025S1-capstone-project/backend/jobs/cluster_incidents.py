@@ -0,0 +1,159 @@
+"""
+Background job: group related open reports into incidents.
+
+Two open reports are linked when they share a category, are within
+INCIDENT_RADIUS_M of each other and were filed within INCIDENT_WINDOW_HOURS.
+Linked reports are merged with a union-find; every connected group with at
+least INCIDENT_MIN_REPORTS reports becomes (or stays) an incident and its
+reports get `incident_id` set. Existing incident ids are reused so admins
+keep seeing the same incident between runs.
+
+Usage (from the backend/ directory):
+    python -m jobs.cluster_incidents [--every SECONDS]
+"""
+import argparse
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from constants import INCIDENT_RADIUS_M, INCIDENT_WINDOW_HOURS, INCIDENT_MIN_REPORTS
+from dao.d_incidents import IncidentsDAO
+from spatial import GridIndex
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+        self.rank = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.rank[item] = 0
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+
+    def groups(self):
+        result = defaultdict(list)
+        for item in self.parent:
+            result[self.find(item)].append(item)
+        return list(result.values())
+
+
+def cluster_reports(rows, radius_m, window_hours):
+    """
+    rows: [(id, category, created_at, latitude, longitude, ...)]
+    Returns {category: [[report_id, ...], ...]} connected groups (singletons included).
+
+    Reports are swept in time order per category; only reports inside the time
+    window stay in the grid index, so each report is compared with a handful of
+    spatial neighbours instead of every other open report.
+    """
+    window = timedelta(hours=window_hours)
+    by_category = defaultdict(list)
+    for row in rows:
+        by_category[row[1]].append(row)
+
+    clusters = {}
+    for category, category_rows in by_category.items():
+        category_rows.sort(key=lambda row: (row[2], row[0]))
+        uf = UnionFind()
+        index = GridIndex(cell_size_m=radius_m)
+        active = deque()
+
+        for report_id, _, created_at, latitude, longitude, *_ in category_rows:
+            while active and created_at - active[0][1] > window:
+                expired_id, _ = active.popleft()
+                index.remove(expired_id)
+
+            uf.add(report_id)
+            for neighbour_id, _ in index.nearby(latitude, longitude, radius_m):
+                uf.union(report_id, neighbour_id)
+
+            index.insert(report_id, latitude, longitude)
+            active.append((report_id, created_at))
+
+        clusters[category] = uf.groups()
+    return clusters
+
+
+def run_clustering(radius_m=INCIDENT_RADIUS_M, window_hours=INCIDENT_WINDOW_HOURS, min_reports=INCIDENT_MIN_REPORTS):
+    dao = IncidentsDAO()
+    try:
+        rows = dao.get_open_reports_for_clustering()
+        current_incident = {row[0]: row[5] for row in rows}
+        open_incidents = dao.get_open_incident_ids()
+
+        clusters = cluster_reports(rows, radius_m, window_hours)
+
+        assignments = []
+        created = 0
+        used_incidents = set()
+        for category, groups in clusters.items():
+            for group in groups:
+                if len(group) < min_reports:
+                    assignments.extend((report_id, None) for report_id in group)
+                    continue
+
+                # Reuse the incident most members already belong to
+                votes = defaultdict(int)
+                for report_id in group:
+                    incident_id = current_incident.get(report_id)
+                    if incident_id in open_incidents and incident_id not in used_incidents:
+                        votes[incident_id] += 1
+                if votes:
+                    incident_id = max(votes, key=lambda i: (votes[i], -i))
+                else:
+                    incident_id = dao.create_incident(category)
+                    created += 1
+                used_incidents.add(incident_id)
+                assignments.extend((report_id, incident_id) for report_id in group)
+
+        dao.conn.commit()
+        updated = dao.assign_reports(assignments)
+        removed = dao.refresh_incident_aggregates()
+
+        summary = {
+            "reports": len(rows),
+            "incidents": len(used_incidents),
+            "created": created,
+            "removed": removed,
+            "reports_updated": updated,
+        }
+        print(f"[cluster_incidents] {summary}")
+        return summary
+    finally:
+        dao.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Group related open reports into incidents")
+    parser.add_argument("--radius", type=float, default=INCIDENT_RADIUS_M, help="link radius in meters")
+    parser.add_argument("--window-hours", type=int, default=INCIDENT_WINDOW_HOURS)
+    parser.add_argument("--min-reports", type=int, default=INCIDENT_MIN_REPORTS)
+    parser.add_argument("--every", type=int, default=0, help="keep running, re-clustering every N seconds")
+    args = parser.parse_args()
+
+    while True:
+        run_clustering(args.radius, args.window_hours, args.min_reports)
+        if args.every <= 0:
+            break
+        time.sleep(args.every)
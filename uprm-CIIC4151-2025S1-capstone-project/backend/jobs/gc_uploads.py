@@ -0,0 +1,153 @@
+"""
+Garbage-collect uploaded images that nothing references.
+
+/upload hands out a URL before any report uses it, so abandoned submissions
+leave files behind. This job lists the storage backend in batches, asks the database
+which of each batch's URLs are still referenced (reports.image_url, or a live
+uploads row), and removes the rest together with their resized variants.
+Files younger than --grace-hours are skipped so in-flight submissions are safe,
+and so are older files whose uploads.last_seen is within it: a deduplicated
+upload hands out the existing file's URL without rewriting the file.
+
+Usage (from the backend/ directory):
+    python -m jobs.gc_uploads [--grace-hours 24] [--batch-size 500]
+                              [--quarantine] [--dry-run]
+
+--quarantine moves orphans under .quarantine/ in the same backend instead of deleting.
+"""
+import argparse
+import os
+import time
+
+from constants import UPLOAD_GC_GRACE_HOURS, ALLOWED_IMAGE_EXTENSIONS, THUMBNAIL_WIDTHS, THUMBNAIL_FORMATS
+from dao.d_uploads import UploadsDAO
+from media.backends import get_storage, LocalStorage
+from media.store import url_for_filename, delete_stored
+from media.thumbnails import is_variant_name, variant_name
+
+QUARANTINE_DIR = ".quarantine"
+
+
+def _original_stem(filename):
+    """'ab/cd/<sha>_w480.webp' -> 'ab/cd/<sha>'"""
+    return filename.rsplit(".", 1)[0].rsplit("_w", 1)[0]
+
+
+def _has_original(storage, stem):
+    return any(storage.exists(f"{stem}.{ext}") for ext in ALLOWED_IMAGE_EXTENSIONS)
+
+
+def find_orphans(storage, batch, referenced_urls, cutoff):
+    """
+    Return the filenames of `batch` that can go: originals that are unreferenced
+    and older than `cutoff`, and variants whose original no longer exists.
+    Variants of an orphaned original are removed along with it.
+    """
+    orphans = []
+    for filename, _, mtime in batch:
+        if mtime > cutoff:
+            continue
+        if is_variant_name(filename):
+            if not _has_original(storage, _original_stem(filename)):
+                orphans.append(filename)
+        elif url_for_filename(filename) not in referenced_urls:
+            orphans.append(filename)
+    return orphans
+
+
+def _remove(storage, filename, quarantine, dry_run):
+    """Remove (or quarantine) a file and, for originals, its variants. Returns bytes freed."""
+    if not quarantine and not dry_run:
+        if is_variant_name(filename):
+            return storage.delete(filename)
+        return delete_stored(storage, filename)
+
+    names = [filename]
+    if not is_variant_name(filename):
+        names += [variant_name(filename, w, fmt) for w in THUMBNAIL_WIDTHS for fmt in THUMBNAIL_FORMATS]
+
+    freed = 0
+    for name in names:
+        size = storage.size(name)
+        if size is None:
+            # already gone, e.g. a variant removed together with its original
+            continue
+        if dry_run:
+            print(f"[gc_uploads] would remove {name} ({size} bytes)")
+        else:
+            storage.move(name, f"{QUARANTINE_DIR}/{name}")
+        freed += size
+    return freed
+
+
+def purge_stale_temp_files(storage, cutoff, dry_run):
+    """Partial writes left in .tmp/ by crashed workers. Returns bytes freed."""
+    if not isinstance(storage, LocalStorage):
+        return 0
+    tmp_dir = os.path.join(storage.root, ".tmp")
+    if not os.path.isdir(tmp_dir):
+        return 0
+    freed = 0
+    with os.scandir(tmp_dir) as entries:
+        for entry in entries:
+            stat = entry.stat(follow_symlinks=False)
+            if not entry.is_file(follow_symlinks=False) or stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                os.remove(entry.path)
+            freed += stat.st_size
+    return freed
+
+
+def gc_uploads(grace_hours=UPLOAD_GC_GRACE_HOURS, batch_size=500, quarantine=False, dry_run=False, storage=None):
+    storage = storage or get_storage()
+    cutoff = time.time() - grace_hours * 3600
+    dao = UploadsDAO()
+    scanned = removed = reclaimed = 0
+    try:
+        reclaimed += purge_stale_temp_files(storage, cutoff, dry_run)
+
+        for batch in storage.iter_files(batch_size):
+            scanned += len(batch)
+            urls = [
+                url_for_filename(filename)
+                for filename, _, mtime in batch
+                if mtime <= cutoff and not is_variant_name(filename)
+            ]
+            referenced = dao.get_referenced_urls(urls, grace_hours)
+
+            gone = []
+            for filename in find_orphans(storage, batch, referenced, cutoff):
+                freed = _remove(storage, filename, quarantine, dry_run)
+                if freed:
+                    gone.append(filename)
+                    reclaimed += freed
+
+            removed += len(gone)
+            originals = [f for f in gone if not is_variant_name(f)]
+            if originals and not dry_run:
+                dao.forget_uploads([url_for_filename(f) for f in originals], originals)
+
+        summary = {
+            "backend": storage.name,
+            "scanned": scanned,
+            "removed": removed,
+            "reclaimed_bytes": reclaimed,
+            "quarantined": quarantine,
+            "dry_run": dry_run,
+        }
+        print(f"[gc_uploads] {summary}")
+        return summary
+    finally:
+        dao.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove uploaded images no report references")
+    parser.add_argument("--grace-hours", type=int, default=UPLOAD_GC_GRACE_HOURS)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--quarantine", action="store_true", help="move orphans to .quarantine/ instead of deleting")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    gc_uploads(args.grace_hours, args.batch_size, args.quarantine, args.dry_run)
@@ -0,0 +1,140 @@
+"""
+One-off job: collapse near-identical `location` rows.
+
+Every location within --radius meters of an earlier (lower id) location with a
+compatible city is merged into it. `reports.location` is rewritten in batches
+and the now-unused duplicates are deleted.
+
+Usage (from the backend/ directory):
+    python -m jobs.merge_locations [--radius 25] [--batch-size 1000] [--dry-run]
+"""
+import argparse
+
+from psycopg2.extras import execute_values
+
+from constants import LOCATION_SNAP_RADIUS_M
+from load import load_db
+from spatial import GridIndex
+
+
+def build_merge_map(locations, radius_m):
+    """
+    Given [(id, city, latitude, longitude)] ordered by id, return {duplicate_id: keep_id}.
+    The lowest id in each neighbourhood is kept so existing references stay stable.
+    """
+    index = GridIndex(cell_size_m=radius_m)
+    cities = {}
+    merge_map = {}
+
+    for location_id, city, latitude, longitude in locations:
+        if latitude is None or longitude is None:
+            continue
+
+        keep_id = None
+        for candidate_id, _ in index.nearby(latitude, longitude, radius_m):
+            candidate_city = cities[candidate_id]
+            if city is None or candidate_city is None or city == candidate_city:
+                keep_id = candidate_id
+                break
+
+        if keep_id is None:
+            index.insert(location_id, latitude, longitude)
+            cities[location_id] = city
+        else:
+            merge_map[location_id] = keep_id
+
+    return merge_map
+
+
+def merge_locations(radius_m=LOCATION_SNAP_RADIUS_M, batch_size=1000, dry_run=False):
+    conn = load_db()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, city, latitude, longitude FROM location ORDER BY id")
+            locations = cur.fetchall()
+
+        merge_map = build_merge_map(locations, radius_m)
+        print(f"Scanned {len(locations)} locations, {len(merge_map)} duplicates found")
+
+        if dry_run or not merge_map:
+            return {"locations": len(locations), "duplicates": len(merge_map), "reports_updated": 0, "deleted": 0}
+
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TEMP TABLE location_merge_map (dup_id INTEGER PRIMARY KEY, keep_id INTEGER NOT NULL)"
+            )
+            execute_values(
+                cur,
+                "INSERT INTO location_merge_map (dup_id, keep_id) VALUES %s",
+                list(merge_map.items()),
+                page_size=batch_size,
+            )
+        conn.commit()
+
+        # Rewrite report references in small transactions to keep row locks short
+        reports_updated = 0
+        while True:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH batch AS (
+                        SELECT r.id, m.keep_id
+                        FROM reports r
+                        JOIN location_merge_map m ON r.location = m.dup_id
+                        LIMIT %s
+                    )
+                    UPDATE reports
+                    SET location = batch.keep_id
+                    FROM batch
+                    WHERE reports.id = batch.id
+                    """,
+                    (batch_size,),
+                )
+                updated = cur.rowcount
+            conn.commit()
+            reports_updated += updated
+            if updated == 0:
+                break
+            print(f"Rewrote {reports_updated} report locations so far")
+
+        deleted = 0
+        while True:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    DELETE FROM location
+                    WHERE id IN (
+                        SELECT m.dup_id
+                        FROM location_merge_map m
+                        JOIN location l ON l.id = m.dup_id
+                        WHERE NOT EXISTS (SELECT 1 FROM reports r WHERE r.location = m.dup_id)
+                        LIMIT %s
+                    )
+                    """,
+                    (batch_size,),
+                )
+                removed = cur.rowcount
+            conn.commit()
+            deleted += removed
+            if removed == 0:
+                break
+
+        print(f"Merged {len(merge_map)} locations: {reports_updated} reports updated, {deleted} rows deleted")
+        return {
+            "locations": len(locations),
+            "duplicates": len(merge_map),
+            "reports_updated": reports_updated,
+            "deleted": deleted,
+        }
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge near-duplicate location rows")
+    parser.add_argument("--radius", type=float, default=LOCATION_SNAP_RADIUS_M, help="merge radius in meters")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="only report how many duplicates exist")
+    args = parser.parse_args()
+
+    merge_locations(radius_m=args.radius, batch_size=args.batch_size, dry_run=args.dry_run)
@@ -0,0 +1,20 @@
+"""
+Remove resumable upload sessions that were abandoned part way.
+
+Sessions are also purged whenever a new one is created; this job covers quiet
+periods. Usage (from the backend/ directory):
+    python -m jobs.purge_upload_sessions [--ttl-hours 24] [--upload-folder PATH]
+"""
+import argparse
+
+from constants import UPLOAD_FOLDER, UPLOAD_SESSION_TTL_HOURS
+from media.resumable import purge_expired_sessions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purge expired resumable upload sessions")
+    parser.add_argument("--ttl-hours", type=int, default=UPLOAD_SESSION_TTL_HOURS)
+    parser.add_argument("--upload-folder", default=UPLOAD_FOLDER)
+    args = parser.parse_args()
+
+    removed = purge_expired_sessions(args.upload_folder, args.ttl_hours)
+    print(f"[purge_upload_sessions] removed {removed} expired session(s)")
@@ -1,44 +1,303 @@
 import psycopg2
+import psycopg2.pool
 import bcrypt
-from dotenv import load_dotenv
+from collections import Counter
+from flask import g, has_app_context, has_request_context, request
+from psycopg2.extensions import connection as _connection
 import os
+import threading
+import time
+import weakref
 from urllib.parse import urlparse
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import asyncpg
+except ImportError:  # asyncpg is only needed for the ASGI serving mode
+    asyncpg = None
+
+# Importing constants loads the .env file (once per process)
+from constants import DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_LEAK_MODE
+from query_stats import InstrumentedCursor, calling_method
+import metrics
+
+
+class ConnectionLeakError(RuntimeError):
+    """A request ended with dedicated connections its DAOs never closed (DB_LEAK_MODE=raise)."""
+
+
+class TrackedConnection(_connection):
+    """Connection that tells the leak tracker when it is closed."""
+
+    def close(self):
+        _untrack(self)
+        super().close()
+
+
+# Dedicated (unpooled) connections still open: id(conn) -> (owner, opened at).
+# Pooled connections are not listed; the request teardown always returns them.
+_dedicated = {}
+_dedicated_lock = threading.Lock()
+
+
+def _owner() -> str:
+    """DAO class asking for a connection, e.g. 'ReportsDAO'."""
+    # calling_method <- _owner <- load_db <- SomeDAO.__init__
+    return calling_method(depth=3).split(".")[0]
+
+
+def _track(conn, owner):
+    with _dedicated_lock:
+        _dedicated[id(conn)] = (owner, time.monotonic())
+    weakref.finalize(conn, _collected, id(conn))
+    metrics.connection_opened(owner, "dedicated")
+
+
+def _untrack(conn, leaked=False):
+    with _dedicated_lock:
+        entry = _dedicated.pop(id(conn), None)
+    if entry is None:
+        return None
+    metrics.connection_closed(entry[0], leaked)
+    return entry[0]
+
+
+def _collected(conn_id):
+    """weakref callback: a dedicated connection was freed without close()."""
+    with _dedicated_lock:
+        entry = _dedicated.pop(conn_id, None)
+    if entry is None:
+        return
+    owner, opened = entry
+    print(f"[db-leak] connection opened by {owner} was garbage-collected without close() after {time.monotonic() - opened:.1f}s")
+    metrics.connection_closed(owner, leaked=True)
+
+
+def open_connections() -> Counter:
+    """Dedicated connections currently open in this process, by DAO class."""
+    with _dedicated_lock:
+        return Counter(owner for owner, _ in _dedicated.values())
+
+
+def _connect():
+    """Open a new connection from DATABASE_URL or the individual variables."""
+    # Prefer Heroku DATABASE_URL if it exists
+    database_url = os.getenv("DATABASE_URL")
+
+    if database_url:
+        # Heroku case
+        return psycopg2.connect(
+            database_url, connect_timeout=5, connection_factory=TrackedConnection, cursor_factory=InstrumentedCursor
+        )
+
+    # Local development (fallback to individual vars)
+    conn = psycopg2.connect(
+        dbname=os.getenv("DATABASE"),
+        user=os.getenv("USER"),
+        password=os.getenv("PASSWORD"),
+        host=os.getenv("HOST"),
+        port=os.getenv("PORT"),
+        connect_timeout=5,
+        connection_factory=TrackedConnection,
+        # every DAO cursor is timed and attributed (query_stats.py)
+        cursor_factory=InstrumentedCursor,
+    )
+    print("Database connection established successfully")
+    return conn
+
+
+class ConnectionPool(psycopg2.pool.AbstractConnectionPool):
+    """
+    Thread-safe pool that waits for a free connection instead of raising
+    PoolError straight away, plus up to `max_overflow` connections opened
+    beyond maxconn and closed after use. Under gevent the lock and
+    semaphores are the monkey-patched ones, so waiting greenlets yield to
+    the others.
+    """
+
+    def __init__(self, minconn, maxconn, timeout, max_overflow=0):
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._overflow = threading.BoundedSemaphore(max_overflow)
+        self.timeout = timeout
+        super().__init__(minconn, maxconn)
+        metrics.pool_created(maxconn)
+
+    def _connect(self, key=None):
+        conn = _connect()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+    def getconn(self, key=None, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        metrics.pool_waiting(1)
+        try:
+            acquired = self._slots.acquire(timeout=timeout)
+        finally:
+            metrics.pool_waiting(-1)
+        metrics.observe_pool_wait(time.perf_counter() - started, acquired)
+        if not acquired:
+            raise psycopg2.pool.PoolError(f"no database connection free after {timeout}s")
+        try:
+            with self._lock:
+                conn = self._getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+        metrics.pool_in_use(1)
+        return conn
+
+    def putconn(self, conn, key=None, close=False):
+        with self._lock:
+            self._putconn(conn, key, close)
+        self._slots.release()
+        metrics.pool_in_use(-1)
+
+    def get_overflow(self):
+        """A fresh connection beyond maxconn, or None when max_overflow are already open."""
+        if not self._overflow.acquire(blocking=False):
+            return None
+        try:
+            return _connect()
+        except Exception:
+            self._overflow.release()
+            raise
+
+    def put_overflow(self, conn):
+        if not conn.closed:
+            conn.close()
+        self._overflow.release()
+
+    def closeall(self):
+        with self._lock:
+            self._closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide pool, created on first use (so after a preload fork)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_OVERFLOW)
+    return _pool
 
 
 def load_db():
     """
     Establish and return a connection to the PostgreSQL database.
 
+    Inside a Flask request every DAO gets its own pooled connection, so each
+    keeps its own transaction as before pooling; release_request_connection()
+    hands them all back at teardown. Only a request's first connection waits
+    for the pool: when it is exhausted, later DAOs of the same request get an
+    overflow connection (closed at teardown) instead of waiting on slots the
+    request itself holds, as long as fewer than DB_POOL_MAX_OVERFLOW are open
+    in the process; past that they wait for the pool too. Elsewhere (jobs, background threads), or with
+    pooling off, a dedicated connection is opened, which the caller closes;
+    those are tracked per DAO class, and ones still open when their request
+    ends or garbage-collected unclosed are reported as leaks (DB_LEAK_MODE).
+
     Returns:
         psycopg2.connection: Database connection object
     """
     try:
-        # Prefer Heroku DATABASE_URL if it exists
-        database_url = os.getenv("DATABASE_URL")
-
-        if database_url:
-            # Heroku case
-            return psycopg2.connect(database_url, connect_timeout=5)
-
-        # Local development (fallback to individual vars)
-        conn = psycopg2.connect(
-            dbname=os.getenv("DATABASE"),
-            user=os.getenv("USER"),
-            password=os.getenv("PASSWORD"),
-            host=os.getenv("HOST"),
-            port=os.getenv("PORT"),
-            connect_timeout=5,
-        )
-        print("Database connection established successfully")
+        owner = _owner()
+        if DB_POOL_MAX_SIZE <= 0 or not has_app_context():
+            conn = _connect()
+            _track(conn, owner)
+            if has_app_context():
+                g.setdefault("db_dedicated", []).append(conn)
+                if has_request_context():
+                    # the request context is gone by the time teardown reports leaks
+                    g.db_request = f"{request.method} {request.path}"
+            return conn
+
+        pooled = g.setdefault("db_pooled", [])
+        if not pooled:
+            conn = get_pool().getconn()
+        else:
+            try:
+                conn = get_pool().getconn(timeout=0)
+            except psycopg2.pool.PoolError:
+                conn = get_pool().get_overflow()
+                if conn is not None:
+                    metrics.connection_opened(owner, "overflow")
+                    g.setdefault("db_overflow", []).append(conn)
+                    return conn
+                conn = get_pool().getconn()
+        metrics.connection_opened(owner, "pooled")
+        pooled.append(conn)
         return conn
     except psycopg2.Error as e:
         print(f"Error connecting to database: {e}")
         raise
 
 
+def release_request_connection(exc=None):
+    """
+    teardown_appcontext hook: return the request's connections to the pool,
+    close its overflow connections and any dedicated connections its DAOs
+    left open, reporting the latter as leaks ("[db-leak]" log line,
+    db_connection_leaks_total). With DB_LEAK_MODE=raise the leak also raises,
+    so a test that hits it fails.
+    """
+    for conn in g.pop("db_pooled", ()):
+        # the pool rolls back anything left uncommitted
+        get_pool().putconn(conn, close=bool(conn.closed))
+    for conn in g.pop("db_overflow", ()):
+        get_pool().put_overflow(conn)
+
+    leaked = [c for c in g.pop("db_dedicated", ()) if not c.closed]
+    if not leaked or DB_LEAK_MODE == "off":
+        return
+
+    owners = Counter()
+    for c in leaked:
+        owners[_untrack(c, leaked=True) or "<unknown>"] += 1
+        c.close()
+    where = g.pop("db_request", "app context")
+    detail = ", ".join(f"{owner} x{count}" for owner, count in owners.items())
+    message = f"{where} ended with {len(leaked)} unclosed connection(s): {detail}"
+    if DB_LEAK_MODE == "raise":
+        raise ConnectionLeakError(message)
+    print(f"[db-leak] {message}")
+
+
+async def create_async_pool(min_size: int = 2, max_size: int = 10):
+    """
+    Create an asyncpg connection pool from the same settings as load_db().
+
+    Returns:
+        asyncpg.Pool: Connection pool for the ASGI serving mode
+    """
+    if asyncpg is None:
+        raise RuntimeError("asyncpg is not installed")
+
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return await asyncpg.create_pool(database_url, min_size=min_size, max_size=max_size, timeout=5)
+
+    return await asyncpg.create_pool(
+        database=os.getenv("DATABASE"),
+        user=os.getenv("USER"),
+        password=os.getenv("PASSWORD"),
+        host=os.getenv("HOST"),
+        port=int(os.getenv("PORT")) if os.getenv("PORT") else None,
+        min_size=min_size,
+        max_size=max_size,
+        timeout=5,
+    )
+
+
 def close_db(conn, cursor):
     """
     Close database connection and cursor.
@@ -0,0 +1,302 @@
+"""
+Storage backends for uploaded images.
+
+Everything that touches upload bytes (the upload handler, serving, thumbnails,
+the GC job) goes through `get_storage()`. Keys are the content-addressed
+filenames from media.store (`ab/cd/<sha256>.jpg`), and public URLs stay
+`/uploads/<key>` whatever the backend, so rows in `reports.image_url` do not
+change when the backend does.
+
+    LocalStorage - files under UPLOAD_FOLDER (the default)
+    S3Storage    - any S3-compatible bucket. boto3 is only needed here. To
+                   try it locally run MinIO and point S3_ENDPOINT_URL at it:
+
+        docker run -p 9000:9000 minio/minio server /data
+        STORAGE_BACKEND=s3 S3_BUCKET=reports S3_ENDPOINT_URL=http://localhost:9000 \\
+        AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin flask run
+
+                   Direct uploads wait under .pending/ until they are checked,
+                   and one that is never completed stays there; give the
+                   bucket a lifecycle rule expiring the .pending/ prefix after
+                   a day.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+
+from flask import redirect
+
+from constants import (
+    STORAGE_BACKEND,
+    UPLOAD_FOLDER,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_SPOOL_MAX_MEMORY,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_REGION,
+    S3_PUBLIC_BASE_URL,
+    S3_PRESIGN_EXPIRES,
+)
+from media.serving import send_upload, content_etag, IMMUTABLE_MAX_AGE
+
+_storage = None
+
+
+class StorageBackend(ABC):
+    """Interface shared by every backend. Keys always use '/' separators."""
+
+    name = "base"
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """True when `key` is stored."""
+
+    @abstractmethod
+    def size(self, key: str) -> int | None:
+        """Size in bytes, or None when the key does not exist."""
+
+    @abstractmethod
+    def save(self, key: str, fileobj, content_type: str | None = None):
+        """Write a readable binary file object to `key`, replacing it atomically."""
+
+    @abstractmethod
+    def open(self, key: str):
+        """Return a readable, seekable binary file object. Raises FileNotFoundError."""
+
+    @abstractmethod
+    def delete(self, key: str) -> int:
+        """Remove `key`. Returns the bytes freed (0 when it did not exist)."""
+
+    @abstractmethod
+    def move(self, key: str, new_key: str):
+        """Rename `key` to `new_key` within the backend."""
+
+    @abstractmethod
+    def iter_files(self, batch_size: int):
+        """Yield lists of (key, size_bytes, mtime) for every stored file."""
+
+    @abstractmethod
+    def serve(self, key: str):
+        """Flask response for GET /uploads/<key>."""
+
+    def presigned_upload(self, key: str, content_type: str, max_bytes: int):
+        """Form fields for a direct browser/app upload, or None if unsupported."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str = UPLOAD_FOLDER):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def save(self, key, fileobj, content_type=None):
+        tmp_dir = os.path.join(self.root, ".tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+        final_path = self.path(key)
+        try:
+            with open(tmp_path, "wb") as out:
+                shutil.copyfileobj(fileobj, out, UPLOAD_CHUNK_SIZE)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            # Atomic rename so readers never see a half-written file
+            os.replace(tmp_path, final_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    def delete(self, key):
+        path = self.path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def move(self, key, new_key):
+        target = self.path(new_key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(self.path(key), target)
+
+    def iter_files(self, batch_size):
+        # Dot-directories (.tmp, .sessions, .quarantine) are never user files
+        batch = []
+        stack = [""]
+        while stack:
+            relative_dir = stack.pop()
+            with os.scandir(os.path.join(self.root, relative_dir)) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    name = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(name)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        batch.append((name, stat.st_size, stat.st_mtime))
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+        if batch:
+            yield batch
+
+    def serve(self, key):
+        return send_upload(self.root, key)
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self, bucket=S3_BUCKET, endpoint_url=S3_ENDPOINT_URL, region=S3_REGION, public_base_url=S3_PUBLIC_BASE_URL):
+        # Imported here rather than at module level: boto3 takes a noticeable
+        # slice of app start-up and the local backend never needs it
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.exceptions import ClientError
+        except ImportError:  # boto3 is optional; only the s3 backend needs it
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+        if not bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        self.client_error = ClientError
+        self.bucket = bucket
+        self.public_base_url = public_base_url
+        # Credentials come from the usual AWS_* environment variables
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        # Objects above one chunk are sent as a multipart upload, one part at a time
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=2,
+        )
+
+    def _head(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except self.client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key):
+        return self._head(key) is not None
+
+    def size(self, key):
+        head = self._head(key)
+        return head["ContentLength"] if head else None
+
+    def _extra_args(self, key, content_type):
+        extra = {}
+        if content_type:
+            extra["ContentType"] = content_type
+        if content_etag(key):
+            extra["CacheControl"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        return extra
+
+    def save(self, key, fileobj, content_type=None):
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs=self._extra_args(key, content_type),
+            Config=self.transfer_config,
+        )
+
+    def open(self, key):
+        # Pillow needs a seekable file; small objects stay in memory
+        spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY)
+        try:
+            self.client.download_fileobj(self.bucket, key, spooled, Config=self.transfer_config)
+        except self.client_error as e:
+            spooled.close()
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(key)
+            raise
+        spooled.seek(0)
+        return spooled
+
+    def delete(self, key):
+        size = self.size(key)
+        if size is None:
+            return 0
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return size
+
+    def move(self, key, new_key):
+        self.client.copy_object(Bucket=self.bucket, Key=new_key, CopySource={"Bucket": self.bucket, "Key": key})
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def iter_files(self, batch_size):
+        paginator = self.client.get_paginator("list_objects_v2")
+        batch = []
+        for page in paginator.paginate(Bucket=self.bucket, PaginationConfig={"PageSize": batch_size}):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if key.startswith("."):
+                    continue
+                batch.append((key, obj["Size"], obj["LastModified"].timestamp()))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def public_url(self, key):
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=S3_PRESIGN_EXPIRES,
+        )
+
+    def serve(self, key):
+        # The bytes come straight from the bucket/CDN, never through a worker
+        response = redirect(self.public_url(key), code=302)
+        response.cache_control.public = True
+        response.cache_control.max_age = S3_PRESIGN_EXPIRES // 2 if not self.public_base_url else 3600
+        return response
+
+    def presigned_upload(self, key, content_type, max_bytes):
+        # Same metadata as save(), but as POST form fields the client must echo
+        fields = {"Content-Type": content_type}
+        if content_etag(key):
+            fields["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        conditions = [{k: v} for k, v in fields.items()]
+        conditions.append(["content-length-range", 1, max_bytes])
+        return self.client.generate_presigned_post(
+            self.bucket,
+            key,
+            Fields=fields,
+            Conditions=conditions,
+            ExpiresIn=S3_PRESIGN_EXPIRES,
+        )
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "s3":
+            _storage = S3Storage()
+        else:
+            _storage = LocalStorage()
+    return _storage
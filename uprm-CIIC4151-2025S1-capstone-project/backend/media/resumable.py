@@ -0,0 +1,179 @@
+"""
+Resumable upload sessions.
+
+Mobile clients on flaky connections upload in three steps:
+
+    POST /upload/sessions                  {"filename": "a.jpg", "size": 123456}
+    PUT  /upload/sessions/<id>             raw chunk bytes, Upload-Offset: <n>,
+                                           X-Chunk-SHA256: <hex> (optional)
+    POST /upload/sessions/<id>/finalize
+
+Chunks are appended to `<UPLOAD_FOLDER>/.sessions/<id>/data` and each one is
+recorded in `meta.json` with its checksum. After a dropped connection the
+client asks GET /upload/sessions/<id> for the current offset and continues
+from there. Sessions untouched for UPLOAD_SESSION_TTL_HOURS are purged.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+from constants import HTTP_STATUS, UPLOAD_MAX_BYTES, UPLOAD_SESSION_TTL_HOURS
+from media.streaming import UploadRejected
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; concurrent PUTs are then unguarded
+    fcntl = None
+
+SESSIONS_DIR = ".sessions"
+
+
+def sessions_root(upload_folder: str) -> str:
+    return os.path.join(upload_folder, SESSIONS_DIR)
+
+
+def _session_dir(upload_folder: str, session_id: str) -> str:
+    # ids are uuid4 hex; anything else could escape the sessions directory
+    if not session_id or len(session_id) != 32 or not all(c in "0123456789abcdef" for c in session_id):
+        raise UploadRejected("Upload session not found", HTTP_STATUS.NOT_FOUND)
+    return os.path.join(sessions_root(upload_folder), session_id)
+
+
+def _read_meta(session_dir: str) -> dict:
+    try:
+        with open(os.path.join(session_dir, "meta.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise UploadRejected("Upload session not found", HTTP_STATUS.NOT_FOUND)
+
+
+def _write_meta(session_dir: str, meta: dict):
+    path = os.path.join(session_dir, "meta.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def finalizing(upload_folder: str, session_id: str):
+    """
+    Hold the session's lock (the one append_chunk takes) and yield its meta
+    and the open data file. A retried finalize waits here and then finds the
+    session deleted; that, or a session purged underneath it, is the same
+    404 as get_session's.
+    """
+    session_dir = _session_dir(upload_folder, session_id)
+    try:
+        f = open(os.path.join(session_dir, "data"), "rb")
+    except FileNotFoundError:
+        raise UploadRejected("Upload session not found", HTTP_STATUS.NOT_FOUND)
+    with f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield _read_meta(session_dir), f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def create_session(upload_folder: str, filename: str, size: int) -> dict:
+    if size <= 0:
+        raise UploadRejected("size must be a positive integer")
+    if size > UPLOAD_MAX_BYTES:
+        raise UploadRejected("File is too large", HTTP_STATUS.PAYLOAD_TOO_LARGE)
+
+    # Cheap enough to do here so abandoned sessions never pile up
+    purge_expired_sessions(upload_folder)
+
+    session_id = uuid.uuid4().hex
+    session_dir = _session_dir(upload_folder, session_id)
+    os.makedirs(session_dir)
+    open(os.path.join(session_dir, "data"), "wb").close()
+
+    now = time.time()
+    meta = {
+        "session_id": session_id,
+        "filename": filename,
+        "size": size,
+        "offset": 0,
+        "chunks": [],
+        "created_at": now,
+        "updated_at": now,
+    }
+    _write_meta(session_dir, meta)
+    return meta
+
+
+def get_session(upload_folder: str, session_id: str) -> dict:
+    return _read_meta(_session_dir(upload_folder, session_id))
+
+
+def append_chunk(upload_folder: str, session_id: str, offset: int, chunk: bytes, checksum: str | None = None) -> dict:
+    """
+    Append `chunk` at `offset`. The offset must equal the bytes received so far;
+    otherwise a 409 is raised and the client should resume from the stored offset.
+    """
+    session_dir = _session_dir(upload_folder, session_id)
+    meta = _read_meta(session_dir)
+
+    if checksum and hashlib.sha256(chunk).hexdigest() != checksum.lower():
+        raise UploadRejected("Chunk checksum mismatch", HTTP_STATUS.UNPROCESSABLE_ENTITY)
+
+    with open(os.path.join(session_dir, "data"), "ab") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            # Re-read under the lock: a retried PUT may have raced the original
+            meta = _read_meta(session_dir)
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadRejected(f"Expected offset {current}", HTTP_STATUS.CONFLICT)
+            if current + len(chunk) > meta["size"]:
+                raise UploadRejected("Chunk exceeds declared size", HTTP_STATUS.PAYLOAD_TOO_LARGE)
+
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+            meta["offset"] = current + len(chunk)
+            meta["chunks"].append([offset, len(chunk), checksum or hashlib.sha256(chunk).hexdigest()])
+            meta["updated_at"] = time.time()
+            _write_meta(session_dir, meta)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    return meta
+
+
+def delete_session(upload_folder: str, session_id: str):
+    shutil.rmtree(_session_dir(upload_folder, session_id), ignore_errors=True)
+
+
+def purge_expired_sessions(upload_folder: str, ttl_hours: int = UPLOAD_SESSION_TTL_HOURS) -> int:
+    """Remove sessions not written to for `ttl_hours`. Returns how many were removed."""
+    root = sessions_root(upload_folder)
+    if not os.path.isdir(root):
+        return 0
+
+    cutoff = time.time() - ttl_hours * 3600
+    removed = 0
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                with open(os.path.join(entry.path, "meta.json")) as f:
+                    updated_at = json.load(f).get("updated_at", 0)
+            except (OSError, ValueError):
+                # half-created or corrupt session: fall back to the directory mtime
+                updated_at = entry.stat().st_mtime
+            if updated_at < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+    return removed
@@ -0,0 +1,71 @@
+"""
+Sending upload files to the client.
+
+Content-addressed names (`ab/cd/<sha256>.jpg` and their `_w<width>` variants)
+never change, so they are sent with a one year `immutable` Cache-Control and
+the hash as ETag. Older uuid-named uploads get a short max-age.
+
+With UPLOAD_SERVE_MODE set to "x-accel" or "x-sendfile" the worker only
+returns headers and the front server sends the body (including Range
+requests), so image traffic does not hold a Python worker. For nginx:
+
+    location /protected-uploads/ {
+        internal;
+        alias /path/to/backend/uploads/;
+    }
+"""
+import mimetypes
+import os
+import re
+
+from flask import request, send_file
+from werkzeug.security import safe_join
+from werkzeug.exceptions import NotFound
+from werkzeug.wrappers import Response
+
+from constants import UPLOAD_SERVE_MODE, UPLOAD_ACCEL_PREFIX, UPLOAD_LEGACY_MAX_AGE
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_CONTENT_ADDRESSED = re.compile(r"^([0-9a-f]{64})(_w\d+)?\.[a-z0-9]+$")
+
+
+def content_etag(filename: str) -> str | None:
+    """'ab/cd/<sha>_w480.webp' -> '<sha>_w480.webp'; None for legacy names."""
+    basename = os.path.basename(filename)
+    if _CONTENT_ADDRESSED.match(basename):
+        return basename
+    return None
+
+
+def send_upload(upload_folder: str, filename: str, mode: str = UPLOAD_SERVE_MODE):
+    path = safe_join(upload_folder, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    etag = content_etag(filename)
+    max_age = IMMUTABLE_MAX_AGE if etag else UPLOAD_LEGACY_MAX_AGE
+
+    if mode in ("x-accel", "x-sendfile"):
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        if mode == "x-accel":
+            response.headers["X-Accel-Redirect"] = UPLOAD_ACCEL_PREFIX + filename.replace(os.sep, "/")
+        else:
+            response.headers["X-Sendfile"] = os.path.abspath(path)
+        response.headers["Accept-Ranges"] = "bytes"
+        if etag:
+            response.set_etag(etag)
+        else:
+            stat = os.stat(path)
+            response.set_etag(f"{int(stat.st_mtime)}-{stat.st_size}")
+        # Answer revalidations here; the front server only sees full/range GETs
+        response.make_conditional(request)
+    else:
+        # send_file handles Range, If-Range and If-None-Match itself
+        response = send_file(path, etag=etag or True, conditional=True, max_age=max_age)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if etag:
+        response.cache_control.immutable = True
+    return response
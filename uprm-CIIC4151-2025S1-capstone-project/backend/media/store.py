@@ -0,0 +1,87 @@
+"""
+Content-addressed upload storage.
+
+Files are stored under their SHA-256: `ab/cd/abcd....jpg`. The hash is computed
+while the bytes are spooled, so identical photos (or a retried upload) end up
+at the same path and are only stored once.
+"""
+import mimetypes
+from collections import namedtuple
+
+from constants import THUMBNAIL_WIDTHS, THUMBNAIL_FORMATS, UPLOAD_CHUNK_SIZE
+from media.streaming import SpooledHashingWriter
+from media.thumbnails import variant_name
+
+CHUNK_SIZE = UPLOAD_CHUNK_SIZE
+UPLOADS_URL_PREFIX = "/uploads/"
+# Direct uploads land here until their content is checked; like every
+# dot-directory it is never served or listed for the GC
+PENDING_DIR = ".pending"
+
+StoredUpload = namedtuple("StoredUpload", ["filename", "sha256", "size", "existed"])
+
+
+def content_filename(digest: str, ext: str) -> str:
+    """Two levels of 2-hex-char shards keep directories small."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def pending_filename(upload_id: str, filename: str) -> str:
+    """Where a direct upload of `filename` waits for /upload/presign/complete."""
+    return f"{PENDING_DIR}/{upload_id}/{filename}"
+
+
+def url_for_filename(filename: str) -> str:
+    return f"{UPLOADS_URL_PREFIX}{filename}"
+
+
+def filename_from_url(url: str | None) -> str | None:
+    """'/uploads/ab/cd/x.jpg' -> 'ab/cd/x.jpg'; None for external or empty URLs."""
+    if not url or not url.startswith(UPLOADS_URL_PREFIX):
+        return None
+    filename = url[len(UPLOADS_URL_PREFIX):]
+    if not filename or ".." in filename.split("/"):
+        return None
+    return filename
+
+
+def iter_file_chunks(fileobj, chunk_size: int = CHUNK_SIZE):
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def store_spooled(writer: SpooledHashingWriter, storage, ext: str) -> StoredUpload:
+    """
+    Move an already hashed SpooledHashingWriter into the storage backend. When
+    the content is already present nothing is written at all.
+    """
+    digest = writer.hexdigest()
+    filename = content_filename(digest, ext)
+
+    if storage.exists(filename):
+        return StoredUpload(filename, digest, writer.size, True)
+
+    storage.save(filename, writer.rewind(), content_type=mimetypes.guess_type(filename)[0])
+    return StoredUpload(filename, digest, writer.size, False)
+
+
+def store_stream(chunks, storage, ext: str, max_bytes: int | None = None) -> StoredUpload:
+    """
+    Write an iterable of byte chunks into the store, hashing on the fly.
+    Raises UploadRejected if more than max_bytes arrive.
+    """
+    with SpooledHashingWriter(max_bytes=max_bytes) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+        return store_spooled(writer, storage, ext)
+
+
+def delete_stored(storage, filename: str) -> int:
+    """Remove an upload and its resized variants. Returns bytes freed."""
+    names = [filename] + [
+        variant_name(filename, width, fmt) for width in THUMBNAIL_WIDTHS for fmt in THUMBNAIL_FORMATS
+    ]
+    return sum(storage.delete(name) for name in names)
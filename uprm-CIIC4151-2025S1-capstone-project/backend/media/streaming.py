@@ -0,0 +1,151 @@
+"""
+Streaming upload helpers.
+
+The multipart body is parsed incrementally straight from the WSGI input, so
+the image is never buffered whole by Werkzeug. The first bytes are sniffed
+for a known image signature before anything else is read, the size limit is
+enforced chunk by chunk, and the bytes go through a spooled temp file that
+is hashed as it is written.
+"""
+import hashlib
+import tempfile
+
+from werkzeug.sansio.multipart import MultipartDecoder, File, Data, Epilogue, NeedData
+
+from constants import HTTP_STATUS, UPLOAD_CHUNK_SIZE, UPLOAD_SPOOL_MAX_MEMORY
+
+# Enough bytes to recognise every signature below
+SNIFF_BYTES = 12
+
+
+class UploadRejected(Exception):
+    def __init__(self, message, status=HTTP_STATUS.BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """Return the stored extension for a recognised image signature, else None."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def sniffed_chunks(chunks):
+    """
+    Read just enough of `chunks` to identify the image type.
+    Returns (ext, iterator over all chunks including the sniffed head).
+    Raises UploadRejected when the content is not a supported image.
+    """
+    head = b""
+    iterator = iter(chunks)
+    for chunk in iterator:
+        head += chunk
+        if len(head) >= SNIFF_BYTES:
+            break
+
+    ext = sniff_image_type(head)
+    if ext is None:
+        raise UploadRejected("File content is not a supported image", HTTP_STATUS.BAD_REQUEST)
+
+    def replay():
+        yield head
+        yield from iterator
+
+    return ext, replay()
+
+
+class SpooledHashingWriter:
+    """
+    Write-through SHA-256 + size accounting over a SpooledTemporaryFile, so small
+    uploads stay in memory and large ones spill to disk in bounded chunks.
+    """
+
+    def __init__(self, max_bytes: int | None = None, max_memory: int = UPLOAD_SPOOL_MAX_MEMORY):
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self.sha = hashlib.sha256()
+        self.size = 0
+        self.max_bytes = max_bytes
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise UploadRejected("File is too large", HTTP_STATUS.PAYLOAD_TOO_LARGE)
+        self.sha.update(chunk)
+        self.file.write(chunk)
+
+    def hexdigest(self) -> str:
+        return self.sha.hexdigest()
+
+    def rewind(self):
+        self.file.seek(0)
+        return self.file
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MultipartFileReader:
+    """
+    Pull the file part named `field_name` out of a multipart body, chunk by chunk.
+
+        reader = MultipartFileReader(request.stream, boundary, "image")
+        if reader.open():
+            for chunk in reader.chunks(): ...
+    """
+
+    def __init__(self, stream, boundary: str, field_name: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.stream = stream
+        self.field_name = field_name
+        self.chunk_size = chunk_size
+        self.decoder = MultipartDecoder(boundary.encode("latin-1"))
+        self.filename = None
+        self._finished = False
+
+    def _next_event(self):
+        while True:
+            event = self.decoder.next_event()
+            if not isinstance(event, NeedData):
+                return event
+            if self._finished:
+                return Epilogue(data=b"")
+            data = self.stream.read(self.chunk_size)
+            if not data:
+                self._finished = True
+                self.decoder.receive_data(None)
+            else:
+                self.decoder.receive_data(data)
+
+    def open(self) -> bool:
+        """Advance to the wanted file part. Returns False if the body has none."""
+        while True:
+            event = self._next_event()
+            if isinstance(event, Epilogue):
+                return False
+            if isinstance(event, File) and event.name == self.field_name:
+                self.filename = event.filename or ""
+                return True
+
+    def chunks(self):
+        """Yield the bytes of the opened file part."""
+        while True:
+            event = self._next_event()
+            if not isinstance(event, Data):
+                return
+            if event.data:
+                yield event.data
+            if not event.more_data:
+                return
@@ -0,0 +1,167 @@
+"""
+Responsive image variants for uploads.
+
+For an upload `abc.jpg` we generate `abc_w160.webp`, `abc_w160.jpg`, ... next
+to the original. Generation runs on a small thread pool so /upload returns as
+soon as the original is on disk; until the variants exist the serving route
+just falls back to the original.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import THUMBNAIL_WIDTHS, THUMBNAIL_FORMATS, THUMBNAIL_WORKERS, THUMBNAIL_LOOKUP_CACHE_ENTRIES
+from dao.d_uploads import UploadsDAO
+
+_executor = None
+_pillow = None
+
+# filename -> frozenset of (width, fmt) recorded in upload_variants, newest use last
+_known_variants = OrderedDict()
+_known_variants_lock = threading.Lock()
+
+# Pillow format name and save options per variant extension
+_SAVE_OPTIONS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnails")
+    return _executor
+
+
+def _load_pillow():
+    """
+    (Image, ImageOps), or None when Pillow is not installed. Imported on the
+    first upload instead of at app start-up.
+    """
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image, ImageOps
+            _pillow = (Image, ImageOps)
+        except ImportError:  # Pillow is optional; without it only originals are served
+            _pillow = ()
+    return _pillow or None
+
+
+def variant_name(filename: str, width: int, fmt: str) -> str:
+    """'ab/cd/abc.png', 480, 'webp' -> 'ab/cd/abc_w480.webp'"""
+    stem = filename.rsplit(".", 1)[0]
+    return f"{stem}_w{width}.{fmt}"
+
+
+def is_variant_name(filename: str) -> bool:
+    stem = os.path.basename(filename).rsplit(".", 1)[0]
+    head, sep, width = stem.rpartition("_w")
+    return bool(sep and head and width.isdigit())
+
+
+def generate_variants(storage, filename: str):
+    """
+    Create every configured width/format for an uploaded image.
+    Returns [(width, fmt, size_bytes)] for the variants written.
+    """
+    pillow = _load_pillow()
+    if pillow is None:
+        return []
+    Image, ImageOps = pillow
+
+    written = []
+    with storage.open(filename) as source, Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        for width in sorted(THUMBNAIL_WIDTHS):
+            if width >= img.width:
+                continue
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.LANCZOS)
+
+            for fmt in THUMBNAIL_FORMATS:
+                pil_format, options = _SAVE_OPTIONS[fmt]
+                buffer = io.BytesIO()
+                resized.save(buffer, pil_format, **options)
+                size = buffer.tell()
+                buffer.seek(0)
+                # backends write atomically, so the serving route never sees a half-written file
+                storage.save(variant_name(filename, width, fmt), buffer, content_type=f"image/{pil_format.lower()}")
+                written.append((width, fmt, size))
+
+    return written
+
+
+def _generate_and_record(storage, filename: str):
+    try:
+        variants = generate_variants(storage, filename)
+        if variants:
+            dao = UploadsDAO()
+            try:
+                dao.record_variants(filename, variants)
+            finally:
+                dao.close()
+        return variants
+    except Exception as e:
+        print(f"[thumbnails] ERROR generating variants for {filename}: {e}")
+        return []
+
+
+def schedule_thumbnails(storage, filename: str):
+    """Queue variant generation off the request thread. Returns the Future (or None)."""
+    if _load_pillow() is None:
+        return None
+    return _get_executor().submit(_generate_and_record, storage, filename)
+
+
+def known_variants(filename: str) -> frozenset:
+    """
+    (width, fmt) pairs generated for `filename`, from upload_variants. Uploads
+    are content-addressed, so a non-empty answer never changes and is cached;
+    an empty one is not, since the variants may still be generating.
+    """
+    with _known_variants_lock:
+        variants = _known_variants.get(filename)
+        if variants is not None:
+            _known_variants.move_to_end(filename)
+            return variants
+
+    try:
+        variants = frozenset((width, fmt) for width, fmt, _ in UploadsDAO().get_variants(filename))
+    except Exception as e:
+        print(f"[thumbnails] ERROR looking up variants for {filename}: {e}")
+        return frozenset()
+
+    if variants and THUMBNAIL_LOOKUP_CACHE_ENTRIES > 0:
+        with _known_variants_lock:
+            _known_variants[filename] = variants
+            while len(_known_variants) > THUMBNAIL_LOOKUP_CACHE_ENTRIES:
+                _known_variants.popitem(last=False)
+    return variants
+
+
+def pick_variant(filename: str, width: int | None, accept_webp: bool):
+    """
+    Return the name of the smallest generated variant at least `width` px wide.
+    Returns None when no such variant exists (not generated yet, or the request
+    is larger than every variant), meaning: serve the original. Checks
+    upload_variants rather than the storage backend, so an S3 bucket sees no
+    HEAD request per candidate.
+    """
+    if not width or width <= 0:
+        return None
+
+    formats = ("webp", "jpg") if accept_webp else ("jpg",)
+    variants = known_variants(filename)
+
+    for candidate in sorted(w for w in THUMBNAIL_WIDTHS if w >= width):
+        for fmt in formats:
+            if (candidate, fmt) in variants:
+                return variant_name(filename, candidate, fmt)
+    return None
@@ -0,0 +1,296 @@
+"""
+Prometheus request metrics.
+
+`init_metrics(app)` registers request hooks that record, per URL rule
+(`/reports/<int:report_id>`, not the concrete path, so label cardinality
+stays bounded):
+
+    http_request_duration_seconds   histogram, by route/method/status
+    http_requests_in_flight         gauge, by route
+    http_requests_total             counter, by route/method/status
+    http_response_size_bytes        histogram, by route (bytes on the wire,
+                                    i.e. after compression; streamed bodies
+                                    have no known size and are skipped)
+
+and, fed by query_stats.py, per DAO method / route:
+
+    db_query_duration_seconds       histogram, by DAO method
+    db_query_rows_total             counter, by DAO method
+    db_queries_per_request          histogram, by route
+    db_time_per_request_seconds     histogram, by route
+
+and, fed by load.py, for the connection pool and connections per DAO class:
+
+    db_pool_wait_seconds            histogram: time spent waiting for a
+                                    pooled connection (saturation shows up
+                                    here before it shows up as timeouts)
+    db_pool_timeouts_total          counter: checkouts that gave up
+    db_pool_connections_in_use      gauge, plus db_pool_connections_max
+    db_pool_waiting                 gauge: checkouts currently waiting
+    db_connections_opened_total     counter, by DAO class and kind
+                                    (pooled / overflow / dedicated)
+    db_connections_open             gauge, dedicated connections by DAO class
+    db_connection_leaks_total       counter, by DAO class
+
+The async routes of the ASGI mode (asgi_application.py) never reach Flask's
+hooks; they record the same http_* metrics through @observe_async(rule),
+under the Flask rule of the route they replace. There the response size is
+taken before Starlette's gzip middleware.
+
+They are served from /metrics (routes/metrics.py). Under gunicorn each
+worker is its own process, so prometheus_client runs in multiprocess mode:
+gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a shared directory
+before the app is imported, and /metrics aggregates every worker's files.
+Without prometheus_client installed nothing is recorded.
+"""
+import functools
+import os
+import time
+
+from flask import g, request
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, multiprocess
+except ImportError:  # prometheus_client is optional; without it /metrics is disabled
+    prometheus_client = None
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(9))  # 256 B .. 16 MB
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds",
+        "Time spent handling a request",
+        ["route", "method", "status"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS_TOTAL = Counter(
+        "http_requests",
+        "Requests handled",
+        ["route", "method", "status"],
+    )
+    IN_FLIGHT = Gauge(
+        "http_requests_in_flight",
+        "Requests currently being handled",
+        ["route"],
+        multiprocess_mode="livesum",
+    )
+    RESPONSE_SIZE = Histogram(
+        "http_response_size_bytes",
+        "Size of response bodies as sent",
+        ["route"],
+        buckets=SIZE_BUCKETS,
+    )
+    DB_QUERY_LATENCY = Histogram(
+        "db_query_duration_seconds",
+        "Time spent in cursor.execute",
+        ["caller"],
+        buckets=QUERY_BUCKETS,
+    )
+    DB_QUERY_ROWS = Counter(
+        "db_query_rows",
+        "Rows returned or affected",
+        ["caller"],
+    )
+    DB_QUERIES_PER_REQUEST = Histogram(
+        "db_queries_per_request",
+        "Statements executed while handling one request",
+        ["route"],
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+    DB_TIME_PER_REQUEST = Histogram(
+        "db_time_per_request_seconds",
+        "Total time spent in the database while handling one request",
+        ["route"],
+        buckets=LATENCY_BUCKETS,
+    )
+    DB_POOL_WAIT = Histogram(
+        "db_pool_wait_seconds",
+        "Time spent waiting for a pooled connection",
+        buckets=QUERY_BUCKETS,
+    )
+    DB_POOL_TIMEOUTS = Counter(
+        "db_pool_timeouts",
+        "Pool checkouts that gave up waiting",
+    )
+    DB_POOL_IN_USE = Gauge(
+        "db_pool_connections_in_use",
+        "Pooled connections checked out",
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_MAX = Gauge(
+        "db_pool_connections_max",
+        "Pool size limit, summed over workers",
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_WAITING = Gauge(
+        "db_pool_waiting",
+        "Checkouts currently waiting for a pooled connection",
+        multiprocess_mode="livesum",
+    )
+    DB_CONNECTIONS_OPENED = Counter(
+        "db_connections_opened",
+        "Connections handed to a DAO",
+        ["owner", "kind"],
+    )
+    DB_CONNECTIONS_OPEN = Gauge(
+        "db_connections_open",
+        "Dedicated (unpooled) connections currently open",
+        ["owner"],
+        multiprocess_mode="livesum",
+    )
+    DB_CONNECTION_LEAKS = Counter(
+        "db_connection_leaks",
+        "Connections never closed by their owner",
+        ["owner"],
+    )
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+
+
+def _start_timer():
+    g.metrics_route = _route()
+    g.metrics_started = time.perf_counter()
+    IN_FLIGHT.labels(g.metrics_route).inc()
+
+
+def _record_response(response):
+    started = g.get("metrics_started")
+    if started is None:
+        return response
+
+    route = g.metrics_route
+    status = str(response.status_code)
+    REQUEST_LATENCY.labels(route, request.method, status).observe(time.perf_counter() - started)
+    REQUESTS_TOTAL.labels(route, request.method, status).inc()
+    if not response.is_streamed and response.content_length is not None:
+        RESPONSE_SIZE.labels(route).observe(response.content_length)
+    return response
+
+
+def _end_request(exc=None):
+    route = g.pop("metrics_route", None)
+    if route is not None:
+        IN_FLIGHT.labels(route).dec()
+
+
+def observe_async(route):
+    """Decorator recording the http_* metrics for an async (Starlette) endpoint."""
+    def decorate(endpoint):
+        if prometheus_client is None:
+            return endpoint
+
+        @functools.wraps(endpoint)
+        async def wrapper(request):
+            IN_FLIGHT.labels(route).inc()
+            started = time.perf_counter()
+            status = "500"
+            try:
+                response = await endpoint(request)
+                status = str(response.status_code)
+                body = getattr(response, "body", None)  # StreamingResponse has none
+                if body is not None:
+                    RESPONSE_SIZE.labels(route).observe(len(body))
+                return response
+            finally:
+                REQUEST_LATENCY.labels(route, request.method, status).observe(time.perf_counter() - started)
+                REQUESTS_TOTAL.labels(route, request.method, status).inc()
+                IN_FLIGHT.labels(route).dec()
+
+        return wrapper
+
+    return decorate
+
+
+def observe_query(caller, seconds, rows):
+    if prometheus_client is None:
+        return
+    DB_QUERY_LATENCY.labels(caller).observe(seconds)
+    if rows > 0:
+        DB_QUERY_ROWS.labels(caller).inc(rows)
+
+
+def observe_request_queries(count, seconds):
+    if prometheus_client is None:
+        return
+    route = _route()
+    DB_QUERIES_PER_REQUEST.labels(route).observe(count)
+    DB_TIME_PER_REQUEST.labels(route).observe(seconds)
+
+
+def observe_pool_wait(seconds, acquired):
+    if prometheus_client is None:
+        return
+    DB_POOL_WAIT.observe(seconds)
+    if not acquired:
+        DB_POOL_TIMEOUTS.inc()
+
+
+def pool_waiting(delta):
+    if prometheus_client is not None:
+        DB_POOL_WAITING.inc(delta)
+
+
+def pool_in_use(delta):
+    if prometheus_client is not None:
+        DB_POOL_IN_USE.inc(delta)
+
+
+def pool_created(maxconn):
+    if prometheus_client is not None:
+        DB_POOL_MAX.set(maxconn)
+
+
+def connection_opened(owner, kind):
+    if prometheus_client is None:
+        return
+    DB_CONNECTIONS_OPENED.labels(owner, kind).inc()
+    if kind == "dedicated":
+        DB_CONNECTIONS_OPEN.labels(owner).inc()
+
+
+def connection_closed(owner, leaked=False):
+    if prometheus_client is None:
+        return
+    DB_CONNECTIONS_OPEN.labels(owner).dec()
+    if leaked:
+        DB_CONNECTION_LEAKS.labels(owner).inc()
+
+
+def render_latest():
+    """Returns (body, content type) for every process's metrics."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid):
+    """gunicorn child_exit hook: drop the live gauges of a dead worker."""
+    if prometheus_client is not None and multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app):
+    """
+    Register before compression so the size hook sees the compressed body
+    (after_request hooks run in reverse order of registration).
+    """
+    if prometheus_client is None:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_response)
+    app.teardown_request(_end_request)
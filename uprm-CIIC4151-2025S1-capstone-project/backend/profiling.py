@@ -0,0 +1,337 @@
+"""
+On-demand sampling profiler for individual requests.
+
+A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` (a header
+only, so the token stays out of access logs), or at random for
+PROFILE_SAMPLE_RATE of requests, optionally limited to the URL rules in
+PROFILE_ROUTES, e.g.
+
+    PROFILE_SAMPLE_RATE=0.05 PROFILE_ROUTES=/stats/avg-resolution-time-by-department
+
+While it runs, one sampler thread per worker reads the request thread's
+stack every PROFILE_INTERVAL_MS via sys._current_frames(), so the profiled
+code runs unmodified (no sys.setprofile hook). Each finished profile is
+written to PROFILE_DIR as collapsed stacks (`.folded`, for flamegraph.pl /
+speedscope) or speedscope JSON (PROFILE_FORMAT), named after the request and
+its trace id; the newest PROFILE_MAX_FILES are kept. Profiled responses
+carry the file name in X-Profile.
+
+GET /profiles (routes/profiles.py) aggregates the saved profiles of every
+worker into the hottest functions by self and total samples.
+
+Under gevent workers (threading monkey-patched) the sampler is itself a
+greenlet, so it reads the profiled request greenlet's suspended frame
+(gr_frame) instead. It only runs when the hub switches to it, so samples
+land where the request yields (database and network waits) and a CPU-bound
+stretch between yields shows up as the point it yielded at.
+"""
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import Flask, g, request
+
+import tracing
+from constants import (
+    PROFILE_TOKEN,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_ROUTES,
+    PROFILE_INTERVAL_MS,
+    PROFILE_FORMAT,
+    PROFILE_DIR,
+    PROFILE_MAX_FILES,
+)
+
+EXTENSIONS = {"collapsed": ".folded", "speedscope": ".speedscope.json"}
+
+# Frames above Flask.wsgi_app are the server's, and tracing's method wrapper
+# would appear once per traced call; neither says anything about the request.
+_ROOT_CODE = Flask.wsgi_app.__code__
+_SKIPPED_CODES = {tracing._traced(len, "").__code__}
+
+_labels = {}
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)
+        label = _labels[code] = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+
+def _stack(frame) -> tuple:
+    """Root-first labels for a thread's current frame."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        if code not in _SKIPPED_CODES:
+            stack.append(_label(code))
+        if code is _ROOT_CODE:
+            break
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _request_greenlet():
+    """The current greenlet when threading is gevent-patched, else None."""
+    if "gevent" not in sys.modules:
+        return None
+    from gevent import getcurrent, monkey
+
+    return getcurrent() if monkey.is_module_patched("threading") else None
+
+
+class Profile:
+    __slots__ = ("name", "thread_id", "greenlet", "samples", "started")
+
+    def __init__(self, name, thread_id, greenlet=None):
+        self.name = name
+        # under gevent thread_id is the greenlet's id, which sys._current_frames() doesn't know
+        self.thread_id = thread_id
+        self.greenlet = greenlet
+        self.samples = Counter()
+        self.started = time.perf_counter()
+
+
+class Sampler:
+    """Samples the stacks of every thread with an active profile."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.active = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self.thread.start()
+
+    def start(self, profile):
+        with self.lock:
+            self.active[profile.thread_id] = profile
+            self.wake.set()
+
+    def stop(self, profile):
+        with self.lock:
+            self.active.pop(profile.thread_id, None)
+
+    def _run(self):
+        while True:
+            self.wake.wait()
+            with self.lock:
+                if not self.active:
+                    self.wake.clear()
+                    continue
+                active = list(self.active.values())
+            frames = sys._current_frames()
+            for profile in active:
+                if profile.greenlet is not None:
+                    frame = profile.greenlet.gr_frame
+                else:
+                    frame = frames.get(profile.thread_id)
+                if frame is not None:
+                    profile.samples[_stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+_sampler = None
+_sampler_pid = None
+_sampler_lock = threading.Lock()
+
+
+def _get_sampler():
+    """One sampler per process; a preloaded master's thread does not survive fork."""
+    global _sampler, _sampler_pid
+    if _sampler_pid != os.getpid():
+        with _sampler_lock:
+            if _sampler_pid != os.getpid():
+                _sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+                _sampler_pid = os.getpid()
+    return _sampler
+
+
+# -------------------------------------------------------
+# Profile files
+# -------------------------------------------------------
+def to_collapsed(samples) -> str:
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in samples.items() if stack)
+
+
+def to_speedscope(samples, name) -> dict:
+    frames, index, stacks = [], {}, []
+    for stack, count in samples.items():
+        ids = []
+        for label in stack:
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            ids.append(index[label])
+        stacks.extend([ids] * count)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": len(stacks) * PROFILE_INTERVAL_MS,
+            "samples": stacks,
+            "weights": [PROFILE_INTERVAL_MS] * len(stacks),
+        }],
+        "name": name,
+        "exporter": "reports-api",
+    }
+
+
+def read_profile(path) -> Counter:
+    """Stack -> sample count for a .folded or .speedscope.json file."""
+    samples = Counter()
+    if path.endswith(EXTENSIONS["speedscope"]):
+        with open(path) as f:
+            data = json.load(f)
+        frames = [frame["name"] for frame in data["shared"]["frames"]]
+        for profile in data["profiles"]:
+            for ids in profile["samples"]:
+                samples[tuple(frames[i] for i in ids)] += 1
+    else:
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack:
+                    samples[tuple(stack.split(";"))] += int(count)
+    return samples
+
+
+def list_profiles(route=None):
+    """Saved profile file names, newest first, optionally for one URL rule."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    suffixes = tuple(EXTENSIONS.values())
+    names = [name for name in os.listdir(PROFILE_DIR) if name.endswith(suffixes)]
+    if route:
+        slug = f"-{_slug(route)}-"
+        names = [name for name in names if slug in name]
+    return sorted(names, reverse=True)
+
+
+def hot_functions(names, limit=30):
+    """
+    Aggregate profiles into the functions with the most samples. `self` counts
+    samples where the function was running, `total` samples where it was
+    anywhere on the stack.
+    """
+    self_samples, total_samples, samples = Counter(), Counter(), 0
+    for name in names:
+        try:
+            profile = read_profile(os.path.join(PROFILE_DIR, name))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[profiling] skipping unreadable profile {name}: {e}")
+            continue
+        for stack, count in profile.items():
+            samples += count
+            self_samples[stack[-1]] += count
+            for label in set(stack):
+                total_samples[label] += count
+
+    def pct(count):
+        return round(count * 100 / samples, 1) if samples else 0.0
+
+    return {
+        "profiles": len(names),
+        "samples": samples,
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "by_self": [
+            {"function": label, "samples": count, "percent": pct(count)}
+            for label, count in self_samples.most_common(limit)
+        ],
+        "by_total": [
+            {"function": label, "samples": count, "percent": pct(count)}
+            for label, count in total_samples.most_common(limit)
+        ],
+    }
+
+
+def _slug(route) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+def _write(profile):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, profile.name)
+    if PROFILE_FORMAT == "speedscope":
+        body = json.dumps(to_speedscope(profile.samples, profile.name))
+    else:
+        body = to_collapsed(profile.samples)
+    with open(path, "w") as f:
+        f.write(body)
+
+    for stale in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, stale))
+        except OSError:
+            pass  # another worker got there first
+
+
+# -------------------------------------------------------
+# Request hooks
+# -------------------------------------------------------
+def _requested() -> bool:
+    supplied = request.headers.get("X-Profile")
+    # compared as bytes: compare_digest rejects non-ASCII str
+    return bool(PROFILE_TOKEN and supplied) and hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+
+def _sampled(route) -> bool:
+    if PROFILE_SAMPLE_RATE <= 0 or (PROFILE_ROUTES and route not in PROFILE_ROUTES):
+        return False
+    return random.random() < PROFILE_SAMPLE_RATE
+
+
+def _start_profile():
+    route = request.url_rule.rule if request.url_rule is not None else request.path
+    if not (_requested() or _sampled(route)):
+        return
+
+    trace_id = g.get("trace_id") or os.urandom(16).hex()
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{_slug(route)}-{trace_id[:16]}{EXTENSIONS[PROFILE_FORMAT]}"
+    profile = Profile(name, threading.get_ident(), _request_greenlet())
+    _get_sampler().start(profile)
+    g.profile = profile
+
+
+def _add_profile_header(response):
+    profile = g.get("profile")
+    if profile is not None:
+        response.headers["X-Profile"] = profile.name
+    return response
+
+
+def _finish_profile(exc=None):
+    profile = g.pop("profile", None)
+    if profile is None:
+        return
+    _get_sampler().stop(profile)
+    try:
+        _write(profile)
+    except OSError as e:
+        print(f"[profiling] ERROR writing {profile.name}: {e}")
+        return
+    elapsed = (time.perf_counter() - profile.started) * 1000
+    print(f"[profiling] {profile.name}: {sum(profile.samples.values())} samples over {elapsed:.0f} ms")
+
+
+def init_profiling(app):
+    """Register after init_tracing so profile names can carry the trace id."""
+    if PROFILE_FORMAT not in EXTENSIONS:
+        raise ValueError(f"PROFILE_FORMAT must be one of {', '.join(EXTENSIONS)}, not {PROFILE_FORMAT!r}")
+    app.before_request(_start_profile)
+    app.after_request(_add_profile_header)
+    app.teardown_request(_finish_profile)
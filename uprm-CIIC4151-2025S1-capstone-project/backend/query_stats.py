@@ -0,0 +1,130 @@
+"""
+Query instrumentation for every DAO.
+
+Connections from load.py are opened with `cursor_factory=InstrumentedCursor`,
+so each `cur.execute(...)` in any DAO (and psycopg2.extras helpers built on
+it, like execute_values) is timed and attributed to the DAO method that
+issued it (`ReportsDAO.search_reports`). For each statement we keep:
+
+  - a fingerprint: the SQL with literals and placeholders replaced by `?`
+    and whitespace collapsed, so the same query always groups together
+  - duration, row count and calling DAO method
+
+Statements slower than SLOW_QUERY_MS are printed as `[slow-query] ...`.
+Within a request the count and total DB time are accumulated; in debug mode
+(or with QUERY_STATS_HEADERS=true) they are sent back as X-DB-Query-Count,
+X-DB-Time-Ms and a Server-Timing entry. Per-method aggregates go to
+/metrics (see metrics.py).
+"""
+import re
+import sys
+import time
+from functools import lru_cache
+
+from flask import current_app, g, has_app_context
+from psycopg2.extensions import cursor as _cursor
+
+from constants import SLOW_QUERY_MS, QUERY_STATS_HEADERS
+import metrics
+import tracing
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s|\$\d+")
+# execute_values' (?, ?), (?, ?), ... -> one group; IN (?, ?, ?) -> IN (...)
+_REPEATED_GROUPS = re.compile(r"(\([?, ]*\))(?:, \1)+")
+_IN_LISTS = re.compile(r"\bIN \(\?(?:, \?)+\)", re.I)
+_WHITESPACE = re.compile(r"\s+")
+_COMMAS = re.compile(r"\s*,\s*")
+
+UNKNOWN_CALLER = "<unknown>"
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """'SELECT * FROM r WHERE id = 5 AND t = %s' -> 'SELECT * FROM r WHERE id = ? AND t = ?'"""
+    sql = _COMMENTS.sub(" ", sql)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _COMMAS.sub(", ", sql)
+    sql = _REPEATED_GROUPS.sub(r"\1, ...", sql)
+    return _IN_LISTS.sub("IN (...)", sql)
+
+
+def calling_method(depth: int = 2, max_frames: int = 6) -> str:
+    """Qualified name of the nearest DAO method on the stack, e.g. 'UsersDAO.get_user_by_id'."""
+    frame = sys._getframe(depth)
+    for _ in range(max_frames):
+        if frame is None:
+            break
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        if "DAO." in name:
+            return name
+        frame = frame.f_back
+    return UNKNOWN_CALLER
+
+
+def _sql_text(query, cur) -> str:
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    if isinstance(query, str):
+        return query
+    return query.as_string(cur)  # psycopg2.sql.Composed
+
+
+def record(sql: str, caller: str, seconds: float, rows: int):
+    if SLOW_QUERY_MS >= 0 and seconds * 1000 >= SLOW_QUERY_MS:
+        trace_id = tracing.current_trace_id()
+        trace = f" trace={trace_id}" if trace_id else ""
+        print(f"[slow-query] {seconds * 1000:.1f} ms rows={rows} {caller}{trace}: {fingerprint(sql)}")
+
+    metrics.observe_query(caller, seconds, rows)
+
+    if has_app_context():
+        g.db_query_count = g.get("db_query_count", 0) + 1
+        g.db_time = g.get("db_time", 0.0) + seconds
+
+
+class InstrumentedCursor(_cursor):
+    def _record(self, query, span, started):
+        sql = _sql_text(query, self)
+        if span is not tracing.NOOP_SPAN:
+            span.set(**{"db.statement": fingerprint(sql), "db.rows": self.rowcount})
+        # depth 3: calling_method <- _record <- execute <- the DAO method
+        record(sql, calling_method(depth=3), time.perf_counter() - started, self.rowcount)
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        with tracing.span("sql") as span:
+            try:
+                return super().execute(query, vars)
+            finally:
+                self._record(query, span, started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        with tracing.span("sql") as span:
+            try:
+                return super().executemany(query, vars_list)
+            finally:
+                self._record(query, span, started)
+
+
+def _attach_summary(response):
+    count = g.get("db_query_count", 0)
+    seconds = g.get("db_time", 0.0)
+    metrics.observe_request_queries(count, seconds)
+
+    if QUERY_STATS_HEADERS or current_app.debug:
+        response.headers["X-DB-Query-Count"] = str(count)
+        response.headers["X-DB-Time-Ms"] = f"{seconds * 1000:.1f}"
+        response.headers.add("Server-Timing", f'db;desc="{count} queries";dur={seconds * 1000:.1f}')
+    return response
+
+
+def init_query_stats(app):
+    app.after_request(_attach_summary)
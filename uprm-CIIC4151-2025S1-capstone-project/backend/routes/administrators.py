@@ -0,0 +1,100 @@
+from flask import Blueprint, request
+
+from handler.h_administrators import AdministratorsHandler
+from constants import HTTP_STATUS
+from dao.d_administrators import AdministratorsDAO
+
+bp = Blueprint("administrators", __name__)
+
+administrators_handler = AdministratorsHandler()
+
+
+# -------------------------------------------------------
+# ADMINISTRATORS
+# -------------------------------------------------------
+@bp.route("/administrators", methods=["GET", "POST"]) # Done (Ignore POST since admins are created when upgrading users)
+def handle_administrators():
+    handler = administrators_handler
+    if request.method == "POST":
+        return handler.create_administrator(request.json)
+    elif request.method == "GET":
+        page = request.args.get("page", default=1, type=int)
+        limit = request.args.get("limit", default=10, type=int)
+        return handler.get_all_administrators(page, limit)
+
+
+@bp.route("/administrators/<int:admin_id>", methods=["GET", "PUT", "DELETE"]) # Done (Ignore PUT and DELETE)
+def handle_administrator(admin_id):
+    handler = administrators_handler
+    if request.method == "GET":
+        return handler.get_administrator_by_id(admin_id)
+    elif request.method == "PUT":
+        return handler.update_administrator(admin_id, request.json)
+    elif request.method == "DELETE":
+        return handler.delete_administrator(admin_id)
+
+
+@bp.route("/administrators/department/<string:department>", methods=["GET"]) # Done
+def get_administrators_by_department(department):
+    handler = administrators_handler
+    return handler.get_administrators_by_department(department)
+
+
+@bp.route("/administrators/<int:admin_id>/details", methods=["GET"]) # Ignore
+def get_administrator_with_details(admin_id):
+    handler = administrators_handler
+    return handler.get_administrator_with_details(admin_id)
+
+
+@bp.route("/administrators/available", methods=["GET"]) # Ignore
+def get_available_administrators():
+    handler = administrators_handler
+    return handler.get_available_administrators()
+
+
+@bp.route("/administrators/stats/all", methods=["GET"]) # Ignore
+def get_all_admin_stats():
+    handler = administrators_handler
+    return handler.get_all_admin_stats()
+
+
+@bp.route("/administrators/check/<int:user_id>", methods=["GET"]) # Ignore
+def check_user_is_administrator(user_id):
+    handler = administrators_handler
+    return handler.check_user_is_administrator(user_id)
+
+
+@bp.route("/administrators/performance", methods=["GET"]) # Ignore
+def get_administrator_performance_report():
+    handler = administrators_handler
+    return handler.get_administrator_performance_report()
+
+
+# NEW: /me/admin
+@bp.route("/me/admin", methods=["GET"]) # Ignore
+def get_current_user_admin_info():
+    user_id = request.args.get("user_id", type=int)
+
+    if user_id is None:
+        return {
+            "error_msg": "user_id query parameter is required",
+            "admin": False,
+            "department": None,
+        }, HTTP_STATUS.BAD_REQUEST
+
+    dao = AdministratorsDAO()
+    admin_row = dao.get_administrator_by_id(user_id)
+
+    if not admin_row:
+        return {
+            "user_id": user_id,
+            "admin": False,
+            "department": None,
+        }, HTTP_STATUS.OK
+
+    department = admin_row[1]
+    return {
+        "user_id": user_id,
+        "admin": True,
+        "department": department,
+    }, HTTP_STATUS.OK
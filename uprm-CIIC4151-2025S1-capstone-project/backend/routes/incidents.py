@@ -0,0 +1,32 @@
+from flask import Blueprint, request
+
+from handler.h_incidents import IncidentsHandler
+
+bp = Blueprint("incidents", __name__)
+
+incidents_handler = IncidentsHandler()
+
+
+# -------------------------------------------------------
+# INCIDENTS (clusters of related reports)
+# -------------------------------------------------------
+@bp.route("/incidents", methods=["GET"])
+def get_incidents():
+    handler = incidents_handler
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    status = request.args.get("status", default="open")
+    admin_id = request.args.get("admin_id", type=int)
+    return handler.get_all_incidents(page, limit, status, admin_id)
+
+
+@bp.route("/incidents/<int:incident_id>", methods=["GET"])
+def get_incident(incident_id):
+    handler = incidents_handler
+    return handler.get_incident_by_id(incident_id)
+
+
+@bp.route("/incidents/<int:incident_id>/resolve", methods=["POST"])
+def resolve_incident(incident_id):
+    handler = incidents_handler
+    return handler.resolve_incident(incident_id, request.json)
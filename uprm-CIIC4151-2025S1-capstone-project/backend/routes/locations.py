@@ -0,0 +1,64 @@
+from flask import Blueprint, request
+
+from handler.h_locations import LocationsHandler
+
+bp = Blueprint("locations", __name__)
+
+locations_handler = LocationsHandler()
+
+
+# -------------------------------------------------------
+# LOCATIONS
+# -------------------------------------------------------
+@bp.route("/locations", methods=["GET", "POST"]) # Ignore
+def handle_locations():
+    handler = locations_handler
+    if request.method == "POST":
+        return handler.create_location(request.json)
+    elif request.method == "GET":
+        page = request.args.get("page", default=1, type=int)
+        limit = request.args.get("limit", default=10, type=int)
+        return handler.get_all_locations(page, limit)
+
+
+@bp.route("/locations/<int:location_id>", methods=["GET", "PUT", "DELETE"]) # Ignore
+def handle_location(location_id):
+    handler = locations_handler
+    if request.method == "GET":
+        return handler.get_location_by_id(location_id)
+    elif request.method == "PUT":
+        return handler.update_location(location_id, request.json)
+    elif request.method == "DELETE":
+        return handler.delete_location(location_id)
+
+
+@bp.route("/locations/<int:location_id>/details", methods=["GET"]) # Ignore
+def get_location_details(location_id):
+    handler = locations_handler
+    return handler.get_location_details(location_id)
+
+
+@bp.route("/locations/nearby", methods=["GET"]) # Ignore
+def get_locations_nearby():
+    handler = locations_handler
+    return handler.get_locations_nearby()
+
+
+@bp.route("/locations/with-reports", methods=["GET"]) # Done
+def get_locations_with_reports():
+    handler = locations_handler
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    return handler.get_locations_with_reports(page, limit)
+
+
+@bp.route("/locations/stats", methods=["GET"]) # Ignore
+def get_location_stats():
+    handler = locations_handler
+    return handler.get_location_stats()
+
+
+@bp.route("/locations/search", methods=["GET"]) # Ignore
+def search_locations():
+    handler = locations_handler
+    return handler.search_locations()
@@ -0,0 +1,26 @@
+import hmac
+
+from flask import Blueprint, request
+
+from constants import HTTP_STATUS, METRICS_TOKEN
+from metrics import prometheus_client, render_latest
+
+bp = Blueprint("metrics", __name__)
+
+
+# -------------------------------------------------------
+# METRICS
+# -------------------------------------------------------
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    if prometheus_client is None:
+        return {"error_msg": "metrics are disabled (prometheus_client is not installed)"}, HTTP_STATUS.NOT_FOUND
+
+    if METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        # compared as bytes: compare_digest rejects non-ASCII str
+        if not hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+            return {"error_msg": "Unauthorized"}, HTTP_STATUS.UNAUTHORIZED
+
+    body, content_type = render_latest()
+    return body, HTTP_STATUS.OK, {"Content-Type": content_type}
@@ -0,0 +1,59 @@
+from flask import Blueprint, request
+
+from handler.h_pinned_reports import PinnedReportsHandler
+
+bp = Blueprint("pinned_reports", __name__)
+
+pinned_reports_handler = PinnedReportsHandler()
+
+
+# -------------------------------------------------------
+# PINNED REPORTS
+# -------------------------------------------------------
+@bp.route("/pinned-reports", methods=["GET", "POST"]) # Ignore
+def handle_pinned_reports():
+    handler = pinned_reports_handler
+    if request.method == "POST":
+        return handler.pin_report(request.json)
+    elif request.method == "GET":
+        user_id = request.args.get("user_id", type=int)
+        page = request.args.get("page", default=1, type=int)
+        limit = request.args.get("limit", default=10, type=int)
+        fields = request.args.get("fields")
+        return handler.get_pinned_reports(user_id, page, limit, fields)
+
+
+@bp.route("/pinned-reports/<int:report_id>", methods=["DELETE"]) # Ignore
+def handle_pinned_report(report_id):
+    handler = pinned_reports_handler
+    user_id = request.args.get("user_id", type=int)
+    if request.method == "DELETE":
+        return handler.unpin_report(user_id, report_id)
+
+
+@bp.route("/users/<int:user_id>/pinned-reports", methods=["GET"]) # Done
+def handle_user_pinned_reports(user_id):
+    handler = pinned_reports_handler
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    fields = request.args.get("fields")
+    return handler.get_user_pinned_reports(user_id, page, limit, fields)
+
+
+@bp.route("/pinned-reports/check/<int:user_id>/<int:report_id>", methods=["GET"]) # Ignore
+def check_pinned_status(user_id, report_id):
+    handler = pinned_reports_handler
+    return handler.check_pinned_status(user_id, report_id)
+
+
+@bp.route("/reports/<int:report_id>/pinned-status", methods=["GET"]) # Ignore
+def get_report_pinned_status(report_id):
+    handler = pinned_reports_handler
+    user_id = request.args.get("user_id", type=int)
+    return handler.check_pinned_status(user_id, report_id)
+
+
+@bp.route("/pinned-reports/<int:user_id>/<int:report_id>/details", methods=["GET"]) # Ignore
+def get_pinned_report_detail(user_id, report_id):
+    handler = pinned_reports_handler
+    return handler.get_pinned_report_detail(user_id, report_id)
@@ -0,0 +1,47 @@
+import hmac
+
+from flask import Blueprint, request, send_from_directory
+
+from constants import HTTP_STATUS, PROFILE_TOKEN, PROFILE_DIR
+from profiling import hot_functions, list_profiles
+
+bp = Blueprint("profiles", __name__)
+
+
+def _unauthorized():
+    if not PROFILE_TOKEN:
+        return {"error_msg": "profiling is disabled (PROFILE_TOKEN is not set)"}, HTTP_STATUS.NOT_FOUND
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    # compared as bytes: compare_digest rejects non-ASCII str
+    if not hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode()):
+        return {"error_msg": "Unauthorized"}, HTTP_STATUS.UNAUTHORIZED
+    return None
+
+
+# -------------------------------------------------------
+# PROFILES
+# -------------------------------------------------------
+@bp.route("/profiles", methods=["GET"])
+def get_hot_functions():
+    denied = _unauthorized()
+    if denied:
+        return denied
+
+    try:
+        count = int(request.args.get("profiles", 50))
+        limit = int(request.args.get("limit", 30))
+    except ValueError:
+        return {"error_msg": "profiles and limit must be integers"}, HTTP_STATUS.BAD_REQUEST
+
+    names = list_profiles(request.args.get("route"))[:count]
+    return {**hot_functions(names, limit), "files": names}, HTTP_STATUS.OK
+
+
+@bp.route("/profiles/<path:name>", methods=["GET"])
+def get_profile(name):
+    denied = _unauthorized()
+    if denied:
+        return denied
+    if name not in list_profiles():
+        return {"error_msg": "Profile not found"}, HTTP_STATUS.NOT_FOUND
+    return send_from_directory(PROFILE_DIR, name)
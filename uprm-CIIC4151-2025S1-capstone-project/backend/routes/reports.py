@@ -0,0 +1,162 @@
+from flask import Blueprint, request, jsonify
+
+from handler.h_reports import ReportsHandler
+
+bp = Blueprint("reports", __name__)
+
+reports_handler = ReportsHandler()
+
+
+# -------------------------------------------------------
+# REPORTS
+# -------------------------------------------------------
+@bp.route("/reports", methods=["GET", "POST"]) # Done (create report not working)
+def handle_reports():
+    handler = reports_handler
+    if request.method == "POST":
+        return handler.create_report(request.json)
+    elif request.method == "GET":
+        page = request.args.get("page", default=1, type=int)
+        limit = request.args.get("limit", default=10, type=int)
+        sort = request.args.get("sort")
+        admin_id = request.args.get("admin_id", type=int)
+        location_id = request.args.get("location_id", type=int)
+        city = request.args.get("city")  # e.g. "Carolina"
+        fields = request.args.get("fields")  # e.g. "title,status,city,image_url"
+        return handler.get_all_reports(page, limit, sort, admin_id, location_id, city, fields)
+
+
+@bp.route("/reports/<int:report_id>", methods=["GET", "PUT", "DELETE"]) # Done (for PUT refer to 'change_report_status')
+def handle_report(report_id):
+    handler = reports_handler
+    if request.method == "GET":
+        return handler.get_report_by_id(report_id)
+    elif request.method == "PUT":
+        return handler.update_report(report_id, request.json)
+    elif request.method == "DELETE":
+        return handler.delete_report(report_id)
+
+
+@bp.route("/reports/<int:report_id>/validate", methods=["POST"]) # Ignored
+def validate_report(report_id):
+    handler = reports_handler
+    return handler.validate_report(report_id, request.json)
+
+
+@bp.route("/reports/<int:report_id>/resolve", methods=["POST"]) # Ignored?
+def resolve_report(report_id):
+    handler = reports_handler
+    return handler.resolve_report(report_id, request.json)
+
+
+@bp.route("/reports/<int:report_id>/rate", methods=["POST"]) # Ignored (refer to 'toggle_rate_report')
+def rate_report(report_id):
+    handler = reports_handler
+    return handler.rate_report(report_id, request.json)
+
+
+# -------------------------------------------------------
+# REPORTS - RATING & STATUS ENHANCEMENTS
+# -------------------------------------------------------
+@bp.route("/reports/<int:report_id>/rating-status", methods=["GET"]) # Ignored
+def get_report_rating_status(report_id):
+    handler = reports_handler
+    user_id = request.args.get("user_id", type=int)
+    return handler.get_report_rating_status(report_id, user_id)
+
+
+@bp.route("/reports/<int:report_id>/rating", methods=["GET"]) # Done
+def get_report_rating(report_id):
+    handler = reports_handler
+    return handler.get_report_rating(report_id)
+
+
+@bp.route("/reports/<int:report_id>/status", methods=["PUT"]) # Done
+def change_report_status(report_id):
+    handler = reports_handler
+    return handler.change_report_status(report_id, request.json)
+
+
+@bp.route("/reports/status-options", methods=["GET"]) # Ignored
+def get_status_options():
+    handler = reports_handler
+    return handler.get_status_options()
+
+
+# -------------------------------------------------------
+# SEARCH & FILTER
+# -------------------------------------------------------
+@bp.route("/reports/search", methods=["GET"]) # Ignore
+def search_reports():
+    handler = reports_handler
+    query = request.args.get("q", "")
+    status = request.args.get("status")
+    category = request.args.get("category")
+    sort = request.args.get("sort")
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    admin_id = request.args.get("admin_id", type=int)
+    location_id = request.args.get("location_id", type=int)
+    city = request.args.get("city")
+    fields = request.args.get("fields")
+    return handler.search_reports(query, page, limit, status, category, sort, admin_id, location_id, city, fields)
+
+
+@bp.route("/reports/duplicates", methods=["GET"])
+def find_duplicate_reports():
+    handler = reports_handler
+    return handler.find_duplicate_reports(
+        category=request.args.get("category"),
+        title=request.args.get("title"),
+        description=request.args.get("description"),
+        location_id=request.args.get("location_id", type=int),
+        latitude=request.args.get("latitude", type=float),
+        longitude=request.args.get("longitude", type=float),
+    )
+
+
+@bp.route("/reports/filter", methods=["GET"]) # Ignore
+def filter_reports():
+    handler = reports_handler
+    status = request.args.get("status")
+    category = request.args.get("category")
+    sort = request.args.get("sort")
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    admin_id = request.args.get("admin_id", type=int)
+    location_id = request.args.get("location_id", type=int)
+    city = request.args.get("city")
+    return handler.filter_reports(status, category, page, limit, sort, admin_id, location_id, city)
+
+
+@bp.route("/reports/user/<int:user_id>", methods=["GET"]) # Ignore
+def get_user_reports(user_id):
+    handler = reports_handler
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    return handler.get_reports_by_user(user_id, page, limit)
+
+
+# -------------------------------------------------------
+# REPORTS - TOGGLE / UNRATE
+# -------------------------------------------------------
+@bp.route("/reports/<int:report_id>/toggle-rate", methods=["POST"])
+def toggle_rate_report(report_id):
+    data = request.json
+    user_id = data.get("user_id")
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    handler = reports_handler
+    return handler.toggle_rate_report(report_id, {"user_id": user_id})
+
+
+@bp.route("/reports/<int:report_id>/unrate", methods=["POST"])
+def unrate_report(report_id):
+    data = request.json
+    user_id = data.get("user_id")
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    handler = reports_handler
+    return handler.unrate_report(report_id, {"user_id": user_id})
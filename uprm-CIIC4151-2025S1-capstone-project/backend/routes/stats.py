@@ -0,0 +1,97 @@
+from flask import Blueprint, request
+
+from handler.h_reports import ReportsHandler
+from handler.h_users import UsersHandler
+from handler.h_administrators import AdministratorsHandler
+from handler.h_global_stats import GlobalStatsHandler
+
+bp = Blueprint("stats", __name__)
+
+reports_handler = ReportsHandler()
+users_handler = UsersHandler()
+administrators_handler = AdministratorsHandler()
+global_stats_handler = GlobalStatsHandler()
+
+
+# -------------------------------------------------------
+# STATS & ADMIN
+# -------------------------------------------------------
+@bp.route("/stats/overview", methods=["GET"]) # Ignore
+def get_overview_stats():
+    handler = reports_handler
+    return handler.get_overview_stats()
+
+
+@bp.route("/stats/department/<string:department>", methods=["GET"]) # Ignore
+def get_department_overview_stats(department):
+    handler = reports_handler
+    return handler.get_department_stats(department)
+
+
+@bp.route("/stats/user/<int:user_id>", methods=["GET"]) # Done
+def get_user_stats(user_id):
+    handler = users_handler
+    return handler.get_user_stats(user_id)
+
+
+@bp.route("/stats/admin/<int:admin_id>", methods=["GET"]) # Ignore
+def get_admin_stats(admin_id):
+    handler = administrators_handler
+    return handler.get_admin_stats(admin_id)
+
+
+@bp.route("/admin/dashboard", methods=["GET"]) # Ignore
+def get_admin_dashboard():
+    handler = reports_handler
+    return handler.get_admin_dashboard()
+
+
+@bp.route("/admin/reports/pending", methods=["GET"]) # Ignore
+def get_pending_reports():
+    handler = reports_handler
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    return handler.get_pending_reports(page, limit)
+
+
+@bp.route("/admin/reports/assigned", methods=["GET"]) # Ignore
+def get_assigned_reports():
+    handler = reports_handler
+    admin_id = request.args.get("admin_id", type=int)
+    page = request.args.get("page", default=1, type=int)
+    limit = request.args.get("limit", default=10, type=int)
+    return handler.get_assigned_reports(admin_id, page, limit)
+
+@bp.route("/stats/resolution-rate-by-department", methods=["GET"])
+def get_resolution_rate_by_department():
+    handler = global_stats_handler
+    return handler.get_resolution_rate_by_department()
+
+@bp.route("/stats/top-categories-percentage", methods=["GET"])
+def get_top_categories_percentage():
+    handler = global_stats_handler
+    # default: top 3 categories
+    n = request.args.get("n", default=3, type=int)
+    if n <= 0:
+        n = 1
+    return handler.get_top_categories_percentage(n)
+
+@bp.route("/stats/avg-resolution-time-by-department", methods=["GET"])
+def get_avg_resolution_time_by_department():
+    handler = global_stats_handler
+    return handler.get_avg_resolution_time_by_department()
+
+@bp.route("/stats/monthly-report-volume", methods=["GET"])
+def get_monthly_report_volume():
+    handler = global_stats_handler
+    # default to last 12 months if not provided
+    months = request.args.get("months", default=12, type=int)
+    if months <= 0:
+        months = 1
+    return handler.get_monthly_report_volume(months)
+
+
+@bp.route("/api/admin/<int:admin_id>/reports", methods=["GET"]) # Ignore
+def get_reports_for_admin(admin_id):
+    handler = administrators_handler
+    return handler.get_reports_for_admin(admin_id)
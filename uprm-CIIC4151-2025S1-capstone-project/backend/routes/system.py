@@ -0,0 +1,27 @@
+from flask import Blueprint
+
+
+bp = Blueprint("system", __name__)
+
+
+# -------------------------------------------------------
+# HEALTH
+# -------------------------------------------------------
+@bp.route("/", methods=["GET"]) # Ignored
+def health_check():
+    return {"status": "OK", "message": "Report System API is running"}
+
+
+# -------------------------------------------------------
+# SYSTEM HEALTH
+# -------------------------------------------------------
+@bp.route("/system/health", methods=["GET"]) # Ignore
+def system_health():
+    from datetime import datetime
+
+    return {
+        "status": "OK",
+        "message": "System is running normally",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "version": "1.0.0",
+    }
@@ -0,0 +1,57 @@
+from flask import Blueprint, request
+
+from handler.h_uploads import UploadsHandler
+
+bp = Blueprint("uploads", __name__)
+
+uploads_handler = UploadsHandler()
+
+
+# -------------------------------------------------------
+# IMAGE UPLOAD (NEW)
+# -------------------------------------------------------
+@bp.route("/upload", methods=["POST"]) # Ignored
+def upload_image():
+    handler = uploads_handler
+    return handler.upload_image()
+
+
+# Direct-to-storage uploads (S3 backend)
+@bp.route("/upload/presign", methods=["POST"]) # Ignored
+def presign_upload():
+    handler = uploads_handler
+    return handler.presign_upload(request.get_json(silent=True))
+
+
+@bp.route("/upload/presign/complete", methods=["POST"]) # Ignored
+def complete_presigned_upload():
+    handler = uploads_handler
+    return handler.complete_presigned_upload(request.get_json(silent=True))
+
+
+# Resumable uploads for unreliable connections
+@bp.route("/upload/sessions", methods=["POST"]) # Ignored
+def create_upload_session():
+    handler = uploads_handler
+    return handler.create_upload_session(request.get_json(silent=True))
+
+
+@bp.route("/upload/sessions/<session_id>", methods=["GET", "PUT"]) # Ignored
+def upload_session(session_id):
+    handler = uploads_handler
+    if request.method == "PUT":
+        return handler.put_upload_chunk(session_id)
+    return handler.get_upload_session(session_id)
+
+
+@bp.route("/upload/sessions/<session_id>/finalize", methods=["POST"]) # Ignored
+def finalize_upload_session(session_id):
+    handler = uploads_handler
+    return handler.finalize_upload_session(session_id)
+
+
+# Serve uploaded files
+@bp.route("/uploads/<path:filename>") # Ignored
+def uploaded_file(filename):
+    handler = uploads_handler
+    return handler.serve_upload(filename)
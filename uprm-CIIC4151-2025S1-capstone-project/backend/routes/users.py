@@ -0,0 +1,80 @@
+from flask import Blueprint, request
+
+from handler.h_users import UsersHandler
+
+bp = Blueprint("users", __name__)
+
+users_handler = UsersHandler()
+
+
+# -------------------------------------------------------
+# USERS
+# -------------------------------------------------------
+@bp.route("/users", methods=["GET", "POST"]) # Done
+def handle_users():
+    handler = users_handler
+    if request.method == "POST":
+        return handler.create_user(request.json)
+    elif request.method == "GET":
+        page = request.args.get("page", default=1, type=int)
+        limit = request.args.get("limit", default=10, type=int)
+        return handler.get_all_users(page, limit)
+
+
+@bp.route("/users/<int:user_id>", methods=["GET", "PUT", "DELETE"]) # Done (for PUT refer to upgrade_admin)
+def handle_user(user_id):
+    handler = users_handler
+    if request.method == "GET":
+        return handler.get_user_by_id(user_id)
+    elif request.method == "PUT":
+        return handler.update_user(user_id, request.json)
+    elif request.method == "DELETE":
+        return handler.delete_user(user_id)
+
+
+# -------------------------------------------------------
+# USERS - MANAGEMENT ACTIONS
+# -------------------------------------------------------
+@bp.route("/users/<int:user_id>/suspend", methods=["POST"]) # Ignore
+def suspend_user(user_id):
+    handler = users_handler
+    return handler.suspend_user(user_id)
+
+
+@bp.route("/users/<int:user_id>/unsuspend", methods=["POST"]) # Ignore
+def unsuspend_user(user_id):
+    handler = users_handler
+    return handler.unsuspend_user(user_id)
+
+
+@bp.route("/users/<int:user_id>/pin", methods=["POST"]) # Ignore
+def pin_user(user_id):
+    handler = users_handler
+    return handler.pin_user(user_id)
+
+
+@bp.route("/users/<int:user_id>/unpin", methods=["POST"]) # Ignore
+def unpin_user(user_id):
+    handler = users_handler
+    return handler.unpin_user(user_id)
+
+
+@bp.route("/users/<int:user_id>/upgrade-admin", methods=["POST"]) # Done
+def upgrade_admin(user_id):
+    handler = users_handler
+    return handler.upgrade_to_admin(user_id, request.json)
+
+
+# -------------------------------------------------------
+# AUTH
+# -------------------------------------------------------
+@bp.route("/login", methods=["POST"]) # Done
+def login():
+    handler = users_handler
+    return handler.login(request.json)
+
+
+@bp.route("/logout", methods=["POST"]) # Done
+def logout():
+    handler = users_handler
+    return handler.logout()
@@ -0,0 +1,89 @@
+import math
+
+EARTH_RADIUS_M = 6371000.0
+
+# Length of one degree of latitude in meters (close enough for Puerto Rico scale distances)
+METERS_PER_DEGREE_LAT = 111320.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> float:
+    """
+    Great-circle distance in meters between two (lat, lon) points.
+    """
+    lat1, lon1, lat2, lon2 = (float(lat1), float(lon1), float(lat2), float(lon2))
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_m):
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of radius_m.
+    Used as an index-friendly prefilter before the exact haversine check.
+    """
+    lat = float(lat)
+    lon = float(lon)
+    d_lat = radius_m / METERS_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lon = radius_m / (METERS_PER_DEGREE_LAT * cos_lat)
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
+
+
+class GridIndex:
+    """
+    Simple in-memory spatial index: points are bucketed into square cells of
+    `cell_size_m`, so a radius query only looks at the neighbouring cells.
+    Good enough for the number of locations/reports we keep in memory in jobs.
+    """
+
+    def __init__(self, cell_size_m: float):
+        self.cell_size_m = float(cell_size_m)
+        self.cell_deg = self.cell_size_m / METERS_PER_DEGREE_LAT
+        self.cells: dict[tuple[int, int], list] = {}
+        self.points: dict = {}
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def __len__(self):
+        return len(self.points)
+
+    def insert(self, key, lat, lon):
+        lat = float(lat)
+        lon = float(lon)
+        self.points[key] = (lat, lon)
+        self.cells.setdefault(self._cell(lat, lon), []).append(key)
+
+    def remove(self, key):
+        point = self.points.pop(key, None)
+        if point is None:
+            return
+        bucket = self.cells.get(self._cell(*point))
+        if bucket:
+            bucket.remove(key)
+
+    def nearby(self, lat, lon, radius_m: float):
+        """
+        Return [(key, distance_m)] for every point within radius_m, closest first.
+        """
+        lat = float(lat)
+        lon = float(lon)
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_m)
+        row_lo, col_lo = self._cell(min_lat, min_lon)
+        row_hi, col_hi = self._cell(max_lat, max_lon)
+
+        found = []
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                for key in self.cells.get((row, col), ()):
+                    p_lat, p_lon = self.points[key]
+                    distance = haversine_m(lat, lon, p_lat, p_lon)
+                    if distance <= radius_m:
+                        found.append((key, distance))
+
+        found.sort(key=lambda item: item[1])
+        return found
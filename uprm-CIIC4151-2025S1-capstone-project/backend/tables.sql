@@ -7,6 +7,8 @@ DROP TABLE IF EXISTS department_admins;
 
 DROP TABLE IF EXISTS reports;
 
+DROP TABLE IF EXISTS incidents;
+
 DROP TABLE IF EXISTS administrators;
 
 DROP TABLE IF EXISTS location;
@@ -17,6 +19,13 @@ DROP TABLE IF EXISTS users;
 
 DROP TABLE IF EXISTS admin_codes;
 
+DROP TABLE IF EXISTS upload_variants;
+
+DROP TABLE IF EXISTS uploads;
+
+-- Trigram similarity for duplicate detection and ILIKE search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Users table with suspended and pinned attributes
 CREATE TABLE users (
     id SERIAL PRIMARY KEY,
@@ -55,6 +64,21 @@ CREATE TABLE location (
     country VARCHAR(100)
 );
 
+-- Incidents group related open reports (same category, nearby, close in time)
+CREATE TABLE incidents (
+    id SERIAL PRIMARY KEY,
+    category VARCHAR(50) NOT NULL,
+    status VARCHAR(20) CHECK (status IN ('open', 'resolved')) DEFAULT 'open',
+    latitude DECIMAL(9, 6),
+    longitude DECIMAL(9, 6),
+    report_count INTEGER DEFAULT 0,
+    first_report_at TIMESTAMP,
+    last_report_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    resolved_by INTEGER REFERENCES administrators (id),
+    resolved_at TIMESTAMP
+);
+
 -- Reports table with category
 CREATE TABLE reports (
     id SERIAL PRIMARY KEY,
@@ -94,7 +118,8 @@ CREATE TABLE reports (
     location INTEGER REFERENCES location (id),
     city VARCHAR(100),
     image_url VARCHAR,
-    rating INTEGER DEFAULT 0
+    rating INTEGER DEFAULT 0,
+    incident_id INTEGER REFERENCES incidents (id) ON DELETE SET NULL
 );
 
 -- Department admins junction table
@@ -129,6 +154,28 @@ CREATE TABLE report_ratings (
     UNIQUE (report_id, user_id)
 );
 
+-- Content-addressed uploads with the number of reports referencing each one.
+-- last_seen moves on every upload of the content, deduplicated or not, so the
+-- GC's grace period starts from the newest hand-out of the URL.
+CREATE TABLE uploads (
+    sha256 CHAR(64) PRIMARY KEY,
+    url VARCHAR UNIQUE NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Resized variants generated for each uploaded image
+CREATE TABLE upload_variants (
+    filename VARCHAR NOT NULL,
+    width INTEGER NOT NULL,
+    format VARCHAR(10) NOT NULL,
+    size_bytes BIGINT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (filename, width, format)
+);
+
 -- Create indexes for better performance
 CREATE INDEX idx_users_email ON users (email);
 
@@ -148,6 +195,23 @@ CREATE INDEX idx_pinned_reports_user_id ON pinned_reports (user_id);
 
 CREATE INDEX idx_pinned_reports_report_id ON pinned_reports (report_id);
 
+-- Bounding-box lookups used by location snapping
+CREATE INDEX idx_location_lat_lon ON location (latitude, longitude);
+
+CREATE INDEX idx_reports_location ON reports (location);
+
+-- Duplicate detection: open reports by category and recency, plus trigram text matching
+CREATE INDEX idx_reports_open_category_created ON reports (category, created_at)
+WHERE status = 'open';
+
+CREATE INDEX idx_reports_title_trgm ON reports USING gin (title gin_trgm_ops);
+
+CREATE INDEX idx_reports_description_trgm ON reports USING gin (description gin_trgm_ops);
+
+CREATE INDEX idx_reports_incident_id ON reports (incident_id);
+
+CREATE INDEX idx_incidents_status_category ON incidents (status, category);
+
 -- Insert admin codes for user promotion
 INSERT INTO
     admin_codes (code, department)
@@ -0,0 +1,42 @@
+"""
+benchmarks.explain_plans --check as a test: every DAO statement is planned on
+a freshly generated dataset and compared to benchmarks/plans/baseline.json.
+
+Needs a scratch database, which is wiped and reloaded (from backend/):
+    BENCH_DATABASE_URL=postgresql://localhost/reports_bench python -m pytest tests
+
+Skipped when BENCH_DATABASE_URL is unset. After an intended plan change,
+refresh the baseline with
+    python -m benchmarks.explain_plans --generate 10000 --update
+"""
+import json
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.getenv("BENCH_DATABASE_URL"), reason="BENCH_DATABASE_URL is not set")
+
+# The dataset the committed baseline was taken on
+BASELINE_REPORTS = 10_000
+BASELINE_SEED = 4151
+
+
+def test_no_plan_regressions(monkeypatch):
+    dsn = os.environ["BENCH_DATABASE_URL"]
+    # Before the first project import, as in explain_plans.main()
+    monkeypatch.setenv("DATABASE_URL", dsn)
+    monkeypatch.setenv("SLOW_QUERY_MS", "-1")
+
+    from benchmarks.explain_plans import BASELINE, capture_statements, compare, summarize_all
+    from benchmarks.generate_data import generate
+    from benchmarks.run_benchmarks import sample_ids
+
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    assert baseline["reports"] == BASELINE_REPORTS
+
+    generate(dsn, reports=BASELINE_REPORTS, seed=BASELINE_SEED)
+    results = summarize_all(capture_statements(sample_ids(dsn)))
+    summaries = {key: {"fingerprint": e["fingerprint"], "summary": e["summary"]} for key, e in results.items()}
+
+    assert compare(baseline["statements"], summaries, buffer_threshold=0.5, min_buffers=100) == []
@@ -0,0 +1,336 @@
+"""
+Lightweight request tracing.
+
+Each sampled request gets a trace: a root span for the request, with nested
+spans for the handler method, every DAO call, every SQL statement and JSON
+serialization, e.g.
+
+    GET /reports/search                          41.2 ms
+      ReportsHandler.search_reports              39.8 ms
+        AdministratorsDAO.__init__                0.1 ms
+        AdministratorsDAO.get_admin_info_for_user 3.0 ms
+          sql SELECT u.admin, a.department ...    2.8 ms
+        ReportsDAO.search_reports                31.5 ms
+          sql SELECT COUNT(*) FROM reports ...   12.2 ms
+          sql SELECT reports.id AS id, ...       18.9 ms
+        map_to_dict                               0.6 ms
+        serialize                                 1.9 ms
+
+Handler and DAO classes opt in with the @traced_class decorator; other code
+uses `with span("name"):`. Outside a sampled trace both cost one contextvar
+lookup.
+
+Sampling: TRACE_SAMPLE_RATE of requests are traced (0 = off), plus any
+request with a sampled W3C `traceparent` header or `X-Trace: 1`. With
+TRACE_SLOW_MS set, every request is recorded and those slower than it are
+kept whatever the rate. The trace id (from `traceparent` if present) is
+returned as X-Trace-Id on every response.
+
+Finished traces are exported off the request thread to TRACE_EXPORTER:
+"file" (one JSON object per line in TRACE_FILE), "otlp" (OTLP/HTTP JSON
+POSTed to TRACE_OTLP_ENDPOINT, e.g. a local OpenTelemetry collector or
+Jaeger) or "none".
+"""
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+
+from flask import g, request
+
+from constants import (
+    TRACE_SAMPLE_RATE,
+    TRACE_SLOW_MS,
+    TRACE_EXPORTER,
+    TRACE_FILE,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_SERVICE_NAME,
+)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "token")
+
+    def __init__(self, trace, name, parent_id=None, attributes=None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.token = None
+        trace.spans.append(self)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        _current.reset(self.token)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans = []
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attributes):
+    """Child span of the current one; a no-op when the request is not traced."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def current_trace_id():
+    parent = _current.get()
+    return parent.trace.trace_id if parent is not None else None
+
+
+def _traced(fn, name):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        parent = _current.get()
+        if parent is None:
+            return fn(*args, **kwargs)
+        with Span(parent.trace, name, parent.span_id):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def traced_class(cls=None, *, skip=("map_",)):
+    """
+    Give every method defined on the class (and __init__) its own span,
+    named "Class.method". Methods starting with a prefix in `skip` are left
+    alone; per-row helpers like map_to_dict would otherwise add a span per row.
+    """
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+                continue
+            if attr.startswith("__") and attr != "__init__":
+                continue
+            if attr.startswith(skip):
+                continue
+            setattr(cls, attr, _traced(value, f"{cls.__name__}.{attr}"))
+        return cls
+
+    return decorate(cls) if cls is not None else decorate
+
+
+# -------------------------------------------------------
+# Exporters
+# -------------------------------------------------------
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(traces):
+    """OTLP/JSON ExportTraceServiceRequest for a batch of finished traces."""
+    spans = []
+    for trace in traces:
+        for s in trace.spans:
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": 2 if s is trace.spans[0] else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def _write_file(traces):
+    lines = []
+    for trace in traces:
+        root = trace.spans[0]
+        lines.append(json.dumps({
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "duration_ms": round(root.duration_ms, 3),
+            "spans": [s.to_dict() for s in trace.spans],
+        }, default=str))
+    # A single O_APPEND write per batch keeps lines from different workers intact
+    fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, ("\n".join(lines) + "\n").encode())
+    finally:
+        os.close(fd)
+
+
+def _post_otlp(traces):
+    body = json.dumps(to_otlp(traces), default=str).encode()
+    req = urllib.request.Request(
+        TRACE_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(req, timeout=5) as response:
+        response.read()
+
+
+_EXPORTERS = {"file": _write_file, "otlp": _post_otlp}
+
+
+class BatchExporter:
+    """Background thread that ships finished traces in batches."""
+
+    def __init__(self, export, max_batch=100, interval=1.0, max_queue=10000):
+        self.export = export
+        self.max_batch = max_batch
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self.thread.start()
+
+    def submit(self, trace):
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            pass  # never slow a request down to keep a trace
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.export(batch)
+            except Exception as e:
+                print(f"[tracing] ERROR exporting {len(batch)} trace(s): {e}")
+
+
+_exporter = None
+_exporter_pid = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter():
+    """One exporter per process; a preloaded master's thread does not survive fork."""
+    global _exporter, _exporter_pid
+    if _exporter_pid != os.getpid():
+        with _exporter_lock:
+            if _exporter_pid != os.getpid():
+                _exporter = BatchExporter(_EXPORTERS[TRACE_EXPORTER])
+                _exporter_pid = os.getpid()
+    return _exporter
+
+
+# -------------------------------------------------------
+# Request hooks
+# -------------------------------------------------------
+def _start_trace():
+    trace_id, parent_id, sampled = None, None, False
+
+    match = _TRACEPARENT.match(request.headers.get("traceparent", ""))
+    if match:
+        trace_id, parent_id = match.group(1), match.group(2)
+        sampled = bool(int(match.group(3), 16) & 1)
+    if request.headers.get("X-Trace") == "1":
+        sampled = True
+    if not sampled and TRACE_SAMPLE_RATE > 0:
+        sampled = random.random() < TRACE_SAMPLE_RATE
+
+    g.trace_id = trace_id or os.urandom(16).hex()
+    if not sampled and TRACE_SLOW_MS <= 0:
+        return
+
+    route = request.url_rule.rule if request.url_rule is not None else request.path
+    trace = Trace(g.trace_id, sampled)
+    root = Span(trace, f"{request.method} {route}", parent_id, {"http.method": request.method, "http.target": request.full_path})
+    root.__enter__()
+    g.trace_root = root
+
+
+def _add_trace_header(response):
+    trace_id = g.get("trace_id")
+    if trace_id:
+        response.headers["X-Trace-Id"] = trace_id
+    root = g.get("trace_root")
+    if root is not None:
+        root.set(**{"http.status_code": response.status_code})
+    return response
+
+
+def _finish_trace(exc=None):
+    root = g.pop("trace_root", None)
+    if root is None:
+        return
+    root.__exit__(type(exc) if exc else None, exc, None)
+
+    trace = root.trace
+    if trace.sampled or (TRACE_SLOW_MS > 0 and root.duration_ms >= TRACE_SLOW_MS):
+        if TRACE_EXPORTER in _EXPORTERS:
+            _get_exporter().submit(trace)
+
+
+def init_tracing(app):
+    app.before_request(_start_trace)
+    app.after_request(_add_trace_header)
+    app.teardown_request(_finish_trace)